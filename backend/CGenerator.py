@@ -0,0 +1,253 @@
+from typing import Union
+
+from ir.nodes import *
+from ir.RangeAnalysis import RangeAnalysis
+from ir.scope import lookup_variable, lookup_procedure, resolve_type, type_of
+
+RUNTIME = r"""#include <stdio.h>
+#include <stdlib.h>
+
+static char snl_out[1 << 16];
+
+static void snl_fail(const char *message, int line) {
+    fflush(stdout);
+    fprintf(stderr, "runtime error: %s at [%d]\n", message, line);
+    exit(2);
+}
+
+static inline long snl_index(long i, long low, long top, int line) {
+    if (i < low || i > top) snl_fail("array index out of range", line);
+    return i - low;
+}
+
+static inline long snl_div(long a, long b, int line) {
+    if (b == 0) snl_fail("division by zero", line);
+    return a / b;
+}
+
+static long snl_read_int(int line) {
+    long value;
+    if (scanf("%ld", &value) != 1) snl_fail("integer input expected", line);
+    return value;
+}
+
+static char snl_read_char(int line) {
+    char value;
+    if (scanf(" %c", &value) != 1) snl_fail("char input expected", line);
+    return value;
+}
+
+static void snl_write_int(long value) {
+    printf("%ld\n", value);
+}
+
+static void snl_write_char(char value) {
+    putchar(value);
+    putchar('\n');
+}
+"""
+
+
+class CGenerator:
+    # 把 ir.nodes 的程序翻译成一个独立的 C 文件:
+    #   每个过程一个 C 函数和一个帧结构体, 局部变量和参数放在帧里;
+    #   嵌套过程通过静态链 (帧里的 sl 指针) 访问外层过程的变量, 主程序的帧是全局变量 snl_g;
+    #   数组和记录是定长的结构体, 赋值和值参按值拷贝; var 参数传指针
+    # 下标检查逐个访问决定: 区间分析证明不会越界的访问不生成检查, eliminate_checks 为 False 时全部保留
+    __program: Procedure
+    __bounds_checks: bool
+    __ranges: Union[RangeAnalysis, None]
+
+    def __init__(self, program: Procedure, bounds_checks: bool = True, eliminate_checks: bool = True):
+        self.__program = program
+        self.__bounds_checks = bounds_checks
+        self.__ranges = RangeAnalysis(program) if bounds_checks and eliminate_checks else None
+        self.__ids = {id(procedure): i for i, procedure in enumerate(program.walk())}
+        self.__typedefs = []
+        self.__type_names = {}
+
+    def get_ranges(self) -> Union[RangeAnalysis, None]:
+        return self.__ranges
+
+    def generate(self) -> str:
+        procedures = self.__program.walk()
+        frames = [self.__frame(procedure) for procedure in procedures]
+        prototypes = [self.__signature(procedure) + ";" for procedure in procedures[1:]]
+        functions = [self.__function(procedure) for procedure in procedures[1:]]
+        main = ["int main(void) {", "    setvbuf(stdout, snl_out, _IOFBF, sizeof snl_out);"]
+        main += self.__block(self.__program.body, self.__program, 1)
+        main += ["    return 0;", "}"]
+        declarations = [f"struct snl_f{i};" for i in range(len(procedures))]
+        return "\n\n".join([
+            RUNTIME, "\n".join(declarations), "\n\n".join(self.__typedefs), "\n\n".join(frames),
+            "static struct snl_f0 snl_g;", "\n".join(prototypes), "\n\n".join(functions), "\n".join(main)
+        ]) + "\n"
+
+    # 类型与帧
+
+    def __c_type(self, type, scope: Procedure) -> str:
+        resolved = resolve_type(type, scope)
+        if resolved is None:
+            raise ValueError(f"Undefined type `{type.to_string()}` at [{getattr(type, 'line', scope.line)}]")
+        if isinstance(resolved, BaseType):
+            return "char" if resolved is CHAR else "long"
+        if id(resolved) not in self.__type_names:
+            # 先生成成员类型, 保证 typedef 按依赖顺序输出
+            if isinstance(resolved, ArrayType):
+                body = f"{self.__c_type(resolved.element, scope)} e[{resolved.length()}];"
+            else:
+                body = " ".join(f"{self.__c_type(field.type, scope)} v_{field.name};" for field in resolved.fields)
+            name = f"snl_t{len(self.__type_names)}"
+            self.__typedefs.append(f"typedef struct {{ {body or 'char unused;'} }} {name};")
+            self.__type_names[id(resolved)] = name
+        return self.__type_names[id(resolved)]
+
+    def __frame(self, procedure: Procedure) -> str:
+        lines = [f"struct snl_f{self.__ids[id(procedure)]} {{"]
+        if self.__has_static_link(procedure):
+            lines.append(f"    struct snl_f{self.__ids[id(procedure.parent)]} *sl;")
+        for decl in procedure.locals():
+            pointer = "*" if decl.by_ref else ""
+            lines.append(f"    {self.__c_type(decl.type, procedure)} {pointer}v_{decl.name};")
+        if len(lines) == 1:
+            lines.append("    char unused;")
+        lines.append("};")
+        return "\n".join(lines)
+
+    @staticmethod
+    def __has_static_link(procedure: Procedure) -> bool:
+        # 外层是主程序的过程直接访问全局帧 snl_g, 不需要静态链
+        return procedure.parent is not None and procedure.parent.level > 0
+
+    def __function_name(self, procedure: Procedure) -> str:
+        return f"snl_p{self.__ids[id(procedure)]}_{procedure.name}"
+
+    def __signature(self, procedure: Procedure) -> str:
+        params = []
+        if self.__has_static_link(procedure):
+            params.append(f"struct snl_f{self.__ids[id(procedure.parent)]} *sl")
+        for decl in procedure.params:
+            pointer = "*" if decl.by_ref else ""
+            params.append(f"{self.__c_type(decl.type, procedure)} {pointer}v_{decl.name}")
+        return f"static void {self.__function_name(procedure)}({', '.join(params) or 'void'})"
+
+    def __function(self, procedure: Procedure) -> str:
+        lines = [self.__signature(procedure) + " {", f"    struct snl_f{self.__ids[id(procedure)]} f = {{0}};"]
+        if self.__has_static_link(procedure):
+            lines.append("    f.sl = sl;")
+        for decl in procedure.params:
+            lines.append(f"    f.v_{decl.name} = v_{decl.name};")
+        lines += self.__block(procedure.body, procedure, 1)
+        lines.append("}")
+        return "\n".join(lines)
+
+    # 语句
+
+    def __block(self, statements: list, scope: Procedure, depth: int) -> list:
+        lines = []
+        for statement in statements:
+            lines += self.__statement(statement, scope, depth)
+        return lines
+
+    def __statement(self, statement, scope: Procedure, depth: int) -> list:
+        indent = "    " * depth
+        if isinstance(statement, Assign):
+            target_type = type_of(statement.target, scope)
+            value_type = type_of(statement.value, scope)
+            if isinstance(target_type, (ArrayType, RecordType)) and target_type is not value_type:
+                raise ValueError(f"Assign type mismatch at [{statement.line}]")
+            return [f"{indent}{self.__lvalue(statement.target, scope)} = {self.__expr(statement.value, scope)};"]
+        if isinstance(statement, Call):
+            return [f"{indent}{self.__call(statement, scope)};"]
+        if isinstance(statement, If):
+            lines = [f"{indent}if ({self.__expr(statement.condition, scope)}) {{"]
+            lines += self.__block(statement.then_body, scope, depth + 1)
+            lines.append(f"{indent}}} else {{")
+            lines += self.__block(statement.else_body, scope, depth + 1)
+            lines.append(f"{indent}}}")
+            return lines
+        if isinstance(statement, While):
+            lines = [f"{indent}while ({self.__expr(statement.condition, scope)}) {{"]
+            lines += self.__block(statement.body, scope, depth + 1)
+            lines.append(f"{indent}}}")
+            return lines
+        if isinstance(statement, Read):
+            reader = "snl_read_char" if type_of(statement.target, scope) is CHAR else "snl_read_int"
+            return [f"{indent}{self.__lvalue(statement.target, scope)} = {reader}({statement.line});"]
+        if isinstance(statement, Write):
+            value_type = type_of(statement.value, scope)
+            if not isinstance(value_type, BaseType):
+                raise ValueError(f"Only integer and char values can be written at [{statement.line}]")
+            writer = "snl_write_char" if value_type is CHAR else "snl_write_int"
+            return [f"{indent}{writer}({self.__expr(statement.value, scope)});"]
+        if isinstance(statement, Return):
+            return [f"{indent}return 0;" if scope.is_program() else f"{indent}return;"]
+        raise ValueError(f"Unsupported statement {type(statement).__name__}")
+
+    def __frame_pointer(self, scope: Procedure, target: Procedure) -> str:
+        # 从 scope 的函数体里取得外层过程 target 的帧指针
+        if target is scope:
+            return "&f"
+        return "f.sl" + "->sl" * (scope.level - target.level - 1)
+
+    def __call(self, call: Call, scope: Procedure) -> str:
+        callee = lookup_procedure(scope, call.name)
+        if not callee:
+            raise ValueError(f"Undefined procedure `{call.name}` at [{call.line}]")
+        if len(call.args) != len(callee.params):
+            raise ValueError(f"Call parameter count mismatch for `{call.name}` at [{call.line}]")
+        args = []
+        if self.__has_static_link(callee):
+            args.append(self.__frame_pointer(scope, callee.parent))
+        for param, arg in zip(callee.params, call.args):
+            if param.by_ref:
+                if not isinstance(arg, VarRef):
+                    raise ValueError(f"Variable expected for var parameter `{param.name}` at [{call.line}]")
+                args.append(f"&({self.__lvalue(arg, scope)})")
+            else:
+                args.append(self.__expr(arg, scope))
+        return f"{self.__function_name(callee)}({', '.join(args)})"
+
+    # 表达式
+
+    def __lvalue(self, ref: VarRef, scope: Procedure) -> str:
+        decl, owner = lookup_variable(scope, ref.name)
+        if not decl:
+            raise ValueError(f"Undefined variable `{ref.name}` at [{ref.line}]")
+        if owner.is_program():
+            code = f"snl_g.v_{decl.name}"
+        elif owner is scope:
+            code = f"f.v_{decl.name}"
+        else:
+            code = f"{self.__frame_pointer(scope, owner)}->v_{decl.name}"
+        if decl.by_ref:
+            code = f"(*{code})"
+        type = resolve_type(decl.type, owner)
+        if ref.field is not None:
+            field = type.get_field(ref.field) if isinstance(type, RecordType) else None
+            if not field:
+                raise ValueError(f"Undefined record field `{ref.name}.{ref.field}` at [{ref.line}]")
+            code += f".v_{field.name}"
+            type = field.type
+        if ref.index is not None:
+            if not isinstance(type, ArrayType):
+                raise ValueError(f"`{ref.name}` is not an array at [{ref.line}]")
+            index = self.__expr(ref.index, scope)
+            if self.__bounds_checks and not (self.__ranges and self.__ranges.is_safe(ref)):
+                code += f".e[snl_index({index}, {type.low}, {type.top}, {ref.line})]"
+            else:
+                code += f".e[({index}) - {type.low}]"
+        return code
+
+    def __expr(self, expr, scope: Procedure) -> str:
+        if isinstance(expr, Const):
+            return str(ord(expr.value)) if expr.type is CHAR else f"{expr.value}L"
+        if isinstance(expr, VarRef):
+            return self.__lvalue(expr, scope)
+        left = self.__expr(expr.left, scope)
+        right = self.__expr(expr.right, scope)
+        if isinstance(expr, Compare):
+            return f"({left} {'<' if expr.op == '<' else '=='} {right})"
+        if expr.op == "/":
+            return f"snl_div({left}, {right}, {expr.line})"
+        return f"({left} {expr.op} {right})"
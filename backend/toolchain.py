@@ -0,0 +1,41 @@
+import os
+import shutil
+import tempfile
+import subprocess
+
+from ir.CallGraph import prune
+from ir.ProgramBuilder import ProgramBuilder
+from backend.CGenerator import CGenerator
+from parser.RecursiveDescentParser import RecursiveDescentParser
+
+
+def find_compiler(cc: str = None) -> str:
+    path = shutil.which(cc or os.environ.get("CC", "cc"))
+    if not path:
+        raise RuntimeError("No C compiler found, set CC or install cc.")
+    return path
+
+
+def generate_c(source: str, bounds_checks: bool = True, eliminate_checks: bool = True) -> str:
+    result = RecursiveDescentParser().parse(list(source))
+    if not result.is_success():
+        raise ValueError("\n".join(result.get_errors()))
+    program = ProgramBuilder().build(result.get_tree())
+    prune(program)
+    return CGenerator(program, bounds_checks, eliminate_checks).generate()
+
+
+def compile_c(code: str, output: str, cc: str = None, flags: tuple = ("-O2",)) -> str:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "program.c")
+        with open(path, "w", encoding="utf-8") as w:
+            w.write(code)
+        process = subprocess.run([find_compiler(cc), *flags, "-o", output, path], capture_output=True, text=True)
+    if process.returncode != 0:
+        raise RuntimeError(f"C compiler failed:\n{process.stderr}")
+    return output
+
+
+def build_native(source: str, output: str, cc: str = None, bounds_checks: bool = True,
+                 eliminate_checks: bool = True) -> str:
+    return compile_c(generate_c(source, bounds_checks, eliminate_checks), output, cc)
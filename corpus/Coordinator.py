@@ -0,0 +1,255 @@
+import os
+import json
+import threading
+import socketserver
+import multiprocessing
+from collections import deque
+from typing import Union
+
+from lexer.log import logger
+from corpus.CorpusReport import FileResult, CorpusReport, digest
+
+# 协议: TCP 上每行一个 JSON 对象
+#   worker -> coordinator  {"type": "hello", "name": ...}  {"type": "result", "unit": n, "results": [FileResult...]}
+#   coordinator -> worker  {"type": "unit", "unit": n, "files": [{"path": ..., "source": ...}]}  {"type": "done"}
+# worker 每交回一片才拿到下一片; 源文本随任务发送, worker 所在的机器不需要能访问这些文件
+
+
+def send(wfile, message: dict) -> None:
+    wfile.write((json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8"))
+    wfile.flush()
+
+
+def receive(rfile) -> Union[dict, None]:
+    # 连接已关闭, 或这一行不是 JSON 对象时返回 None
+    line = rfile.readline()
+    if not line:
+        return None
+    try:
+        message = json.loads(line.decode("utf-8"))
+    except ValueError:
+        return None
+    return message if isinstance(message, dict) else None
+
+
+class Coordinator:
+    # 把文件列表切成每片 unit_size 个文件, 分给连接上来的 worker:
+    #   每个 worker 在协调端有一个待办队列, 空了先从池中取连续的一段 (按在线 worker 数均分),
+    #   池也空了就从待办最多的 worker 队尾偷一半; 片只在真正发出时离开队列, 所以偷取不需要通知被偷的 worker
+    #   worker 断开, 超时未交回或交回的结果不对时, 它手上的片进入重试队列 (优先分配), 待办放回池首;
+    #   一片发出 max_attempts 次仍没有结果, 其中的文件记为 lost
+    # 结果按文件在输入中的位置存放, 汇总的报告与 CorpusReport.compile_serial 相同
+    __units: list
+    __results: list
+    __pool: deque
+    __queues: dict
+    __retry: deque
+    __attempts: list
+    __remaining: int
+    __timeout: float
+    __max_attempts: int
+    __connected: int
+    __closed: bool
+    __condition: threading.Condition
+
+    def __init__(self, paths: list, unit_size: int = 8, host: str = "127.0.0.1", port: int = 0, timeout: float = 60.0,
+                 max_attempts: int = 3):
+        if unit_size < 1:
+            raise ValueError("Unit size must be positive.")
+        if max_attempts < 1:
+            raise ValueError("Max attempts must be positive.")
+        self.__results = [None] * len(paths)
+        files = []
+        for index, path in enumerate(paths):
+            source, failure = FileResult.load(path)
+            if failure:
+                self.__results[index] = failure
+            else:
+                files.append((index, path, source))
+        self.__units = [files[i:i + unit_size] for i in range(0, len(files), unit_size)]
+        self.__pool = deque(range(len(self.__units)))
+        self.__queues = {}
+        self.__retry = deque()
+        self.__attempts = [0] * len(self.__units)
+        self.__remaining = len(self.__units)
+        self.__timeout = timeout
+        self.__max_attempts = max_attempts
+        self.__connected = 0
+        self.__closed = False
+        self.__condition = threading.Condition()
+        self.__server = socketserver.ThreadingTCPServer((host, port), self.__handler())
+        self.__server.daemon_threads = True
+        self.__thread = None
+
+    def __handler(self) -> type:
+        serve = self.__serve
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                serve(self.connection, self.rfile, self.wfile)
+
+        return Handler
+
+    def get_address(self) -> tuple:
+        return self.__server.server_address[:2]
+
+    def get_units(self) -> int:
+        return len(self.__units)
+
+    def get_remaining(self) -> int:
+        return self.__remaining
+
+    def start(self) -> None:
+        if not self.__thread:
+            self.__thread = threading.Thread(target=self.__server.serve_forever, daemon=True)
+            self.__thread.start()
+            logger.info(f"coordinator listening on {self.get_address()}, {len(self.__units)} units")
+
+    def wait(self, timeout: float = None) -> Union[CorpusReport, None]:
+        # 全部完成时返回报告, 超时返回 None
+        with self.__condition:
+            if not self.__condition.wait_for(lambda: not self.__remaining, timeout):
+                return None
+            return CorpusReport(list(self.__results))
+
+    def close(self) -> None:
+        with self.__condition:
+            self.__closed = True
+            self.__condition.notify_all()
+        if self.__thread:
+            self.__server.shutdown()
+            self.__thread.join()
+            self.__thread = None
+        self.__server.server_close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __serve(self, connection, rfile, wfile) -> None:
+        hello = receive(rfile)
+        if not hello or hello.get("type") != "hello":
+            return
+        with self.__condition:
+            self.__connected += 1
+            worker = f"{hello.get('name') or 'worker'}#{self.__connected}"
+            self.__queues[worker] = deque()
+        logger.info(f"{worker} connected")
+        unit = None
+        try:
+            while True:
+                unit = self.__take(worker)
+                if unit is None:
+                    send(wfile, {"type": "done"})
+                    return
+                files = [{"path": path, "source": source} for _, path, source in self.__units[unit]]
+                send(wfile, {"type": "unit", "unit": unit, "files": files})
+                connection.settimeout(self.__timeout)
+                results = self.__read_results(unit, receive(rfile))
+                connection.settimeout(None)
+                if results is None:
+                    logger.warning(f"{worker} returned no valid result for unit {unit}")
+                    return
+                self.__complete(unit, results)
+                unit = None
+        except OSError as e:
+            # 包括 socket.timeout
+            logger.warning(f"{worker} lost: {e}")
+        finally:
+            self.__release(worker, unit)
+
+    def __read_results(self, unit: int, message: Union[dict, None]) -> Union[list, None]:
+        if not message or message.get("type") != "result" or message.get("unit") != unit:
+            return None
+        files = self.__units[unit]
+        data = message.get("results")
+        if not isinstance(data, list) or len(data) != len(files):
+            return None
+        try:
+            results = [FileResult.from_dict(item) for item in data]
+        except (KeyError, TypeError):
+            return None
+        if any(result.path != path for result, (_, path, _) in zip(results, files)):
+            return None
+        return results
+
+    def __take(self, worker: str) -> Union[int, None]:
+        with self.__condition:
+            while self.__remaining and not self.__closed:
+                unit = self.__next_unit(worker)
+                if unit is not None:
+                    self.__attempts[unit] += 1
+                    return unit
+                # 剩下的片都在别的 worker 手上; 等它们完成, 或某个 worker 失联后片回到重试队列
+                self.__condition.wait()
+            return None
+
+    def __next_unit(self, worker: str) -> Union[int, None]:
+        if self.__retry:
+            return self.__retry.popleft()
+        own = self.__queues[worker]
+        if not own and self.__pool:
+            count = -(-len(self.__pool) // len(self.__queues))
+            own.extend(self.__pool.popleft() for _ in range(count))
+        elif not own:
+            # 被偷的 worker 从队首取, 偷取从队尾取, 偷来的一段保持原来的顺序
+            victim = max(self.__queues.values(), key=len)
+            stolen = [victim.pop() for _ in range((len(victim) + 1) // 2)]
+            own.extend(reversed(stolen))
+        return own.popleft() if own else None
+
+    def __complete(self, unit: int, results: list) -> None:
+        with self.__condition:
+            for (index, _, _), result in zip(self.__units[unit], results):
+                self.__results[index] = result
+            self.__remaining -= 1
+            self.__condition.notify_all()
+
+    def __release(self, worker: str, unit: Union[int, None]) -> None:
+        with self.__condition:
+            self.__pool.extendleft(reversed(self.__queues.pop(worker)))
+            if unit is not None:
+                if self.__attempts[unit] < self.__max_attempts:
+                    self.__retry.append(unit)
+                else:
+                    logger.warning(f"unit {unit} given up after {self.__attempts[unit]} attempts")
+                    for index, path, source in self.__units[unit]:
+                        self.__results[index] = FileResult(path, digest(source), "lost",
+                                                           [f"No result after {self.__attempts[unit]} attempts."])
+                    self.__remaining -= 1
+            self.__condition.notify_all()
+
+
+def compile_corpus(paths: list, workers: int = None, unit_size: int = 8, host: str = "127.0.0.1", port: int = 0,
+                   timeout: float = 60.0, max_attempts: int = 3) -> CorpusReport:
+    # 本机的 worker 进程代替多台机器; 监听地址对外时, 其他机器上的 worker (python -m corpus.Worker) 也可以同时接入.
+    # workers 为 None 时取 CPU 数, 为 0 时只等待外部 worker. 本机 worker 意外退出会补上新的进程
+    from corpus.Worker import run_worker
+
+    count = (os.cpu_count() or 1) if workers is None else workers
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload(["corpus.Worker"])
+    with Coordinator(paths, unit_size, host, port, timeout, max_attempts) as coordinator:
+        coordinator.start()
+        host, port = coordinator.get_address()
+        # 每次失联至少消耗一片的一次机会, 超过这个数说明 worker 根本无法工作
+        budget = count + coordinator.get_units() * max_attempts
+        processes = []
+        report = None
+        while report is None:
+            processes = [process for process in processes if process.is_alive()]
+            while len(processes) < count and coordinator.get_remaining():
+                if not budget:
+                    raise RuntimeError("Local workers keep exiting without results.")
+                budget -= 1
+                process = context.Process(target=run_worker, args=(host, port), daemon=True)
+                process.start()
+                processes.append(process)
+            report = coordinator.wait(0.5)
+        for process in processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.kill()
+    return report
@@ -0,0 +1,102 @@
+import hashlib
+from collections import Counter
+
+from service.tasks import analyze
+
+
+def digest(source: str) -> str:
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+class FileResult:
+    # 一个文件的编译结果; 计时随机器和负载变化, 不参与比较和报告正文
+    # status: ok, lex_error, syntax_error, semantic_error; crash (编译器抛出异常或文件不可读), lost (重试后仍没有 worker 交回结果)
+    path: str
+    digest: str
+    status: str
+    errors: list
+    tokens: int
+    nodes: int
+    timings: dict
+
+    def __init__(self, path: str, digest: str, status: str, errors: list, tokens: int = 0, nodes: int = 0,
+                 timings: dict = None):
+        self.path = path
+        self.digest = digest
+        self.status = status
+        self.errors = errors
+        self.tokens = tokens
+        self.nodes = nodes
+        self.timings = timings or {}
+
+    @classmethod
+    def compile(cls, path: str, source: str):
+        # 串行编译和 worker 都经过这里, 保证同一源文本得到同一结果
+        try:
+            result = analyze(source)
+        except Exception as e:
+            return cls(path, digest(source), "crash", [f"{type(e).__name__}: {e}"])
+        return cls(path, digest(source), result["status"], result["errors"], result["tokens"], result["nodes"],
+                   result["timings"])
+
+    @classmethod
+    def load(cls, path: str):
+        # 读不出的文件直接记为失败, 返回 (源文本, None) 或 (None, 结果)
+        try:
+            with open(path, "r", encoding="utf-8") as r:
+                return r.read(), None
+        except (OSError, UnicodeDecodeError) as e:
+            return None, cls(path, "", "crash", [str(e)])
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(data["path"], data["digest"], data["status"], data["errors"], data["tokens"], data["nodes"],
+                   data.get("timings"))
+
+    def is_success(self) -> bool:
+        return self.status == "ok"
+
+    def to_dict(self, timings: bool = True) -> dict:
+        result = {"path": self.path, "digest": self.digest, "status": self.status, "errors": self.errors,
+                  "tokens": self.tokens, "nodes": self.nodes}
+        if timings:
+            result["timings"] = self.timings
+        return result
+
+
+class CorpusReport:
+    # 结果按输入文件的顺序排列, 与怎样分片, 由哪个 worker 编译无关
+    results: list
+
+    def __init__(self, results: list):
+        self.results = results
+
+    @classmethod
+    def compile_serial(cls, paths: list):
+        results = []
+        for path in paths:
+            source, failure = FileResult.load(path)
+            results.append(failure or FileResult.compile(path, source))
+        return cls(results)
+
+    def passed(self) -> int:
+        return sum(1 for result in self.results if result.is_success())
+
+    def is_success(self) -> bool:
+        return self.passed() == len(self.results)
+
+    def get_statuses(self) -> dict:
+        return dict(Counter(result.status for result in self.results))
+
+    def to_dict(self, timings: bool = False) -> dict:
+        return {"passed": self.passed(), "total": len(self.results), "statuses": self.get_statuses(),
+                "files": [result.to_dict(timings) for result in self.results]}
+
+    def to_string(self) -> str:
+        lines = []
+        for result in self.results:
+            lines.append(f"{result.path}: {result.status} ({result.tokens} tokens, {result.nodes} nodes)")
+            lines.extend(f"    {error}" for error in result.errors)
+        statuses = ", ".join(f"{status} {count}" for status, count in sorted(self.get_statuses().items()))
+        lines.append(f"{self.passed()}/{len(self.results)} ok" + (f" ({statuses})" if statuses else ""))
+        return "\n".join(lines)
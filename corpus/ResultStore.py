@@ -0,0 +1,190 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+from typing import Union
+
+from corpus.CorpusReport import CorpusReport
+
+# 计入编译器版本指纹的源码目录
+COMPILER_PACKAGES = ("lexer", "parser", "ir")
+
+PHASES = ("lex", "parse", "check")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    version TEXT NOT NULL,
+    started REAL NOT NULL,
+    files INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    run INTEGER NOT NULL REFERENCES runs(id),
+    path TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    status TEXT NOT NULL,
+    tokens INTEGER NOT NULL,
+    nodes INTEGER NOT NULL,
+    lex REAL,
+    parse REAL,
+    "check" REAL,
+    total REAL NOT NULL,
+    PRIMARY KEY (run, path)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS errors (
+    run INTEGER NOT NULL REFERENCES runs(id),
+    path TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    line INTEGER,
+    "column" INTEGER,
+    message TEXT NOT NULL,
+    PRIMARY KEY (run, path, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS runs_version ON runs (version, id);
+CREATE INDEX IF NOT EXISTS files_total ON files (run, total);
+CREATE INDEX IF NOT EXISTS files_status ON files (run, status);
+CREATE INDEX IF NOT EXISTS files_digest ON files (digest);
+CREATE INDEX IF NOT EXISTS errors_kind ON errors (run, kind);
+"""
+
+# 错误信息末尾的位置: 语法/语义错误 "... at [行]", 词法错误 "... near 行:列"
+_AT = re.compile(r"\s*\bat \[(\d+)\]$")
+_NEAR = re.compile(r"\s*\bnear (\d+):(\d+)$")
+# 反引号中的名字, token 和类型不同文件各不相同, 归类时替换掉
+_QUOTED = re.compile(r"`[^`]*`")
+
+
+def split_error(message: str) -> tuple:
+    # (类别, 行, 列), 没有的部分为 None
+    line = column = None
+    match = _AT.search(message)
+    if match:
+        line = int(match.group(1))
+    else:
+        match = _NEAR.search(message)
+        if match:
+            line, column = int(match.group(1)), int(match.group(2))
+    kind = message[:match.start()] if match else message
+    return _QUOTED.sub("`*`", kind), line, column
+
+
+def compiler_version() -> str:
+    # 没有发布版本号, 用编译器源码的哈希区分版本; 只改命令行或可视化的提交不算新版本
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sha = hashlib.sha256()
+    for package in COMPILER_PACKAGES:
+        directory = os.path.join(root, package)
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(".py"):
+                sha.update(name.encode("utf-8"))
+                with open(os.path.join(directory, name), "rb") as r:
+                    sha.update(r.read())
+    return sha.hexdigest()[:12]
+
+
+class ResultStore:
+    # 批量编译结果的 SQLite 库: 每次 save 是一个 run, 文件和错误各一张表, 整个 run 在一个事务里 executemany 写入.
+    # 常用查询都落在索引上: 错误类别按 (run, kind), 最慢的文件按 (run, total), 版本间比较按主键 (run, path)
+    __connection: sqlite3.Connection
+
+    def __init__(self, path: str = ":memory:"):
+        self.__connection = sqlite3.connect(path)
+        self.__connection.execute("PRAGMA journal_mode = WAL")
+        self.__connection.execute("PRAGMA synchronous = NORMAL")
+        self.__connection.executescript(SCHEMA)
+
+    def save(self, report: CorpusReport, version: str = None) -> int:
+        # 返回新 run 的编号
+        version = version or compiler_version()
+        paths = [result.path for result in report.results]
+        if len(set(paths)) != len(paths):
+            raise ValueError("Duplicate paths in report.")
+        files, errors = [], []
+        for result in report.results:
+            timings = [result.timings.get(phase) for phase in PHASES]
+            total = sum(timing for timing in timings if timing is not None)
+            files.append((result.path, result.digest, result.status, result.tokens, result.nodes, *timings, total))
+            for seq, message in enumerate(result.errors):
+                errors.append((result.path, seq, *split_error(message), message))
+        with self.__connection:
+            cursor = self.__connection.execute("INSERT INTO runs (version, started, files) VALUES (?, ?, ?)",
+                                               (version, time.time(), len(files)))
+            run = cursor.lastrowid
+            self.__connection.executemany(
+                'INSERT INTO files (run, path, digest, status, tokens, nodes, lex, parse, "check", total) '
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", [(run, *row) for row in files])
+            self.__connection.executemany(
+                'INSERT INTO errors (run, path, seq, kind, line, "column", message) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(run, *row) for row in errors])
+        return run
+
+    def get_runs(self) -> list:
+        # [(编号, 版本, 开始时间, 文件数)]
+        return self.__connection.execute("SELECT id, version, started, files FROM runs ORDER BY id").fetchall()
+
+    def get_run(self, version: str = None) -> Union[int, None]:
+        # 某个版本最近的 run; 不指定版本时是最近的 run
+        if version is None:
+            row = self.__connection.execute("SELECT max(id) FROM runs").fetchone()
+        else:
+            row = self.__connection.execute("SELECT max(id) FROM runs WHERE version = ?", (version,)).fetchone()
+        return row[0]
+
+    def __resolve(self, run: Union[int, str, None]) -> int:
+        # run 可以是编号或版本
+        resolved = run if isinstance(run, int) else self.get_run(run)
+        if resolved is None or not self.__connection.execute("SELECT 1 FROM runs WHERE id = ?", (resolved,)).fetchone():
+            raise ValueError(f"Run `{run}` not found.")
+        return resolved
+
+    def get_statuses(self, run: Union[int, str] = None) -> dict:
+        rows = self.__connection.execute("SELECT status, count(*) FROM files WHERE run = ? GROUP BY status",
+                                         (self.__resolve(run),))
+        return dict(rows.fetchall())
+
+    def top_errors(self, run: Union[int, str] = None, limit: int = 10) -> list:
+        # [(类别, 出现次数, 涉及的文件数)]
+        return self.__connection.execute(
+            "SELECT kind, count(*) AS n, count(DISTINCT path) FROM errors WHERE run = ? "
+            "GROUP BY kind ORDER BY n DESC, kind LIMIT ?", (self.__resolve(run), limit)).fetchall()
+
+    def slowest(self, run: Union[int, str] = None, limit: int = 10) -> list:
+        # [(路径, 总耗时, 词法, 语法, 语义)], 从 (run, total) 索引的尾部倒序读取
+        return self.__connection.execute(
+            'SELECT path, total, lex, parse, "check" FROM files WHERE run = ? ORDER BY total DESC LIMIT ?',
+            (self.__resolve(run), limit)).fetchall()
+
+    def get_errors(self, path: str, run: Union[int, str] = None) -> list:
+        # [(类别, 行, 列, 原始信息)]
+        return self.__connection.execute(
+            'SELECT kind, line, "column", message FROM errors WHERE run = ? AND path = ? ORDER BY seq',
+            (self.__resolve(run), path)).fetchall()
+
+    def regressions(self, base: Union[int, str], head: Union[int, str]) -> list:
+        # 两个 run 都编译了的同一文件 (按内容哈希), 在 base 中通过而在 head 中没有通过: [(路径, base 状态, head 状态)]
+        return self.__compare(base, head, "a.status = 'ok' AND b.status <> 'ok'")
+
+    def fixes(self, base: Union[int, str], head: Union[int, str]) -> list:
+        return self.__compare(base, head, "a.status <> 'ok' AND b.status = 'ok'")
+
+    def changes(self, base: Union[int, str], head: Union[int, str]) -> list:
+        # 状态不同的文件, 包括从一种失败变成另一种
+        return self.__compare(base, head, "a.status <> b.status")
+
+    def __compare(self, base: Union[int, str], head: Union[int, str], condition: str) -> list:
+        return self.__connection.execute(
+            "SELECT b.path, a.status, b.status FROM files AS a JOIN files AS b "
+            "ON b.run = ? AND b.path = a.path AND b.digest = a.digest "
+            f"WHERE a.run = ? AND {condition} ORDER BY b.path",
+            (self.__resolve(head), self.__resolve(base))).fetchall()
+
+    def close(self) -> None:
+        self.__connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,146 @@
+from typing import Union
+from collections import defaultdict
+
+from parser.TreeNode import TreeNode
+from parser.SyntaxTree import SyntaxTree
+from parser.TreeHasher import TreeHasher
+from parser.RecursiveDescentParser import RecursiveDescentParser
+
+
+class ProcedureMatch:
+    # 结构相同的一组过程 (不同文件中)
+    hash: int
+    size: int
+    procedures: list
+
+    def __init__(self, hash: int, size: int, procedures: list):
+        self.hash = hash
+        self.size = size
+        self.procedures = procedures
+
+    def to_string(self) -> str:
+        places = ", ".join(f"{name}:{procedure} [{line}]" for name, procedure, line in self.procedures)
+        return f"{self.size} nodes: {places}"
+
+
+class SimilarityIndex:
+    # 提交代码查重: 每个文件的子树哈希 (结点数不少于 min_size) 放进倒排索引 hash -> 文件,
+    # 查询时只沿倒排表累加共有的子树数, 不需要两两比较语法树.
+    # 出现在超过 max_share 比例文件里的子树 (模板代码) 不参与打分, 也保证倒排表不会退化成全表
+    __hasher: TreeHasher
+    __min_size: int
+    __max_share: float
+    __informative_counts: dict
+    __counted_limit: Union[float, None]
+
+    def __init__(self, normalize_identifiers: bool = True, min_size: int = 8, max_share: float = 0.5):
+        self.__hasher = TreeHasher(normalize_identifiers)
+        self.__min_size = min_size
+        self.__max_share = max_share
+        self.__files = {}
+        self.__postings = defaultdict(set)
+        self.__procedures = defaultdict(list)
+        self.__informative_counts = {}
+        self.__counted_limit = None
+
+    def add(self, name: str, tree: Union[SyntaxTree, TreeNode]) -> None:
+        root = tree.get_root() if isinstance(tree, SyntaxTree) else tree
+        if name in self.__files:
+            raise ValueError(f"Duplicate file `{name}`.")
+        hashes = self.__hasher.hash_tree(root)
+        subtrees = {h for h, size in hashes.values() if size >= self.__min_size}
+        self.__files[name] = subtrees
+        # 入库改变了文件数和倒排表长度, 各文件参与打分的子树数在下次查询时重新统计
+        self.__counted_limit = None
+        for h in subtrees:
+            self.__postings[h].add(name)
+        for procedure_hash, size, procedure, line in self.__procedures_of(root, hashes):
+            if size >= self.__min_size:
+                self.__procedures[procedure_hash].append((name, size, procedure, line))
+
+    def add_source(self, name: str, source: str) -> bool:
+        # 有语法错误的文件不入库
+        result = RecursiveDescentParser().parse(list(source))
+        if not result.is_success():
+            return False
+        self.add(name, result.get_tree())
+        return True
+
+    def size(self) -> int:
+        return len(self.__files)
+
+    def similar(self, name: str, threshold: float = 0.5) -> list:
+        # 与 name 相似的文件 [(文件, Jaccard 相似度)], 按相似度降序
+        limit = self.__limit()
+        counts = self.__informative_counts_at(limit)
+        own = [h for h in self.__files[name] if len(self.__postings[h]) <= limit]
+        shared = defaultdict(int)
+        for h in own:
+            for other in self.__postings[h]:
+                if other != name:
+                    shared[other] += 1
+        result = []
+        for other, count in shared.items():
+            union = len(own) + counts[other] - count
+            score = count / union if union else 0.0
+            if score >= threshold:
+                result.append((other, score))
+        result.sort(key=lambda item: (-item[1], item[0]))
+        return result
+
+    def pairs(self, threshold: float = 0.5) -> list:
+        # 所有相似度不低于 threshold 的文件对 [(a, b, 相似度)]
+        result = []
+        for name in self.__files:
+            for other, score in self.similar(name, threshold):
+                if name < other:
+                    result.append((name, other, score))
+        result.sort(key=lambda item: (-item[2], item[0], item[1]))
+        return result
+
+    def matched_procedures(self) -> list:
+        # 在至少两个文件中出现的相同过程, 大的在前
+        matches = []
+        for procedure_hash, places in self.__procedures.items():
+            if len({name for name, _, _, _ in places}) < 2:
+                continue
+            matches.append(ProcedureMatch(procedure_hash, places[0][1], [(name, procedure, line) for name, _, procedure, line in places]))
+        matches.sort(key=lambda match: (-match.size, match.procedures))
+        return matches
+
+    def report(self, threshold: float = 0.5) -> str:
+        lines = [f"{self.size()} files"]
+        for a, b, score in self.pairs(threshold):
+            lines.append(f"{score:.2f}  {a}  {b}")
+        matches = self.matched_procedures()
+        if matches:
+            lines.append("matched procedures:")
+            lines += ["  " + match.to_string() for match in matches]
+        return "\n".join(lines)
+
+    def __limit(self) -> float:
+        return max(2, self.__max_share * len(self.__files))
+
+    def __informative_counts_at(self, limit: float) -> dict:
+        # 每个文件参与打分的子树数, 两次 add 之间的查询共用同一份统计
+        if self.__counted_limit != limit:
+            self.__informative_counts = {name: sum(1 for h in subtrees if len(self.__postings[h]) <= limit)
+                                         for name, subtrees in self.__files.items()}
+            self.__counted_limit = limit
+        return self.__informative_counts
+
+    def __procedures_of(self, root: TreeNode, hashes: dict) -> list:
+        # ProcDec 的最后一个子结点 ProcDecMore 挂着后面声明的过程, 过程自身的哈希不包括它
+        result = []
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            children = node.get_children() or []
+            stack.extend(child for child in children if child)
+            if node.get_kind() != "ProcDec" or len(children) < 9 or not children[1]:
+                continue
+            procedure_hash, size = TreeHasher.combine("ProcDec", [hashes[id(child)] for child in children[:8] if child])
+            name = (children[1].get_children() or [None])[0]
+            if name:
+                result.append((procedure_hash, size, name.get_value(), name.get_line()))
+        return result
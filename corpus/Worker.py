@@ -0,0 +1,42 @@
+import os
+import socket
+import argparse
+
+from lexer.log import logger
+from corpus.CorpusReport import FileResult
+from corpus.Coordinator import send, receive
+
+
+def run_worker(host: str, port: int, name: str = "") -> int:
+    # 连接协调端, 逐片编译并交回结果, 直到收到 done 或连接关闭; 返回完成的片数
+    logger.set_quiet(True)
+    units = 0
+    with socket.create_connection((host, port)) as connection:
+        rfile = connection.makefile("rb")
+        wfile = connection.makefile("wb")
+        send(wfile, {"type": "hello", "name": name or f"{socket.gethostname()}:{os.getpid()}"})
+        while True:
+            message = receive(rfile)
+            if not message or message.get("type") != "unit":
+                return units
+            results = [FileResult.compile(file["path"], file["source"]).to_dict() for file in message["files"]]
+            send(wfile, {"type": "result", "unit": message["unit"], "results": results})
+            units += 1
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="SNL corpus compile worker")
+    arg_parser.add_argument("address", help="coordinator address, HOST:PORT")
+    arg_parser.add_argument("--name", default="", help="worker name shown in coordinator logs")
+    args = arg_parser.parse_args()
+    host, _, port = args.address.rpartition(":")
+    try:
+        units = run_worker(host or "127.0.0.1", int(port), args.name)
+    except (OSError, ValueError) as e:
+        print(f"{args.address}: {e}")
+        return
+    print(f"{units} units compiled")
+
+
+if __name__ == "__main__":
+    main()
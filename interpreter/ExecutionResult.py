@@ -0,0 +1,51 @@
+from typing import Union
+
+# status
+OK = "ok"
+LIMIT = "limit"
+ERROR = "error"
+
+# 超出预算时的 reason
+STEPS = "steps"
+CALL_DEPTH = "call_depth"
+MEMORY = "memory"
+OUTPUT = "output"
+
+
+class ExecutionResult:
+    # status 为 ok / limit / error; limit 时 reason 说明是哪一项预算, error 时 message 是运行时错误
+    status: str
+    reason: Union[str, None]
+    message: Union[str, None]
+    line: Union[int, None]
+    output: str
+    steps: int
+    max_depth: int
+    peak_memory: int
+
+    def __init__(self, status: str, output: str, steps: int, max_depth: int, peak_memory: int,
+                 reason: str = None, message: str = None, line: int = None):
+        self.status = status
+        self.reason = reason
+        self.message = message
+        self.line = line
+        self.output = output
+        self.steps = steps
+        self.max_depth = max_depth
+        self.peak_memory = peak_memory
+
+    def is_success(self) -> bool:
+        return self.status == OK
+
+    def to_dict(self) -> dict:
+        return {
+            "status": self.status, "reason": self.reason, "message": self.message, "line": self.line,
+            "output": self.output, "steps": self.steps, "max_depth": self.max_depth, "peak_memory": self.peak_memory
+        }
+
+    def to_string(self) -> str:
+        if self.status == OK:
+            return f"ok, {self.steps} steps"
+        if self.status == LIMIT:
+            return f"stopped: {self.reason} limit exceeded at [{self.line}], {self.steps} steps"
+        return f"runtime error: {self.message} at [{self.line}]"
@@ -0,0 +1,475 @@
+import sys
+
+from ir.nodes import *
+from ir.layout import StorageLayout
+from ir.scope import lookup_procedure
+from ir.RangeAnalysis import RangeAnalysis
+from interpreter.Limits import Limits
+from interpreter.ExecutionResult import *
+from interpreter.Vectorizer import VectorLoop, Fallback, MIN_COUNT, SAFE_BOUND, load_numpy, match_loop, affine_offset
+
+UNLIMITED = float("inf")
+
+
+class _Stop(Exception):
+    def __init__(self, status: str, reason: Union[str, None], message: Union[str, None], line: int):
+        super().__init__(message or reason)
+        self.status = status
+        self.reason = reason
+        self.message = message
+        self.line = line
+
+
+class _Return(Exception):
+    pass
+
+
+class _Machine:
+    # 一次执行的全部可变状态; 列表对象在多次 run 之间复用, 已编译的闭包直接引用它们
+    __slots__ = ("memory", "display", "steps", "line", "depth", "max_depth", "peak", "output", "output_size", "input", "position")
+
+    def __init__(self):
+        self.memory = []
+        self.display = []
+        self.reset("", 0)
+
+    def reset(self, input: str, levels: int) -> None:
+        del self.memory[:]
+        self.display[:] = [0] * levels
+        self.steps = 0
+        self.line = 0
+        self.depth = 0
+        self.max_depth = 0
+        self.peak = 0
+        self.output = []
+        self.output_size = 0
+        self.input = input
+        self.position = 0
+
+
+class Interpreter:
+    # 直接执行 ir.nodes 的程序: 构造时把每个过程编译成 Python 闭包, 之后可以对不同输入多次 run.
+    # 存储是一个单元数组, 帧按 StorageLayout 分配在栈顶; 外层变量通过 display (每层最近的活动帧基址) 访问.
+    # 每条语句计一步; 步数, 调用深度, 帧存储总量和输出字节数超出 Limits 时停止执行并给出原因.
+    # 程序应已通过语义检查, 编译时遇到未定义的名字抛出 ValueError.
+    # 安装了 NumPy 且 vectorize 时, 形如 while i < n do a[i] := e; i := i + 1 endwh 的循环整体用数组运算执行
+    # eliminate_checks 时, 区间分析证明不会越界的数组访问不再逐次检查下标
+    __program: Procedure
+    __limits: Limits
+    __layout: StorageLayout
+    __ranges: Union[RangeAnalysis, None]
+
+    def __init__(self, program: Procedure, limits: Limits = None, vectorize: bool = True, eliminate_checks: bool = True):
+        self.__program = program
+        self.__limits = limits or Limits()
+        self.__layout = StorageLayout(program)
+        self.__ranges = RangeAnalysis(program) if eliminate_checks else None
+        self.__numpy = load_numpy() if vectorize else None
+        self.__machine = _Machine()
+        procedures = program.walk()
+        self.__ids = {id(procedure): i for i, procedure in enumerate(procedures)}
+        self.__levels = max(procedure.level for procedure in procedures) + 1
+        self.__nesting = 1
+        self.__bodies = [None] * len(procedures)
+        for i, procedure in enumerate(procedures):
+            self.__bodies[i] = self.__block(procedure.body, procedure, 1)
+
+    def get_limits(self) -> Limits:
+        return self.__limits
+
+    def run(self, input: str = "") -> ExecutionResult:
+        m = self.__machine
+        m.reset(input, self.__levels)
+        limits = self.__limits
+        size = self.__layout.get_frame(self.__program).size
+        recursion_limit = sys.getrecursionlimit()
+        if limits.max_call_depth is not None:
+            # 每层 SNL 调用最多占用 2 * 语句嵌套深度 + 2 个 Python 栈帧
+            sys.setrecursionlimit(max(recursion_limit, limits.max_call_depth * (2 * self.__nesting + 2) + 1000))
+        try:
+            if limits.max_memory is not None and size > limits.max_memory:
+                raise _Stop(LIMIT, MEMORY, None, self.__program.line)
+            m.memory.extend([0] * size)
+            m.peak = size
+            self.__bodies[0]()
+            result = self.__result(OK)
+        except _Return:
+            result = self.__result(OK)
+        except _Stop as e:
+            result = self.__result(e.status, e.reason, e.message, e.line)
+        except RecursionError:
+            result = self.__result(LIMIT, CALL_DEPTH, None, m.line)
+        finally:
+            sys.setrecursionlimit(recursion_limit)
+        m.reset("", self.__levels)
+        return result
+
+    def __result(self, status: str, reason: str = None, message: str = None, line: int = None) -> ExecutionResult:
+        m = self.__machine
+        return ExecutionResult(status, "".join(m.output), m.steps, m.max_depth, m.peak, reason, message, line)
+
+    # 语句
+
+    def __block(self, statements: list, scope: Procedure, nesting: int):
+        self.__nesting = max(self.__nesting, nesting)
+        items = tuple((statement.line, self.__statement(statement, scope, nesting)) for statement in statements)
+        m = self.__machine
+        max_steps = UNLIMITED if self.__limits.max_steps is None else self.__limits.max_steps
+
+        def block():
+            for line, run in items:
+                m.steps += 1
+                m.line = line
+                if m.steps > max_steps:
+                    raise _Stop(LIMIT, STEPS, None, line)
+                run()
+        return block
+
+    def __statement(self, statement, scope: Procedure, nesting: int):
+        memory = self.__machine.memory
+        if isinstance(statement, Assign):
+            target = self.__address(statement.target, scope)
+            size = self.__layout.get_access(statement.target).size
+            if size == 1:
+                value = self.__expr(statement.value, scope)
+
+                def assign():
+                    memory[target()] = value()
+                return assign
+            source = self.__address(statement.value, scope)
+
+            def copy():
+                start, end = source(), target()
+                memory[end:end + size] = memory[start:start + size]
+            return copy
+        if isinstance(statement, Call):
+            return self.__call(statement, scope)
+        if isinstance(statement, If):
+            condition = self.__expr(statement.condition, scope)
+            then_body = self.__block(statement.then_body, scope, nesting + 1)
+            else_body = self.__block(statement.else_body, scope, nesting + 1)
+
+            def branch():
+                if condition():
+                    then_body()
+                else:
+                    else_body()
+            return branch
+        if isinstance(statement, While):
+            condition = self.__expr(statement.condition, scope)
+            body = self.__block(statement.body, scope, nesting + 1)
+
+            def loop():
+                while condition():
+                    body()
+            match = match_loop(statement) if self.__numpy else None
+            if not match:
+                return loop
+            vector = self.__vector_loop(match, scope)
+
+            def vector_loop():
+                if not vector():
+                    loop()
+            return vector_loop
+        if isinstance(statement, Read):
+            target = self.__address(statement.target, scope)
+            reader = self.__read_char if self.__layout.get_access(statement.target).type is CHAR else self.__read_int
+            line = statement.line
+
+            def read():
+                memory[target()] = reader(line)
+            return read
+        if isinstance(statement, Write):
+            return self.__write(statement, scope)
+        if isinstance(statement, Return):
+            def leave():
+                raise _Return()
+            return leave
+        raise ValueError(f"Unsupported statement {type(statement).__name__}")
+
+    def __call(self, call: Call, scope: Procedure):
+        callee = lookup_procedure(scope, call.name)
+        if not callee:
+            raise ValueError(f"Undefined procedure `{call.name}` at [{call.line}]")
+        if len(call.args) != len(callee.params):
+            raise ValueError(f"Call parameter count mismatch for `{call.name}` at [{call.line}]")
+        frame = self.__layout.get_frame(callee)
+        arguments = []
+        for param, arg in zip(callee.params, call.args):
+            slot = frame.get_slot(param.name)
+            if param.by_ref:
+                arguments.append((0, self.__address(arg, scope), slot.offset, 1))
+            elif slot.size > 1 or not isinstance(slot.type, BaseType):
+                arguments.append((1, self.__address(arg, scope), slot.offset, slot.size))
+            else:
+                arguments.append((2, self.__expr(arg, scope), slot.offset, 1))
+        m = self.__machine
+        memory, display = m.memory, m.display
+        bodies, index = self.__bodies, self.__ids[id(callee)]
+        level, size, zeros, line = callee.level, frame.size, [0] * frame.size, call.line
+        max_depth = UNLIMITED if self.__limits.max_call_depth is None else self.__limits.max_call_depth
+        max_memory = UNLIMITED if self.__limits.max_memory is None else self.__limits.max_memory
+
+        def invoke():
+            if m.depth >= max_depth:
+                raise _Stop(LIMIT, CALL_DEPTH, None, line)
+            values = [evaluate() for _, evaluate, _, _ in arguments]
+            base = len(memory)
+            if base + size > max_memory:
+                raise _Stop(LIMIT, MEMORY, None, line)
+            memory.extend(zeros)
+            if base + size > m.peak:
+                m.peak = base + size
+            for (kind, _, offset, cells), value in zip(arguments, values):
+                if kind == 1:
+                    memory[base + offset:base + offset + cells] = memory[value:value + cells]
+                else:
+                    memory[base + offset] = value
+            saved = display[level]
+            display[level] = base
+            m.depth += 1
+            if m.depth > m.max_depth:
+                m.max_depth = m.depth
+            try:
+                bodies[index]()
+            except _Return:
+                pass
+            finally:
+                display[level] = saved
+                m.depth -= 1
+                del memory[base:]
+        return invoke
+
+    def __write(self, statement: Write, scope: Procedure):
+        m = self.__machine
+        value = self.__expr(statement.value, scope)
+        is_char = self.__type(statement.value) is CHAR
+        max_output = UNLIMITED if self.__limits.max_output is None else self.__limits.max_output
+        line = statement.line
+
+        def write():
+            text = f"{chr(value()) if is_char else value()}\n"
+            size = m.output_size + len(text.encode())
+            if size > max_output:
+                raise _Stop(LIMIT, OUTPUT, None, line)
+            m.output_size = size
+            m.output.append(text)
+        return write
+
+    def __read_int(self, line: int) -> int:
+        m = self.__machine
+        text, position = m.input, m.position
+        while position < len(text) and text[position].isspace():
+            position += 1
+        start = position
+        if position < len(text) and text[position] in "+-":
+            position += 1
+        digits = position
+        while position < len(text) and text[position].isdigit():
+            position += 1
+        if position == digits:
+            raise _Stop(ERROR, None, "integer input expected", line)
+        m.position = position
+        return int(text[start:position])
+
+    def __read_char(self, line: int) -> int:
+        m = self.__machine
+        text, position = m.input, m.position
+        while position < len(text) and text[position].isspace():
+            position += 1
+        if position >= len(text):
+            raise _Stop(ERROR, None, "char input expected", line)
+        m.position = position + 1
+        return ord(text[position])
+
+    # 表达式; char 在存储里是字符编码
+
+    def __type(self, expr):
+        if isinstance(expr, Const):
+            return expr.type
+        if isinstance(expr, VarRef):
+            return self.__layout.get_access(expr).type
+        return INTEGER
+
+    def __base(self, access):
+        # 变量 (数组时为第一个元素) 的地址
+        memory, display = self.__machine.memory, self.__machine.display
+        level, offset, displacement = access.level, access.offset, access.displacement
+        if access.by_ref:
+            def base():
+                return memory[display[level] + offset] + displacement
+        else:
+            def base():
+                return display[level] + offset + displacement
+        return base
+
+    def __address(self, ref: VarRef, scope: Procedure):
+        if not isinstance(ref, VarRef):
+            raise ValueError(f"Variable expected at [{getattr(ref, 'line', scope.line)}]")
+        access = self.__layout.get_access(ref)
+        base = self.__base(access)
+        if access.index is None:
+            return base
+        index = self.__expr(access.index, scope)
+        low, top, stride, line = access.low, access.top, access.stride, ref.line
+        if self.__ranges and self.__ranges.is_safe(ref):
+            def unchecked():
+                return base() + (index() - low) * stride
+            return unchecked
+
+        def element():
+            i = index()
+            if i < low or i > top:
+                raise _Stop(ERROR, None, "array index out of range", line)
+            return base() + (i - low) * stride
+        return element
+
+    def __expr(self, expr, scope: Procedure):
+        if isinstance(expr, Const):
+            value = ord(expr.value) if expr.type is CHAR else expr.value
+            return lambda: value
+        if isinstance(expr, VarRef):
+            memory = self.__machine.memory
+            address = self.__address(expr, scope)
+            return lambda: memory[address()]
+        left = self.__expr(expr.left, scope)
+        right = self.__expr(expr.right, scope)
+        if isinstance(expr, Compare):
+            if expr.op == "<":
+                return lambda: left() < right()
+            return lambda: left() == right()
+        if expr.op == "+":
+            return lambda: left() + right()
+        if expr.op == "-":
+            return lambda: left() - right()
+        if expr.op == "*":
+            return lambda: left() * right()
+        line = expr.line
+
+        def divide():
+            # 与 C 后端一致, 向零取整
+            a, b = left(), right()
+            if b == 0:
+                raise _Stop(ERROR, None, "division by zero", line)
+            quotient = abs(a) // abs(b)
+            return quotient if (a < 0) == (b < 0) else -quotient
+        return divide
+
+    # 向量化的循环
+
+    def __vector_loop(self, match: VectorLoop, scope: Procedure):
+        # 返回的函数整体执行循环并返回 True; 返回 False 时没有修改任何状态, 由标量循环执行
+        m = self.__machine
+        memory = m.memory
+        np = self.__numpy
+        counter = self.__address(match.counter, scope)
+        bound = self.__expr(match.bound, scope)
+        scalars = [counter]
+        reads = []
+        writes = []
+        for assign, offset in zip(match.assigns, match.offsets):
+            access = self.__layout.get_access(assign.target)
+            value = self.__vector(assign.value, scope, match.counter.name, scalars, reads)
+            writes.append((self.__base(access), access.low, access.top, offset, value))
+        self.__vector(match.bound, scope, match.counter.name, scalars, reads)
+        max_steps = UNLIMITED if self.__limits.max_steps is None else self.__limits.max_steps
+        steps, line = match.steps, match.assigns[0].line
+
+        def run() -> bool:
+            start, end = memory[counter()], bound()
+            count = end - start
+            if count < MIN_COUNT or m.steps + count * steps > max_steps:
+                return False
+            try:
+                spans = []
+                for base, low, top, offset, _ in writes:
+                    if start + offset < low or end - 1 + offset > top:
+                        raise Fallback()
+                    first = base()
+                    spans.append((first, first + top - low + 1, offset))
+                for address in scalars:
+                    cell = address()
+                    if any(first <= cell < last for first, last, _ in spans):
+                        raise Fallback()
+                for base, low, top, offset in reads:
+                    first = base()
+                    last = first + top - low + 1
+                    for target_first, target_last, target_offset in spans:
+                        if first < target_last and target_first < last and (first, offset) != (target_first, target_offset):
+                            raise Fallback()
+                shadow = {}
+                for (base, low, _, offset, value), (first, _, _) in zip(writes, spans):
+                    shadow[first] = offset, value(start, count, shadow)[0]
+            except (Fallback, OverflowError):
+                return False
+            for (base, low, _, offset, _), (first, _, _) in zip(writes, spans):
+                values = np.broadcast_to(np.asarray(shadow[first][1], dtype=np.int64), (count,))
+                cell = first + start + offset - low
+                memory[cell:cell + count] = values.tolist()
+            memory[counter()] = end
+            m.steps += count * steps
+            m.line = line
+            return True
+        return run
+
+    def __vector(self, expr, scope: Procedure, counter: str, scalars: list, reads: list):
+        # 编译成 f(start, count, shadow) -> (值, 绝对值上界); 值是 int64 数组或标量.
+        # shadow 里是本轮已算出但尚未写回的目标数组 {首地址: (偏移, 数组)}
+        np = self.__numpy
+        memory = self.__machine.memory
+        if isinstance(expr, Const):
+            value = ord(expr.value) if expr.type is CHAR else expr.value
+            return lambda start, count, shadow: (value, abs(value))
+        if isinstance(expr, VarRef):
+            access = self.__layout.get_access(expr)
+            if access.index is None:
+                address = self.__address(expr, scope)
+                scalars.append(address)
+                if expr.name == counter:
+                    return lambda start, count, shadow: (np.arange(start, start + count, dtype=np.int64), max(abs(start), abs(start + count - 1)))
+
+                def scalar(start, count, shadow):
+                    value = memory[address()]
+                    return value, abs(value)
+                return scalar
+            base, low, top = self.__base(access), access.low, access.top
+            offset = affine_offset(expr.index, counter)
+            reads.append((base, low, top, offset))
+
+            def element(start, count, shadow):
+                if start + offset < low or start + count - 1 + offset > top:
+                    raise Fallback()
+                first = base()
+                if first in shadow and shadow[first][0] == offset:
+                    values = shadow[first][1]
+                else:
+                    cell = first + start + offset - low
+                    values = np.array(memory[cell:cell + count], dtype=np.int64)
+                return values, int(np.abs(values).max())
+            return element
+        left = self.__vector(expr.left, scope, counter, scalars, reads)
+        right = self.__vector(expr.right, scope, counter, scalars, reads)
+        op = expr.op
+
+        def binary(start, count, shadow):
+            a, a_bound = left(start, count, shadow)
+            b, b_bound = right(start, count, shadow)
+            if op == "+" or op == "-":
+                bound = a_bound + b_bound
+            elif op == "*":
+                bound = a_bound * b_bound
+            else:
+                bound = a_bound
+            if bound >= SAFE_BOUND:
+                raise Fallback()
+            if op == "+":
+                return a + b, bound
+            if op == "-":
+                return a - b, bound
+            if op == "*":
+                return a * b, bound
+            if not np.all(b):
+                raise Fallback()
+            quotient = np.abs(a) // np.abs(b)
+            return np.where((np.asarray(a) < 0) != (np.asarray(b) < 0), -quotient, quotient), bound
+        return binary
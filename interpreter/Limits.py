@@ -0,0 +1,24 @@
+from typing import Union
+
+
+class Limits:
+    # 一次执行的预算, None 表示不限制
+    #   max_steps: 执行的语句数; max_call_depth: 过程调用嵌套层数;
+    #   max_memory: 所有活动帧 (含数组和记录) 占用的存储单元数; max_output: write 输出的字节数
+    max_steps: Union[int, None]
+    max_call_depth: Union[int, None]
+    max_memory: Union[int, None]
+    max_output: Union[int, None]
+
+    def __init__(self, max_steps: Union[int, None] = 10_000_000, max_call_depth: Union[int, None] = 1000,
+                 max_memory: Union[int, None] = 1 << 22, max_output: Union[int, None] = 1 << 20):
+        self.max_steps = max_steps
+        self.max_call_depth = max_call_depth
+        self.max_memory = max_memory
+        self.max_output = max_output
+
+    def to_dict(self) -> dict:
+        return {
+            "max_steps": self.max_steps, "max_call_depth": self.max_call_depth,
+            "max_memory": self.max_memory, "max_output": self.max_output
+        }
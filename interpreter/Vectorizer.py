@@ -0,0 +1,131 @@
+from typing import Union
+
+from ir.nodes import *
+
+# 小于这个次数的循环不值得转成数组运算
+MIN_COUNT = 8
+# 所有中间结果的绝对值都小于它时, int64 运算与 Python 整数运算结果相同
+SAFE_BOUND = 1 << 62
+
+
+def load_numpy():
+    # NumPy 是可选依赖, 没有安装时所有循环按标量执行
+    try:
+        import numpy
+        return numpy
+    except ImportError:
+        return None
+
+
+class Fallback(Exception):
+    # 运行时发现不能安全地整体执行 (越界, 除零, 可能溢出, 别名), 改走标量循环; 此时还没有写任何存储
+    pass
+
+
+class VectorLoop:
+    # 可以向量化的循环:
+    #   while i < bound do x1[i + c1] := e1; ...; xk[i + ck] := ek; i := i + 1 endwh
+    # 赋值目标是互不相同的数组, ej 只含常量, 循环中不变的标量, i 和形如 y[i + c] 的数组元素;
+    # 目标数组只能按当前下标 (偏移相同) 读取, 否则存在跨迭代依赖
+    counter: VarRef
+    bound: Expr
+    assigns: list
+    offsets: list
+    steps: int
+
+    def __init__(self, counter: VarRef, bound, assigns: list, offsets: list, steps: int):
+        self.counter = counter
+        self.bound = bound
+        self.assigns = assigns
+        self.offsets = offsets
+        self.steps = steps
+
+
+def affine_offset(index, counter: str) -> Union[int, None]:
+    # index 为 counter + c 或 counter - c 时返回 c
+    if isinstance(index, VarRef) and index.name == counter and index.index is None and index.field is None:
+        return 0
+    if not isinstance(index, BinOp) or index.op not in "+-":
+        return None
+    left, right = index.left, index.right
+    if index.op == "+" and isinstance(left, Const) and left.type is INTEGER:
+        left, right = right, left
+    if not isinstance(right, Const) or right.type is not INTEGER or affine_offset(left, counter) != 0:
+        return None
+    return right.value if index.op == "+" else -right.value
+
+
+def _key(ref: VarRef) -> tuple:
+    return ref.name, ref.field
+
+
+def _reads(expr, counter: str, targets: dict) -> bool:
+    # 表达式中的每个变量访问都符合要求
+    stack = [expr]
+    while stack:
+        expr = stack.pop()
+        if isinstance(expr, Const):
+            continue
+        if isinstance(expr, BinOp):
+            stack += [expr.left, expr.right]
+            continue
+        if not isinstance(expr, VarRef):
+            return False
+        if expr.index is None:
+            if any(name == expr.name for name, _ in targets):
+                return False
+            continue
+        offset = affine_offset(expr.index, counter)
+        if offset is None:
+            return False
+        if _key(expr) in targets and targets[_key(expr)] != offset:
+            return False
+    return True
+
+
+def _is_increment(statement, counter: str) -> bool:
+    if not isinstance(statement, Assign) or statement.target.index is not None or statement.target.field is not None:
+        return False
+    value = statement.value
+    return statement.target.name == counter and isinstance(value, BinOp) and affine_offset(value, counter) == 1
+
+
+def match_loop(loop: While) -> Union[VectorLoop, None]:
+    condition = loop.condition
+    counter = condition.left
+    if condition.op != "<" or not isinstance(counter, VarRef) or counter.index is not None or counter.field is not None:
+        return None
+    body = loop.body
+    if len(body) < 2 or not _is_increment(body[-1], counter.name):
+        return None
+    targets = {}
+    offsets = []
+    for statement in body[:-1]:
+        if not isinstance(statement, Assign) or statement.target.index is None or statement.target.name == counter.name:
+            return None
+        offset = affine_offset(statement.target.index, counter.name)
+        if offset is None or _key(statement.target) in targets:
+            return None
+        targets[_key(statement.target)] = offset
+        offsets.append(offset)
+    for statement in body[:-1]:
+        if not _reads(statement.value, counter.name, targets):
+            return None
+    # 上界在循环中不变: 不含 i, 不读目标数组
+    if not _reads(condition.right, counter.name, targets) or _mentions(condition.right, counter.name):
+        return None
+    return VectorLoop(counter, condition.right, body[:-1], offsets, len(body))
+
+
+def _mentions(expr, name: str) -> bool:
+    stack = [expr]
+    while stack:
+        expr = stack.pop()
+        if isinstance(expr, VarRef):
+            if expr.name == name:
+                return True
+            if expr.index is not None:
+                stack.append(expr.index)
+        elif isinstance(expr, BinOp):
+            stack += [expr.left, expr.right]
+    return False
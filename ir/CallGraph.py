@@ -0,0 +1,151 @@
+from ir.nodes import *
+from ir.walk import iter_statements
+from ir.scope import lookup_procedure
+
+
+class CallGraph:
+    # 过程调用图: 结点是过程在 program.walk() 中的序号 (主程序为 0, 与 CGenerator 的编号一致),
+    # 边来自语句体里的调用语句 (CallStmRest); 调用了未定义过程的语句不计入, 由语义检查报告
+    __procedures: list
+    __callees: list
+    __callers: list
+
+    def __init__(self, program: Procedure):
+        self.__procedures = program.walk()
+        self.__ids = {id(procedure): i for i, procedure in enumerate(self.__procedures)}
+        self.__callees = [[] for _ in self.__procedures]
+        self.__callers = [[] for _ in self.__procedures]
+        self.__sites = 0
+        for caller, procedure in enumerate(self.__procedures):
+            targets = set()
+            for statement in iter_statements(procedure.body):
+                if not isinstance(statement, Call):
+                    continue
+                callee = lookup_procedure(procedure, statement.name)
+                if callee:
+                    self.__sites += 1
+                    targets.add(self.__ids[id(callee)])
+            self.__callees[caller] = sorted(targets)
+            for callee in self.__callees[caller]:
+                self.__callers[callee].append(caller)
+
+    def get_procedures(self) -> list:
+        return self.__procedures
+
+    def get_procedure(self, i: int) -> Procedure:
+        return self.__procedures[i]
+
+    def get_id(self, procedure: Procedure) -> int:
+        return self.__ids[id(procedure)]
+
+    def get_callees(self, i: int) -> list:
+        return self.__callees[i]
+
+    def get_callers(self, i: int) -> list:
+        return self.__callers[i]
+
+    def fan_in(self, i: int) -> int:
+        return len(self.__callers[i])
+
+    def fan_out(self, i: int) -> int:
+        return len(self.__callees[i])
+
+    def reachable(self) -> set:
+        # 从主程序出发可达的过程
+        seen = {0}
+        stack = [0]
+        while stack:
+            for callee in self.__callees[stack.pop()]:
+                if callee not in seen:
+                    seen.add(callee)
+                    stack.append(callee)
+        return seen
+
+    def unreachable(self) -> list:
+        seen = self.reachable()
+        return [procedure for i, procedure in enumerate(self.__procedures) if i not in seen]
+
+    def cycles(self) -> list:
+        # 递归: 强连通分量中多于一个过程的, 或直接调用自身的; Tarjan 算法, 不递归
+        index = {}
+        low = {}
+        on_stack = set()
+        stack = []
+        result = []
+        counter = 0
+        for start in range(len(self.__procedures)):
+            if start in index:
+                continue
+            work = [(start, 0)]
+            while work:
+                node, child = work.pop()
+                if child == 0:
+                    index[node] = low[node] = counter
+                    counter += 1
+                    stack.append(node)
+                    on_stack.add(node)
+                callees = self.__callees[node]
+                if child < len(callees):
+                    work.append((node, child + 1))
+                    callee = callees[child]
+                    if callee not in index:
+                        work.append((callee, 0))
+                    elif callee in on_stack:
+                        low[node] = min(low[node], index[callee])
+                    continue
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in self.__callees[node]:
+                        result.append(sorted(component))
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+        result.sort()
+        return result
+
+    def get_stats(self) -> dict:
+        procedures = range(1, len(self.__procedures))
+        return {
+            "procedures": len(self.__procedures) - 1,
+            "reachable": len(self.reachable()) - 1,
+            "call_sites": self.__sites,
+            "edges": sum(len(callees) for callees in self.__callees),
+            "max_fan_in": max((self.fan_in(i) for i in procedures), default=0),
+            "max_fan_out": max((self.fan_out(i) for i in range(len(self.__procedures))), default=0),
+            "recursive": sum(len(cycle) for cycle in self.cycles())
+        }
+
+    def to_string(self) -> str:
+        seen = self.reachable()
+        lines = []
+        for i, procedure in enumerate(self.__procedures):
+            callees = ", ".join(self.__procedures[callee].name for callee in self.__callees[i]) or "-"
+            mark = "" if i in seen else "  (unreachable)"
+            lines.append(f"{i:>3} {procedure.name}: in {self.fan_in(i)}, out {self.fan_out(i)} -> {callees}{mark}")
+        for cycle in self.cycles():
+            lines.append("recursion: " + " -> ".join(self.__procedures[i].name for i in cycle))
+        lines.append(", ".join(f"{key} {value}" for key, value in self.get_stats().items()))
+        return "\n".join(lines)
+
+
+def prune(program: Procedure, graph: CallGraph = None) -> list:
+    # 删除主程序调用不到的过程 (原地修改), 返回被删除的过程;
+    # 被删除过程里嵌套的过程随之删除. 可达调用解析到的都是可达过程, 所以删除不会改变名字查找结果
+    graph = graph or CallGraph(program)
+    seen = graph.reachable()
+    removed = []
+    for procedure in graph.get_procedures():
+        kept = []
+        for nested in procedure.procedures:
+            if graph.get_id(nested) in seen:
+                kept.append(nested)
+            else:
+                removed.append(nested)
+        procedure.procedures = kept
+    return removed
@@ -0,0 +1,100 @@
+import hashlib
+
+from ir.nodes import *
+from ir.SemanticChecker import SemanticChecker, ProcedureCheck, path_of, signature
+
+
+def _dump(value, base: int):
+    # 过程自身文本的规范形式: 行号相对过程首行, 只改前面过程的行数不会使后面的缓存失效
+    if isinstance(value, list):
+        return [_dump(item, base) for item in value]
+    if isinstance(value, BaseType):
+        return value.name
+    if isinstance(value, Procedure):
+        # 嵌套过程只计名字和位置, 它的内容单独缓存
+        return "procedure", value.name, value.line - base
+    if hasattr(value, "__dict__"):
+        fields = []
+        for name, item in sorted(vars(value).items()):
+            if name == "line":
+                item = item - base
+            fields.append((name, _dump(item, base)))
+        return type(value).__name__, fields
+    return value
+
+
+def fingerprint(procedure: Procedure) -> bytes:
+    text = repr((
+        procedure.name,
+        _dump(procedure.params, procedure.line),
+        _dump(procedure.types, procedure.line),
+        _dump(procedure.variables, procedure.line),
+        _dump(procedure.procedures, procedure.line),
+        _dump(procedure.body, procedure.line)
+    ))
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+
+class IncrementalChecker:
+    # 跨多次编辑复用按过程的语义检查结果. 一个过程的缓存在以下情况下失效:
+    #   它自己的声明或语句体变了 (fingerprint); 或它依赖的名字查找结果的签名变了
+    #   (变量/类型的声明位置与类型, 被调用过程的参数表), 被调用过程只改了语句体不会连带重查
+    __checker: SemanticChecker
+    __cache: dict
+
+    def __init__(self):
+        self.__checker = SemanticChecker()
+        self.__cache = {}
+        self.__checked = []
+        self.__reused = []
+
+    def check(self, program: Procedure) -> list:
+        cache = {}
+        self.__checked = []
+        self.__reused = []
+        errors = []
+        for procedure in program.walk():
+            key = path_of(procedure)
+            own = fingerprint(procedure)
+            entry = self.__cache.get(key)
+            if entry and entry[0] == own and self.__is_valid(entry[1], procedure):
+                self.__reused.append(key)
+                result = ProcedureCheck(procedure)
+                result.errors = entry[1].errors
+                result.dependencies = entry[1].dependencies
+            else:
+                self.__checked.append(key)
+                result = self.__checker.check_procedure(procedure)
+            cache[key] = (own, result)
+            errors += result.get_errors()
+        self.__cache = cache
+        return errors
+
+    def get_checked(self) -> list:
+        # 上一次 check 实际重新检查的过程路径
+        return self.__checked
+
+    def get_reused(self) -> list:
+        return self.__reused
+
+    def get_dependencies(self, path: str) -> dict:
+        # (kind, name) -> (声明所在过程的路径, ...) 或 None (未定义)
+        entry = self.__cache.get(path)
+        return dict(entry[1].dependencies) if entry else {}
+
+    def get_graph(self) -> dict:
+        # 过程路径 -> 它引用的声明 {(声明所在过程的路径, kind, name)}, 未定义的名字不在图中
+        graph = {}
+        for path, (_, result) in self.__cache.items():
+            graph[path] = {(sig[0], kind, name) for (kind, name), sig in result.dependencies.items() if sig is not None}
+        return graph
+
+    def clear(self) -> None:
+        self.__cache = {}
+
+    @staticmethod
+    def __is_valid(result: ProcedureCheck, procedure: Procedure) -> bool:
+        for (kind, name), old in result.dependencies.items():
+            if signature(procedure, kind, name) != old:
+                return False
+        return True
@@ -0,0 +1,263 @@
+from typing import Union
+
+from ir.nodes import *
+from parser.TreeNode import TreeNode
+from parser.SyntaxTree import SyntaxTree
+
+
+# BinOp 结点中运算符终结符的类别
+OPERATORS = {"PLUS": "+", "MINUS": "-", "TIMES": "*", "OVER": "/"}
+
+
+def _children(node: TreeNode) -> list:
+    return node.get_children() or []
+
+
+def _is_empty(node: TreeNode) -> bool:
+    # 推导为 ɛ 的产生式只有一个没有 token 的 ɛ 子结点
+    children = _children(node)
+    return len(children) == 1 and children[0].get_kind() == "ɛ"
+
+
+class ProgramBuilder:
+    # 把语法分析得到的具体语法树 (按产生式展开的 TreeNode) 归约成 ir.nodes 中的抽象语法树
+    # 只接受没有语法错误的树; 名字在这里不做解析, 由 ir.scope 按作用域查找
+
+    def build(self, tree: Union[SyntaxTree, TreeNode]) -> Procedure:
+        root = tree.get_root() if isinstance(tree, SyntaxTree) else tree
+        if not root or root.get_kind() != "Program":
+            raise ValueError("Program node expected.")
+        head, declare, body = _children(root)[:3]
+        name = _children(_children(head)[1])[0]
+        program = Procedure(name.get_value(), name.get_line())
+        self.__declare_part(declare, program)
+        program.body = self.__program_body(body)
+        return program
+
+    # 声明
+
+    def __declare_part(self, node: TreeNode, procedure: Procedure) -> None:
+        type_part, var_part, proc_part = _children(node)
+        if not _is_empty(type_part):
+            self.__type_dec_list(_children(_children(type_part)[0])[1], procedure)
+        if not _is_empty(var_part):
+            self.__var_dec_list(_children(_children(var_part)[0])[1], procedure)
+        if not _is_empty(proc_part):
+            self.__proc_dec(_children(proc_part)[0], procedure)
+
+    def __type_dec_list(self, node: TreeNode, procedure: Procedure) -> None:
+        while True:
+            type_id, _, type_def, _, more = _children(node)
+            name = _children(type_id)[0]
+            procedure.types.append(TypeDecl(name.get_value(), self.__type_def(type_def), name.get_line()))
+            if _is_empty(more):
+                return
+            node = _children(more)[0]
+
+    def __var_dec_list(self, node: TreeNode, procedure: Procedure) -> None:
+        while True:
+            type_def, id_list, _, more = _children(node)
+            type = self.__type_def(type_def)
+            for name in self.__id_list(id_list):
+                procedure.variables.append(VarDecl(name.get_value(), type, name.get_line()))
+            if _is_empty(more):
+                return
+            node = _children(more)[0]
+
+    @staticmethod
+    def __id_list(node: TreeNode) -> list:
+        # IdList / varIdList / FormList 的形式都是 ID [, ...]
+        names = []
+        while True:
+            name, more = _children(node)
+            names.append(name)
+            if _is_empty(more):
+                return names
+            node = _children(more)[1]
+
+    def __type_def(self, node: TreeNode):
+        child = _children(node)[0]
+        kind = child.get_kind()
+        if kind == "BaseType":
+            return self.__base_type(child)
+        if kind == "StructureType":
+            structure = _children(child)[0]
+            if structure.get_kind() == "ArrayType":
+                return self.__array_type(structure)
+            return self.__rec_type(structure)
+        return NamedType(child.get_value(), child.get_line())
+
+    @staticmethod
+    def __base_type(node: TreeNode) -> BaseType:
+        return CHAR if _children(node)[0].get_kind() == "CHAR" else INTEGER
+
+    def __array_type(self, node: TreeNode) -> ArrayType:
+        children = _children(node)
+        low = int(_children(children[2])[0].get_value())
+        top = int(_children(children[4])[0].get_value())
+        return ArrayType(low, top, self.__base_type(children[7]))
+
+    def __rec_type(self, node: TreeNode) -> RecordType:
+        fields = []
+        field_list = _children(node)[1]
+        while True:
+            type_node, id_list, _, more = _children(field_list)
+            if type_node.get_kind() == "ArrayType":
+                type = self.__array_type(type_node)
+            else:
+                type = self.__base_type(type_node)
+            for name in self.__id_list(id_list):
+                fields.append(Field(name.get_value(), type, name.get_line()))
+            if _is_empty(more):
+                return RecordType(fields)
+            field_list = _children(more)[0]
+
+    def __proc_dec(self, node: TreeNode, parent: Procedure) -> None:
+        while True:
+            children = _children(node)
+            name = _children(children[1])[0]
+            procedure = Procedure(name.get_value(), name.get_line(), parent)
+            parent.procedures.append(procedure)
+            if not _is_empty(children[3]):
+                self.__param_dec_list(_children(children[3])[0], procedure)
+            self.__declare_part(_children(children[6])[0], procedure)
+            procedure.body = self.__program_body(_children(children[7])[0])
+            more = children[8]
+            if _is_empty(more):
+                return
+            node = _children(more)[0]
+
+    def __param_dec_list(self, node: TreeNode, procedure: Procedure) -> None:
+        while True:
+            param, more = _children(node)
+            children = _children(param)
+            by_ref = len(children) == 3
+            type = self.__type_def(children[-2])
+            for name in self.__id_list(children[-1]):
+                procedure.params.append(VarDecl(name.get_value(), type, name.get_line(), True, by_ref))
+            if _is_empty(more):
+                return
+            node = _children(more)[1]
+
+    # 语句
+
+    def __program_body(self, node: TreeNode) -> list:
+        return self.__stm_list(_children(node)[1])
+
+    def __stm_list(self, node: TreeNode) -> list:
+        statements = []
+        while True:
+            stm, more = _children(node)
+            statements.append(self.__stm(stm))
+            if _is_empty(more):
+                return statements
+            node = _children(more)[1]
+
+    def __stm(self, node: TreeNode):
+        children = _children(node)
+        kind = children[0].get_kind()
+        if kind == "ConditionalStm":
+            parts = _children(children[0])
+            condition = self.__rel_exp(parts[1])
+            return If(condition, self.__stm_list(parts[3]), self.__stm_list(parts[5]), condition.line)
+        if kind == "LoopStm":
+            parts = _children(children[0])
+            condition = self.__rel_exp(parts[1])
+            return While(condition, self.__stm_list(parts[3]), condition.line)
+        if kind == "InputStm":
+            name = _children(_children(children[0])[2])[0]
+            return Read(VarRef(name.get_value(), name.get_line()), name.get_line())
+        if kind == "OutputStm":
+            value = self.__exp(_children(children[0])[2])
+            return Write(value, value.line)
+        if kind == "ReturnStm":
+            return Return(_children(children[0])[0].get_line())
+        name = children[0]
+        rest = _children(children[1])[0]
+        if rest.get_kind() == "AssignmentRest":
+            vari_more, _, exp = _children(rest)
+            target = self.__variable(name, vari_more)
+            return Assign(target, self.__exp(exp), name.get_line())
+        return Call(name.get_value(), self.__act_param_list(_children(rest)[1]), name.get_line())
+
+    def __act_param_list(self, node: TreeNode) -> list:
+        args = []
+        while not _is_empty(node):
+            exp, more = _children(node)
+            args.append(self.__exp(exp))
+            if _is_empty(more):
+                break
+            node = _children(more)[1]
+        return args
+
+    # 表达式
+
+    def __rel_exp(self, node: TreeNode) -> Compare:
+        exp, other = _children(node)
+        cmp_op, right = _children(other)
+        left = self.__exp(exp)
+        op = "<" if _children(cmp_op)[0].get_kind() == "LT" else "="
+        return Compare(op, left, self.__exp(right), left.line)
+
+    def __exp(self, node: TreeNode):
+        children = _children(node)
+        if len(children) == 1:
+            return self.__operand(children[0])
+        # Exp -> Term OtherTerm 是右递归的, 这里按左结合折叠: a-b-c 即 (a-b)-c
+        term, other = children
+        result = self.__term(term)
+        while not _is_empty(other):
+            add_op, node = _children(other)
+            op = "+" if _children(add_op)[0].get_kind() == "PLUS" else "-"
+            term, other = _children(node)
+            result = BinOp(op, result, self.__term(term), result.line)
+        return result
+
+    def __term(self, node: TreeNode):
+        factor, other = _children(node)
+        result = self.__factor(factor)
+        while not _is_empty(other):
+            multi_op, node = _children(other)
+            op = "*" if _children(multi_op)[0].get_kind() == "TIMES" else "/"
+            factor, other = _children(node)
+            result = BinOp(op, result, self.__factor(factor), result.line)
+        return result
+
+    def __operand(self, node: TreeNode):
+        # 优先级爬升得到的 BinOp 已经左结合; 沿左链下行再自底向上折叠, 长的 a+b+c+... 不会递归过深
+        chain = []
+        while node.get_kind() == "BinOp":
+            chain.append(node)
+            node = _children(node)[0]
+        result = self.__factor(node)
+        for binary in reversed(chain):
+            _, operator, right = _children(binary)
+            result = BinOp(OPERATORS[operator.get_kind()], result, self.__operand(right), result.line)
+        return result
+
+    def __factor(self, node: TreeNode):
+        children = _children(node)
+        if len(children) == 3:
+            return self.__exp(children[1])
+        child = children[0]
+        kind = child.get_kind()
+        if kind == "INTC":
+            return Const(int(child.get_value()), INTEGER, child.get_line())
+        if kind == "CHARACTER":
+            return Const(child.get_value(), CHAR, child.get_line())
+        name, vari_more = _children(child)
+        return self.__variable(name, vari_more)
+
+    def __variable(self, name: TreeNode, vari_more: TreeNode) -> VarRef:
+        ref = VarRef(name.get_value(), name.get_line())
+        if _is_empty(vari_more):
+            return ref
+        children = _children(vari_more)
+        if len(children) == 3:
+            ref.index = self.__exp(children[1])
+            return ref
+        field, field_more = _children(children[1])
+        ref.field = field.get_value()
+        if not _is_empty(field_more):
+            ref.index = self.__exp(_children(field_more)[1])
+        return ref
@@ -0,0 +1,261 @@
+from typing import Union
+
+from ir.nodes import *
+from ir.walk import iter_expressions, statement_expressions
+from ir.scope import lookup_variable, lookup_procedure, resolve_type
+
+INF = float("inf")
+TOP = (-INF, INF)
+# 循环头的状态迭代这么多轮后仍在变化, 变化的边界放宽到无穷, 保证不动点迭代终止
+WIDEN_AFTER = 3
+
+
+def _join(a: Union[dict, None], b: Union[dict, None]) -> Union[dict, None]:
+    # 状态是 {变量名: (下界, 上界)}, None 表示不可达
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return {name: (min(a[name][0], b[name][0]), max(a[name][1], b[name][1])) for name in a}
+
+
+def _widen(old: Union[dict, None], new: Union[dict, None]) -> Union[dict, None]:
+    if old is None or new is None:
+        return new
+    return {name: (old[name][0] if new[name][0] >= old[name][0] else -INF,
+                   old[name][1] if new[name][1] <= old[name][1] else INF) for name in new}
+
+
+def _multiply(x, y):
+    # 0 * inf 取 0
+    return 0 if x == 0 or y == 0 else x * y
+
+
+def _divide(x: int, y: int) -> int:
+    # 与两个后端一致, 向零取整
+    quotient = abs(x) // abs(y)
+    return quotient if (x < 0) == (y < 0) else -quotient
+
+
+def _binary(op: str, a: tuple, b: tuple) -> tuple:
+    if op == "+":
+        return a[0] + b[0], a[1] + b[1]
+    if op == "-":
+        return a[0] - b[1], a[1] - b[0]
+    if op == "*":
+        corners = [_multiply(x, y) for x in a for y in b]
+        return min(corners), max(corners)
+    # 除数为 0 时执行已经报错, 只需考虑除数的负数和正数两段; 同号区域内商对两个参数都单调
+    if INF in a or -INF in a or INF in b or -INF in b:
+        return TOP
+    parts = [part for part in ((b[0], min(b[1], -1)), (max(b[0], 1), b[1])) if part[0] <= part[1]]
+    corners = [_divide(x, y) for part in parts for x in a for y in part]
+    return (min(corners), max(corners)) if corners else TOP
+
+
+class RangeAnalysis:
+    # 数组下标的区间分析, 用来去掉可以证明不会越界的下标检查:
+    #   每个过程单独分析, 只跟踪属于该过程的 integer 变量 (var 参数除外); 局部变量从 0 开始 (两个后端都清零帧),
+    #   值参数和外层变量取任意值. 赋值按区间运算, if / while 的条件收窄两个分支里变量的区间 (x, x + c, x - c 形式),
+    #   while 迭代到不动点. 调用本过程内嵌套的过程时所有变量失效, 其他调用只有 var 实参失效, read 的目标失效
+    # 某次访问在所有可达状态下下标都在 [low, top] 之内即为安全; 不可达的访问保留检查
+    # 与 C 编译器一样假定整数运算不溢出 (C 中有符号溢出本身是未定义行为, 解释器的整数不会溢出)
+    __accesses: dict
+
+    def __init__(self, program: Procedure):
+        self.__accesses = {}
+        for procedure in program.walk():
+            self.__block(procedure.body, self.__entry(procedure), procedure)
+
+    def is_safe(self, ref: VarRef) -> bool:
+        access = self.__accesses.get(id(ref))
+        if not access:
+            return False
+        _, (low, top), array = access
+        return array.low <= low and top <= array.top
+
+    def get_range(self, ref: VarRef) -> Union[tuple, None]:
+        # 下标在所有可达状态下的区间, 无界一侧为 ±inf; 访问不可达时为 None
+        access = self.__accesses.get(id(ref))
+        return access[1] if access else None
+
+    def get_accesses(self) -> list:
+        # [(访问, 下标区间, 数组类型)], 按分析时遇到的顺序
+        return list(self.__accesses.values())
+
+    def count(self) -> tuple:
+        # (可以去掉的检查数, 数组访问总数)
+        return sum(1 for ref, _, _ in self.__accesses.values() if self.is_safe(ref)), len(self.__accesses)
+
+    # 变量
+
+    @staticmethod
+    def __entry(procedure: Procedure) -> dict:
+        state = {}
+        for decl in procedure.locals():
+            if not decl.by_ref and resolve_type(decl.type, procedure) is INTEGER:
+                state[decl.name] = TOP if decl.is_param else (0, 0)
+        return state
+
+    @staticmethod
+    def __tracked(expr, state: dict) -> Union[str, None]:
+        # 状态里只有本过程的 integer 变量, 同名的外层变量被遮蔽, 所以按名字判断即可
+        if isinstance(expr, VarRef) and expr.index is None and expr.field is None and expr.name in state:
+            return expr.name
+        return None
+
+    def __linear(self, expr, state: dict) -> Union[tuple, None]:
+        # x, x + c, c + x, x - c 返回 (x, c)
+        name = self.__tracked(expr, state)
+        if name:
+            return name, 0
+        if not isinstance(expr, BinOp) or expr.op not in "+-":
+            return None
+        left, right = expr.left, expr.right
+        if expr.op == "+" and isinstance(left, Const):
+            left, right = right, left
+        name = self.__tracked(left, state)
+        if not name or not isinstance(right, Const) or right.type is not INTEGER:
+            return None
+        return name, right.value if expr.op == "+" else -right.value
+
+    # 表达式
+
+    def __eval(self, expr, state: dict) -> tuple:
+        if isinstance(expr, Const):
+            value = ord(expr.value) if expr.type is CHAR else expr.value
+            return value, value
+        if isinstance(expr, VarRef):
+            name = self.__tracked(expr, state)
+            return state[name] if name else TOP
+        if isinstance(expr, BinOp):
+            return _binary(expr.op, self.__eval(expr.left, state), self.__eval(expr.right, state))
+        return TOP
+
+    def __visit(self, statement, state: dict, scope: Procedure) -> None:
+        # 记录语句中每个数组访问的下标区间, 与之前 (循环的前几轮) 记录的合并
+        for expr in statement_expressions(statement):
+            for ref in iter_expressions(expr):
+                if not isinstance(ref, VarRef) or ref.index is None:
+                    continue
+                array = self.__array_type(ref, scope)
+                if array is None:
+                    continue
+                low, top = self.__eval(ref.index, state)
+                if id(ref) in self.__accesses:
+                    _, (old_low, old_top), _ = self.__accesses[id(ref)]
+                    low, top = min(low, old_low), max(top, old_top)
+                self.__accesses[id(ref)] = ref, (low, top), array
+
+    @staticmethod
+    def __array_type(ref: VarRef, scope: Procedure) -> Union[ArrayType, None]:
+        decl, owner = lookup_variable(scope, ref.name)
+        if not decl:
+            return None
+        type = resolve_type(decl.type, owner)
+        if ref.field is not None:
+            field = type.get_field(ref.field) if isinstance(type, RecordType) else None
+            if not field:
+                return None
+            type = resolve_type(field.type, owner)
+        return type if isinstance(type, ArrayType) else None
+
+    def __refine(self, condition: Compare, state: Union[dict, None], truth: bool) -> Union[dict, None]:
+        # 条件为 truth 时的状态; 条件不可能为 truth 时返回 None
+        if state is None:
+            return None
+        left, right = self.__eval(condition.left, state), self.__eval(condition.right, state)
+        if condition.op == "<" and truth:
+            # l < r
+            left, right = (left[0], min(left[1], right[1] - 1)), (max(right[0], left[0] + 1), right[1])
+        elif condition.op == "<":
+            # r <= l
+            left, right = (max(left[0], right[0]), left[1]), (right[0], min(right[1], left[1]))
+        elif truth:
+            left = right = max(left[0], right[0]), min(left[1], right[1])
+        else:
+            # l != r 只能去掉与另一侧单点相同的端点
+            left, right = self.__exclude(left, right), self.__exclude(right, left)
+        if left[0] > left[1] or right[0] > right[1]:
+            return None
+        state = dict(state)
+        for expr, interval in ((condition.left, left), (condition.right, right)):
+            linear = self.__linear(expr, state)
+            if linear:
+                name, offset = linear
+                old = state[name]
+                state[name] = max(old[0], interval[0] - offset), min(old[1], interval[1] - offset)
+                if state[name][0] > state[name][1]:
+                    return None
+        return state
+
+    @staticmethod
+    def __exclude(interval: tuple, point: tuple) -> tuple:
+        if point[0] != point[1]:
+            return interval
+        if interval[0] == point[0]:
+            return interval[0] + 1, interval[1]
+        if interval[1] == point[0]:
+            return interval[0], interval[1] - 1
+        return interval
+
+    # 语句
+
+    def __block(self, statements: list, state: Union[dict, None], scope: Procedure) -> Union[dict, None]:
+        for statement in statements:
+            if state is None:
+                return None
+            state = self.__statement(statement, state, scope)
+        return state
+
+    def __statement(self, statement, state: dict, scope: Procedure) -> Union[dict, None]:
+        self.__visit(statement, state, scope)
+        if isinstance(statement, Assign):
+            name = self.__tracked(statement.target, state)
+            if name:
+                state = dict(state)
+                state[name] = self.__eval(statement.value, state)
+            return state
+        if isinstance(statement, Read):
+            name = self.__tracked(statement.target, state)
+            return {**state, name: TOP} if name else state
+        if isinstance(statement, Call):
+            return self.__call(statement, state, scope)
+        if isinstance(statement, If):
+            then_state = self.__block(statement.then_body, self.__refine(statement.condition, state, True), scope)
+            else_state = self.__block(statement.else_body, self.__refine(statement.condition, state, False), scope)
+            return _join(then_state, else_state)
+        if isinstance(statement, While):
+            return self.__loop(statement, state, scope)
+        if isinstance(statement, Return):
+            return None
+        return state
+
+    def __call(self, call: Call, state: dict, scope: Procedure) -> dict:
+        callee = lookup_procedure(scope, call.name)
+        if callee is None or callee.parent is scope:
+            # 嵌套过程通过静态链可以修改本过程的任何变量
+            return {name: TOP for name in state}
+        state = dict(state)
+        for param, arg in zip(callee.params, call.args):
+            name = self.__tracked(arg, state) if param.by_ref else None
+            if name:
+                state[name] = TOP
+        return state
+
+    def __loop(self, loop: While, state: dict, scope: Procedure) -> Union[dict, None]:
+        # 循环头的状态 = 入口状态并上每轮循环体的出口状态; 各轮的状态递增, 循环体中记录的区间取最后一轮即不动点
+        head = state
+        iteration = 0
+        while True:
+            body = self.__block(loop.body, self.__refine(loop.condition, head, True), scope)
+            following = _join(state, body)
+            if iteration >= WIDEN_AFTER:
+                following = _widen(head, following)
+            if following == head:
+                break
+            head = following
+            iteration += 1
+        # 最后一次判断条件时的状态就是循环头的状态
+        self.__visit(loop, head, scope)
+        return self.__refine(loop.condition, head, False)
@@ -0,0 +1,204 @@
+from typing import Union, Tuple
+
+from ir.nodes import *
+from ir.walk import iter_statements
+from ir.scope import lookup_variable, lookup_procedure, resolve_type
+
+
+def path_of(procedure: Procedure) -> str:
+    # 过程在嵌套结构中的路径, 主程序为 "", 例如 "outer/inner"
+    names = []
+    while procedure.parent:
+        names.append(procedure.name)
+        procedure = procedure.parent
+    return "/".join(reversed(names))
+
+
+def _type_owner(procedure: Procedure, name: str) -> Tuple[Union[TypeDecl, None], Union[Procedure, None]]:
+    scope = procedure
+    while scope:
+        decl = scope.find_type(name)
+        if decl:
+            return decl, scope
+        scope = scope.parent
+    return None, None
+
+
+def type_signature(type, scope: Procedure, decl: VarDecl = None) -> tuple:
+    # 类型的结构加上它的"身份": 数组和记录只有同一个类型对象才能互相赋值,
+    # 所以要区分是哪个类型别名, 或是哪一组变量声明里的匿名类型
+    resolved = resolve_type(type, scope)
+    if resolved is None:
+        return ("undefined",)
+    if isinstance(resolved, BaseType):
+        return (resolved.name,)
+    identity = None
+    owner = scope
+    while isinstance(type, NamedType):
+        alias, owner = _type_owner(owner, type.name)
+        identity = (path_of(owner), alias.name)
+        type = alias.type
+    if identity is None and decl is not None:
+        identity = tuple(sorted(d.name for d in scope.locals() if d.type is decl.type))
+    return resolved.to_string(), identity
+
+
+def signature(procedure: Procedure, kind: str, name: str):
+    # 从 procedure 的作用域查找名字, 返回影响检查结果的全部信息; 找不到时为 None
+    if kind == "variable":
+        decl, owner = lookup_variable(procedure, name)
+        if not decl:
+            return None
+        return path_of(owner), type_signature(decl.type, owner, decl), decl.by_ref
+    if kind == "type":
+        decl, owner = _type_owner(procedure, name)
+        if not decl:
+            return None
+        return path_of(owner), type_signature(NamedType(name, decl.line), owner)
+    callee = lookup_procedure(procedure, name)
+    if not callee:
+        return None
+    return path_of(callee), tuple((param.by_ref, type_signature(param.type, callee, param)) for param in callee.params)
+
+
+class ProcedureCheck:
+    # 一个过程的检查结果: 错误为 (信息, 相对过程首行的行号), 以及依赖的名字 (kind, name) -> signature
+    procedure: Procedure
+    errors: list
+    dependencies: dict
+
+    def __init__(self, procedure: Procedure):
+        self.procedure = procedure
+        self.errors = []
+        self.dependencies = {}
+
+    def error(self, message: str, line: int) -> None:
+        self.errors.append((message, line - self.procedure.line))
+
+    def get_errors(self) -> list:
+        return [f"{message} at [{self.procedure.line + line}]" for message, line in self.errors]
+
+
+class SemanticChecker:
+    # 按过程做语义检查: 每个过程只检查自己的声明和语句体, 嵌套过程单独检查;
+    # 检查中按名字查找的变量, 类型和过程都记为依赖, 供 IncrementalChecker 判断缓存是否失效
+
+    def check(self, program: Procedure) -> list:
+        errors = []
+        for procedure in program.walk():
+            errors += self.check_procedure(procedure).get_errors()
+        return errors
+
+    def check_procedure(self, procedure: Procedure) -> ProcedureCheck:
+        result = ProcedureCheck(procedure)
+        self.__declarations(procedure, result)
+        for statement in iter_statements(procedure.body):
+            self.__statement(statement, procedure, result)
+        return result
+
+    # 声明
+
+    def __declarations(self, procedure: Procedure, result: ProcedureCheck) -> None:
+        seen = set()
+        for decl in procedure.types + procedure.locals() + procedure.procedures:
+            if decl.name in seen:
+                result.error(f"Duplicate declaration `{decl.name}`", decl.line)
+            seen.add(decl.name)
+        for decl in procedure.types + procedure.locals():
+            self.__type(decl.type, procedure, result, decl.line)
+
+    def __type(self, type, procedure: Procedure, result: ProcedureCheck, line: int):
+        if isinstance(type, NamedType):
+            result.dependencies[("type", type.name)] = signature(procedure, "type", type.name)
+        resolved = resolve_type(type, procedure)
+        if resolved is None:
+            result.error(f"Undefined type `{type.to_string()}`", line)
+        elif isinstance(resolved, ArrayType) and resolved.low > resolved.top:
+            result.error(f"Empty array bounds `{resolved.to_string()}`", line)
+        return resolved
+
+    # 语句
+
+    def __statement(self, statement, procedure: Procedure, result: ProcedureCheck) -> None:
+        if isinstance(statement, Assign):
+            target = self.__expr(statement.target, procedure, result)
+            value = self.__expr(statement.value, procedure, result)
+            if target and value and not self.__compatible(target, value):
+                result.error("Assign type mismatch", statement.line)
+        elif isinstance(statement, Call):
+            self.__call(statement, procedure, result)
+        elif isinstance(statement, (If, While)):
+            self.__expr(statement.condition, procedure, result)
+        elif isinstance(statement, Read):
+            target = self.__expr(statement.target, procedure, result)
+            if target and not isinstance(target, BaseType):
+                result.error("Only integer and char variables can be read", statement.line)
+        elif isinstance(statement, Write):
+            value = self.__expr(statement.value, procedure, result)
+            if value and not isinstance(value, BaseType):
+                result.error("Only integer and char values can be written", statement.line)
+
+    def __call(self, call: Call, procedure: Procedure, result: ProcedureCheck) -> None:
+        result.dependencies[("procedure", call.name)] = signature(procedure, "procedure", call.name)
+        callee = lookup_procedure(procedure, call.name)
+        types = [self.__expr(arg, procedure, result) for arg in call.args]
+        if not callee:
+            result.error(f"Undefined procedure `{call.name}`", call.line)
+            return
+        if len(call.args) != len(callee.params):
+            result.error(f"Call parameter count mismatch for `{call.name}`", call.line)
+            return
+        for param, arg, type in zip(callee.params, call.args, types):
+            if param.by_ref and not isinstance(arg, VarRef):
+                result.error(f"Variable expected for var parameter `{param.name}`", call.line)
+            elif type and not self.__compatible(resolve_type(param.type, callee), type):
+                result.error(f"Parameter type mismatch for `{param.name}`", call.line)
+
+    # 表达式, 返回类型 (出错时为 None, 错误已记录)
+
+    def __expr(self, expr, procedure: Procedure, result: ProcedureCheck):
+        if isinstance(expr, Const):
+            return expr.type
+        if isinstance(expr, VarRef):
+            return self.__var_ref(expr, procedure, result)
+        left = self.__expr(expr.left, procedure, result)
+        right = self.__expr(expr.right, procedure, result)
+        if isinstance(expr, Compare):
+            if left and right and not (isinstance(left, BaseType) and left is right):
+                result.error(f"Compare type mismatch for `{expr.op}`", expr.line)
+            return None
+        if (left and left is not INTEGER) or (right and right is not INTEGER):
+            result.error(f"Integer operands expected for `{expr.op}`", expr.line)
+        return INTEGER
+
+    def __var_ref(self, ref: VarRef, procedure: Procedure, result: ProcedureCheck):
+        result.dependencies[("variable", ref.name)] = signature(procedure, "variable", ref.name)
+        index_type = self.__expr(ref.index, procedure, result) if ref.index is not None else None
+        decl, owner = lookup_variable(procedure, ref.name)
+        if not decl:
+            result.error(f"Undefined variable `{ref.name}`", ref.line)
+            return None
+        type = resolve_type(decl.type, owner)
+        if type is None:
+            return None
+        if ref.field is not None:
+            field = type.get_field(ref.field) if isinstance(type, RecordType) else None
+            if not field:
+                result.error(f"Undefined record field `{ref.name}.{ref.field}`", ref.line)
+                return None
+            type = field.type
+        if ref.index is not None:
+            if not isinstance(type, ArrayType):
+                result.error(f"`{ref.name}` is not an array", ref.line)
+                return None
+            if index_type and index_type is not INTEGER:
+                result.error(f"Array index of `{ref.name}` must be integer", ref.line)
+            elif isinstance(ref.index, Const) and not type.low <= ref.index.value <= type.top:
+                result.error(f"Array index {ref.index.value} out of range `{type.to_string()}`", ref.line)
+            type = type.element
+        return type
+
+    @staticmethod
+    def __compatible(target, value) -> bool:
+        # 基本类型按种类, 数组和记录必须是同一个类型
+        return target is value
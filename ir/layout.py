@@ -0,0 +1,170 @@
+from typing import Union
+
+from ir.nodes import *
+from ir.walk import iter_var_refs
+from ir.scope import lookup_variable, resolve_type
+
+
+# 存储单元 (cell) 是一个 integer 或 char; 数组和记录按元素/域连续存放
+# var 参数在帧里只占一个单元, 存放实参的地址
+
+
+class Slot:
+    # 帧里的一个变量或参数
+    name: str
+    type: Union[BaseType, ArrayType, RecordType]
+    offset: int
+    size: int
+    by_ref: bool
+
+    def __init__(self, name: str, type, offset: int, size: int, by_ref: bool):
+        self.name = name
+        self.type = type
+        self.offset = offset
+        self.size = size
+        self.by_ref = by_ref
+
+
+class Frame:
+    procedure: Procedure
+    level: int
+    size: int
+    slots: list
+
+    def __init__(self, procedure: Procedure):
+        self.procedure = procedure
+        self.level = procedure.level
+        self.size = 0
+        self.slots = []
+        self.__by_name = {}
+
+    def add_slot(self, slot: Slot) -> None:
+        self.slots.append(slot)
+        self.__by_name[slot.name] = slot
+        self.size = slot.offset + (1 if slot.by_ref else slot.size)
+
+    def get_slot(self, name: str) -> Union[Slot, None]:
+        return self.__by_name.get(name)
+
+    def to_string(self) -> str:
+        lines = [f"{self.procedure.name}: level {self.level}, {self.size} cells"]
+        for i, slot in enumerate(self.slots):
+            kind = "var param" if slot.by_ref else ("param" if i < len(self.procedure.params) else "var")
+            lines.append(f"  {slot.offset:>4}  {slot.name}: {slot.type.to_string()} ({kind}, {1 if slot.by_ref else slot.size} cells)")
+        return "\n".join(lines)
+
+
+class Access:
+    # 一次变量访问: 所属帧的层数 level, 帧内偏移 offset;
+    # by_ref 时 offset 处存放的是地址, 之后的 displacement (记录域偏移) 和下标都相对于该地址
+    # 下标访问的单元为 base + displacement + (index - low) * stride
+    level: int
+    offset: int
+    by_ref: bool
+    displacement: int
+    index: Union[Expr, None]
+    low: int
+    top: int
+    stride: int
+    type: Union[BaseType, ArrayType, RecordType]
+    size: int
+
+    def __init__(self, level: int, offset: int, by_ref: bool):
+        self.level = level
+        self.offset = offset
+        self.by_ref = by_ref
+        self.displacement = 0
+        self.index = None
+        self.low = 0
+        self.top = 0
+        self.stride = 1
+        self.type = None
+        self.size = 1
+
+
+class StorageLayout:
+    # 对整个程序做一次存储分配: 每个过程的帧大小, 变量/参数的偏移, 记录域偏移,
+    # 以及每个 VarRef 解析好的 (层数, 偏移); 执行时不再按名字沿作用域链查找
+    __program: Procedure
+
+    def __init__(self, program: Procedure):
+        self.__program = program
+        self.__sizes = {}
+        self.__field_offsets = {}
+        self.__frames = {}
+        self.__accesses = {}
+        for procedure in program.walk():
+            self.__frames[id(procedure)] = self.__frame(procedure)
+        for procedure in program.walk():
+            for ref in iter_var_refs(procedure.body):
+                self.__accesses[id(ref)] = self.__access(ref, procedure)
+
+    def get_program(self) -> Procedure:
+        return self.__program
+
+    def get_frame(self, procedure: Procedure) -> Frame:
+        return self.__frames[id(procedure)]
+
+    def get_frames(self) -> list:
+        return [self.__frames[id(procedure)] for procedure in self.__program.walk()]
+
+    def get_access(self, ref: VarRef) -> Access:
+        return self.__accesses[id(ref)]
+
+    def size_of(self, type) -> int:
+        # type 必须已经 resolve_type
+        if isinstance(type, BaseType):
+            return 1
+        if id(type) not in self.__sizes:
+            if isinstance(type, ArrayType):
+                self.__sizes[id(type)] = type.length() * self.size_of(type.element)
+            else:
+                offsets = {}
+                size = 0
+                for field in type.fields:
+                    offsets[field.name] = size
+                    size += self.size_of(field.type)
+                self.__field_offsets[id(type)] = offsets
+                self.__sizes[id(type)] = size
+        return self.__sizes[id(type)]
+
+    def field_offset(self, record: RecordType, name: str) -> int:
+        self.size_of(record)
+        return self.__field_offsets[id(record)][name]
+
+    def to_string(self) -> str:
+        return "\n".join(frame.to_string() for frame in self.get_frames())
+
+    def __frame(self, procedure: Procedure) -> Frame:
+        frame = Frame(procedure)
+        for decl in procedure.locals():
+            type = resolve_type(decl.type, procedure)
+            if type is None:
+                raise ValueError(f"Undefined type `{decl.type.to_string()}` at [{decl.line}]")
+            frame.add_slot(Slot(decl.name, type, frame.size, self.size_of(type), decl.by_ref))
+        return frame
+
+    def __access(self, ref: VarRef, procedure: Procedure) -> Access:
+        decl, owner = lookup_variable(procedure, ref.name)
+        if not decl:
+            raise ValueError(f"Undefined variable `{ref.name}` at [{ref.line}]")
+        slot = self.get_frame(owner).get_slot(decl.name)
+        access = Access(owner.level, slot.offset, slot.by_ref)
+        type = slot.type
+        if ref.field is not None:
+            field = type.get_field(ref.field) if isinstance(type, RecordType) else None
+            if not field:
+                raise ValueError(f"Undefined record field `{ref.name}.{ref.field}` at [{ref.line}]")
+            access.displacement = self.field_offset(type, field.name)
+            type = field.type
+        if ref.index is not None:
+            if not isinstance(type, ArrayType):
+                raise ValueError(f"`{ref.name}` is not an array at [{ref.line}]")
+            access.index = ref.index
+            access.low = type.low
+            access.top = type.top
+            access.stride = self.size_of(type.element)
+            type = type.element
+        access.type = type
+        access.size = self.size_of(type)
+        return access
@@ -0,0 +1,290 @@
+from typing import Union
+
+
+# 类型
+
+class BaseType:
+    name: str
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def to_string(self) -> str:
+        return self.name
+
+    def __reduce__(self):
+        # INTEGER 和 CHAR 是单例, 类型比较都用 is; pickle 时按模块里的名字引用, 传给其它进程后仍是同一个对象
+        return self.name.upper()
+
+
+INTEGER = BaseType("integer")
+CHAR = BaseType("char")
+
+
+class ArrayType:
+    low: int
+    top: int
+    element: BaseType
+
+    def __init__(self, low: int, top: int, element: BaseType):
+        self.low = low
+        self.top = top
+        self.element = element
+
+    def length(self) -> int:
+        return self.top - self.low + 1
+
+    def to_string(self) -> str:
+        return f"array [{self.low}..{self.top}] of {self.element.to_string()}"
+
+
+class Field:
+    name: str
+    type: Union[BaseType, ArrayType]
+    line: int
+
+    def __init__(self, name: str, type: Union[BaseType, ArrayType], line: int):
+        self.name = name
+        self.type = type
+        self.line = line
+
+
+class RecordType:
+    fields: list
+
+    def __init__(self, fields: list):
+        self.fields = fields
+
+    def get_field(self, name: str) -> Union[Field, None]:
+        for field in self.fields:
+            if field.name == name:
+                return field
+        return None
+
+    def to_string(self) -> str:
+        return "record " + " ".join(f"{f.type.to_string()} {f.name};" for f in self.fields) + " end"
+
+
+class NamedType:
+    # 引用 `type` 段里声明的类型, 由作用域解析
+    name: str
+    line: int
+
+    def __init__(self, name: str, line: int):
+        self.name = name
+        self.line = line
+
+    def to_string(self) -> str:
+        return self.name
+
+
+# 表达式
+
+class Const:
+    value: Union[int, str]
+    type: BaseType
+    line: int
+
+    def __init__(self, value: Union[int, str], type: BaseType, line: int):
+        self.value = value
+        self.type = type
+        self.line = line
+
+
+class VarRef:
+    # SNL 的变量访问只有 a, a[e], a.f, a.f[e] 四种形式
+    name: str
+    index: Union["Expr", None]
+    field: Union[str, None]
+    line: int
+
+    def __init__(self, name: str, line: int, index=None, field: str = None):
+        self.name = name
+        self.line = line
+        self.index = index
+        self.field = field
+
+
+class BinOp:
+    op: str
+    left: "Expr"
+    right: "Expr"
+    line: int
+
+    def __init__(self, op: str, left, right, line: int):
+        self.op = op
+        self.left = left
+        self.right = right
+        self.line = line
+
+
+class Compare:
+    op: str
+    left: "Expr"
+    right: "Expr"
+    line: int
+
+    def __init__(self, op: str, left, right, line: int):
+        self.op = op
+        self.left = left
+        self.right = right
+        self.line = line
+
+
+Expr = Union[Const, VarRef, BinOp]
+
+
+# 语句
+
+class Assign:
+    target: VarRef
+    value: Expr
+    line: int
+
+    def __init__(self, target: VarRef, value, line: int):
+        self.target = target
+        self.value = value
+        self.line = line
+
+
+class Call:
+    name: str
+    args: list
+    line: int
+
+    def __init__(self, name: str, args: list, line: int):
+        self.name = name
+        self.args = args
+        self.line = line
+
+
+class If:
+    condition: Compare
+    then_body: list
+    else_body: list
+    line: int
+
+    def __init__(self, condition: Compare, then_body: list, else_body: list, line: int):
+        self.condition = condition
+        self.then_body = then_body
+        self.else_body = else_body
+        self.line = line
+
+
+class While:
+    condition: Compare
+    body: list
+    line: int
+
+    def __init__(self, condition: Compare, body: list, line: int):
+        self.condition = condition
+        self.body = body
+        self.line = line
+
+
+class Read:
+    target: VarRef
+    line: int
+
+    def __init__(self, target: VarRef, line: int):
+        self.target = target
+        self.line = line
+
+
+class Write:
+    value: Expr
+    line: int
+
+    def __init__(self, value, line: int):
+        self.value = value
+        self.line = line
+
+
+class Return:
+    line: int
+
+    def __init__(self, line: int):
+        self.line = line
+
+
+# 声明
+
+class TypeDecl:
+    name: str
+    type: Union[BaseType, ArrayType, RecordType, NamedType]
+    line: int
+
+    def __init__(self, name: str, type, line: int):
+        self.name = name
+        self.type = type
+        self.line = line
+
+
+class VarDecl:
+    name: str
+    type: Union[BaseType, ArrayType, RecordType, NamedType]
+    line: int
+    is_param: bool
+    by_ref: bool
+
+    def __init__(self, name: str, type, line: int, is_param: bool = False, by_ref: bool = False):
+        self.name = name
+        self.type = type
+        self.line = line
+        self.is_param = is_param
+        self.by_ref = by_ref
+
+
+class Procedure:
+    # 主程序也是一个 Procedure (level 0, 没有 parent)
+    name: str
+    line: int
+    level: int
+    parent: Union["Procedure", None]
+    params: list
+    types: list
+    variables: list
+    procedures: list
+    body: list
+
+    def __init__(self, name: str, line: int, parent: Union["Procedure", None] = None):
+        self.name = name
+        self.line = line
+        self.parent = parent
+        self.level = parent.level + 1 if parent else 0
+        self.params = []
+        self.types = []
+        self.variables = []
+        self.procedures = []
+        self.body = []
+
+    def is_program(self) -> bool:
+        return self.parent is None
+
+    def locals(self) -> list:
+        return self.params + self.variables
+
+    def find_type(self, name: str) -> Union[TypeDecl, None]:
+        for decl in self.types:
+            if decl.name == name:
+                return decl
+        return None
+
+    def find_variable(self, name: str) -> Union[VarDecl, None]:
+        for decl in self.params + self.variables:
+            if decl.name == name:
+                return decl
+        return None
+
+    def find_procedure(self, name: str) -> Union["Procedure", None]:
+        for procedure in self.procedures:
+            if procedure.name == name:
+                return procedure
+        return None
+
+    def walk(self) -> list:
+        # 自身及所有嵌套过程, 先序
+        result = [self]
+        for procedure in self.procedures:
+            result += procedure.walk()
+        return result
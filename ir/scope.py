@@ -0,0 +1,73 @@
+from typing import Union, Tuple
+
+from ir.nodes import *
+
+
+def lookup_variable(procedure: Procedure, name: str) -> Tuple[Union[VarDecl, None], Union[Procedure, None]]:
+    # 返回变量声明及其所属过程, 由内向外查找
+    scope = procedure
+    while scope:
+        decl = scope.find_variable(name)
+        if decl:
+            return decl, scope
+        scope = scope.parent
+    return None, None
+
+
+def lookup_procedure(procedure: Procedure, name: str) -> Union[Procedure, None]:
+    scope = procedure
+    while scope:
+        found = scope.find_procedure(name)
+        if found:
+            return found
+        scope = scope.parent
+    return None
+
+
+def lookup_type(procedure: Procedure, name: str) -> Union[TypeDecl, None]:
+    scope = procedure
+    while scope:
+        decl = scope.find_type(name)
+        if decl:
+            return decl
+        scope = scope.parent
+    return None
+
+
+def resolve_type(type, procedure: Procedure):
+    # 展开类型别名, 未定义或循环定义时返回 None
+    seen = set()
+    while isinstance(type, NamedType):
+        if type.name in seen:
+            return None
+        seen.add(type.name)
+        decl = lookup_type(procedure, type.name)
+        if not decl:
+            return None
+        type = decl.type
+    return type
+
+
+def type_of(expr, procedure: Procedure):
+    if isinstance(expr, Const):
+        return expr.type
+    if isinstance(expr, BinOp):
+        return INTEGER
+    if isinstance(expr, VarRef):
+        decl, _ = lookup_variable(procedure, expr.name)
+        if not decl:
+            return None
+        type = resolve_type(decl.type, procedure)
+        if expr.field is not None:
+            if not isinstance(type, RecordType):
+                return None
+            field = type.get_field(expr.field)
+            if not field:
+                return None
+            type = field.type
+        if expr.index is not None:
+            if not isinstance(type, ArrayType):
+                return None
+            type = type.element
+        return type
+    return None
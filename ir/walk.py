@@ -0,0 +1,52 @@
+from typing import Iterator
+
+from ir.nodes import *
+
+
+def iter_statements(body: list) -> Iterator:
+    # 语句体里的所有语句, 包括 if / while 内部的, 先序
+    stack = list(reversed(body))
+    while stack:
+        statement = stack.pop()
+        yield statement
+        if isinstance(statement, If):
+            stack.extend(reversed(statement.else_body))
+            stack.extend(reversed(statement.then_body))
+        elif isinstance(statement, While):
+            stack.extend(reversed(statement.body))
+
+
+def statement_expressions(statement) -> list:
+    # 语句直接包含的表达式 (不进入子语句)
+    if isinstance(statement, Assign):
+        return [statement.target, statement.value]
+    if isinstance(statement, Call):
+        return list(statement.args)
+    if isinstance(statement, (If, While)):
+        return [statement.condition]
+    if isinstance(statement, Read):
+        return [statement.target]
+    if isinstance(statement, Write):
+        return [statement.value]
+    return []
+
+
+def iter_expressions(expr) -> Iterator:
+    # 表达式及其所有子表达式, 先序; 数组下标也算子表达式
+    stack = [expr]
+    while stack:
+        expr = stack.pop()
+        yield expr
+        if isinstance(expr, (BinOp, Compare)):
+            stack.append(expr.right)
+            stack.append(expr.left)
+        elif isinstance(expr, VarRef) and expr.index is not None:
+            stack.append(expr.index)
+
+
+def iter_var_refs(body: list) -> Iterator[VarRef]:
+    for statement in iter_statements(body):
+        for expr in statement_expressions(statement):
+            for sub in iter_expressions(expr):
+                if isinstance(sub, VarRef):
+                    yield sub
@@ -0,0 +1,137 @@
+import os
+import bisect
+import multiprocessing
+from typing import Union
+from concurrent.futures import ProcessPoolExecutor
+
+from lexer.log import logger
+from lexer.Token import Token, TokenType
+from lexer.scanner import Lexer, LexerResult
+from lexer.PhaseMetrics import PhaseMetrics
+
+
+def _init_worker(quiet: bool) -> None:
+    logger.set_quiet(quiet)
+
+
+def _lex_chunk(text: str, first_line: int, last: bool) -> tuple:
+    # 返回 (token 元组列表, 是否可以直接拼接); 元组比 Token 对象序列化快得多
+    lexer = Lexer()
+    tokens = [(token.line, token.column, token.token_type, token.value) for token in lexer.iter_tokens(list(text), first_line)]
+    # 块之间唯一的状态 (注释) 已由切分保证不跨块; 块内出错或提前遇到结束的 `.` 时, 块尾的状态可能延续到下一块,
+    # 这类块交给调用方从块首顺序重新分析
+    clean = not lexer.errors and (last or all(token[2] != TokenType.EOF for token in tokens))
+    return tokens, clean
+
+
+def comment_spans(text: str) -> list:
+    # 预扫描: 注释外的 `{` 开始一个注释, 到下一个 `}` 结束; 未闭合的注释延伸到文件末尾
+    # 只在词法分析器会报错的位置 (如 `'{'`) 与真实状态不同, 那样的块会回退到顺序分析
+    spans = []
+    position = text.find("{")
+    while position != -1:
+        end = text.find("}", position + 1)
+        if end == -1:
+            spans.append((position, len(text)))
+            break
+        spans.append((position, end))
+        position = text.find("{", end + 1)
+    return spans
+
+
+def split_chunks(text: str, chunk_size: int) -> list:
+    # 按约 chunk_size 个字符切分, 切点紧跟在换行符之后且不在注释中; 返回 [(start, end, first_line)]
+    spans = comment_spans(text)
+    starts = [span[0] for span in spans]
+    chunks = []
+    start, line = 0, 1
+    while start < len(text):
+        end = text.find("\n", min(start + chunk_size, len(text)) - 1)
+        while end != -1:
+            i = bisect.bisect_right(starts, end) - 1
+            if i < 0 or spans[i][1] < end:
+                break
+            end = text.find("\n", spans[i][1])
+        end = len(text) if end == -1 else end + 1
+        chunks.append((start, end, line))
+        line += text.count("\n", start, end)
+        start = end
+    return chunks
+
+
+class ParallelLexer:
+    # 大文件的分块词法分析: 在换行处切块, 进程池中各块独立分析, 再按块的起始行号合并;
+    # 结果 (token 的行列, 错误信息) 与 Lexer 顺序分析完全相同. 小于两块的输入直接顺序分析
+    __workers: int
+    __chunk_size: int
+    __executor: Union[ProcessPoolExecutor, None]
+
+    def __init__(self, workers: int = 0, chunk_size: int = 1 << 20, metrics: bool = False, trace_memory: bool = False):
+        if chunk_size < 1:
+            raise ValueError("Chunk size must be positive.")
+        self.__workers = workers or os.cpu_count() or 1
+        self.__chunk_size = chunk_size
+        self.__executor = None
+        self.metrics = metrics
+        self.trace_memory = trace_memory
+
+    def get_workers(self) -> int:
+        return self.__workers
+
+    def get_chunk_size(self) -> int:
+        return self.__chunk_size
+
+    def get_result(self, fp: Union[list, str]) -> LexerResult:
+        result = LexerResult()
+        if not self.metrics:
+            self.__lex(fp, result)
+        else:
+            with PhaseMetrics("lex", self.trace_memory) as metrics:
+                self.__lex(fp, result)
+            metrics.token_count = len(result.get_token_list())
+            result.set_metrics(metrics)
+        return result
+
+    def close(self) -> None:
+        if self.__executor:
+            self.__executor.shutdown(cancel_futures=True)
+            self.__executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __lex(self, fp: Union[list, str], result: LexerResult) -> None:
+        text = fp if isinstance(fp, str) else "".join(fp)
+        chunks = split_chunks(text, self.__chunk_size) if text else []
+        if len(chunks) < 2 or self.__workers < 2:
+            lexer = Lexer()
+            result.set_token_list(list(lexer.iter_tokens(list(text))))
+            result.set_errors(lexer.errors)
+            return
+        executor = self.__get_executor()
+        futures = [executor.submit(_lex_chunk, text[start:end], line, i == len(chunks) - 1)
+                   for i, (start, end, line) in enumerate(chunks)]
+        token_list = result.get_token_list()
+        for i, future in enumerate(futures):
+            tokens, clean = future.result()
+            if not clean:
+                # 之前的块都正常结束在换行处, 从这一块开始顺序分析即与整个文件的顺序分析一致
+                for rest in futures[i + 1:]:
+                    rest.cancel()
+                start, _, line = chunks[i]
+                lexer = Lexer()
+                token_list += lexer.iter_tokens(list(text[start:]), line)
+                result.set_errors(lexer.errors)
+                logger.info(f"chunk {i} restarted sequentially")
+                return
+            token_list += [Token(*token) for token in tokens]
+
+    def __get_executor(self) -> ProcessPoolExecutor:
+        if not self.__executor:
+            context = multiprocessing.get_context("forkserver")
+            self.__executor = ProcessPoolExecutor(self.__workers, mp_context=context, initializer=_init_worker,
+                                                  initargs=(logger.is_quiet(),))
+        return self.__executor
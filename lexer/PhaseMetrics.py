@@ -0,0 +1,95 @@
+import sys
+import time
+import tracemalloc
+from typing import Union, Iterable, Iterator
+
+# 正在统计内存的阶段; tracemalloc 只有一个全局峰值, 阶段可以嵌套 (流水线里词法分段嵌在语法分析中),
+# 重置峰值前先把当前峰值计入这些阶段
+_tracing = []
+
+
+class PhaseMetrics:
+    # 一个编译阶段的资源统计; start/stop 可以成对调用多次, 结果累加
+    # (流水线模式下词法分析在每次取 token 时才运行, 只能分段计时)
+    phase: str
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+    # 阶段结束时比开始时多出的内存块数, 即该阶段留存下来的对象数量
+    allocated_blocks: int = 0
+    # 仅在 trace_memory 时统计, 单位字节
+    peak_memory: Union[int, None] = None
+    token_count: int = 0
+    node_count: int = 0
+
+    def __init__(self, phase: str, trace_memory: bool = False):
+        self.phase = phase
+        self.__trace_memory = trace_memory
+        self.__started_tracing = False
+        self.__start = (0.0, 0.0, 0, 0)
+
+    def start(self) -> None:
+        traced = 0
+        if self.__trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.__started_tracing = True
+            traced, peak = tracemalloc.get_traced_memory()
+            for metrics in _tracing:
+                metrics.__record_peak(peak)
+            tracemalloc.reset_peak()
+            _tracing.append(self)
+        self.__start = (time.perf_counter(), time.process_time(), sys.getallocatedblocks(), traced)
+
+    def stop(self) -> None:
+        wall, cpu, blocks, _ = self.__start
+        self.wall_time += time.perf_counter() - wall
+        self.cpu_time += time.process_time() - cpu
+        self.allocated_blocks += sys.getallocatedblocks() - blocks
+        if self.__trace_memory:
+            self.__record_peak(tracemalloc.get_traced_memory()[1])
+            _tracing.remove(self)
+            if self.__started_tracing:
+                tracemalloc.stop()
+                self.__started_tracing = False
+
+    def __record_peak(self, peak: int) -> None:
+        self.peak_memory = max(self.peak_memory or 0, peak - self.__start[3])
+
+    def iterate(self, items: Iterable) -> Iterator:
+        # 只统计取下一个元素所花的时间, 消费者处理元素的时间不计入
+        iterator = iter(items)
+        while True:
+            self.start()
+            item = next(iterator, None)
+            self.stop()
+            if item is None:
+                return
+            self.token_count += 1
+            yield item
+
+    def subtract(self, other) -> None:
+        # 从本阶段中扣除嵌套在其中运行的另一阶段
+        self.wall_time -= other.wall_time
+        self.cpu_time -= other.cpu_time
+        self.allocated_blocks -= other.allocated_blocks
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def to_dict(self) -> dict:
+        return {
+            "phase": self.phase, "wall_time": self.wall_time, "cpu_time": self.cpu_time,
+            "allocated_blocks": self.allocated_blocks, "peak_memory": self.peak_memory,
+            "token_count": self.token_count, "node_count": self.node_count
+        }
+
+    def to_string(self) -> str:
+        memory = "-" if self.peak_memory is None else f"{self.peak_memory / 1024:.1f}KiB"
+        return (
+            f"{self.phase}: wall={self.wall_time * 1000:.2f}ms cpu={self.cpu_time * 1000:.2f}ms "
+            f"blocks={self.allocated_blocks} peak={memory} tokens={self.token_count} nodes={self.node_count}"
+        )
@@ -0,0 +1,150 @@
+import struct
+import weakref
+from array import array
+from typing import Iterable, Iterator
+from multiprocessing import shared_memory
+
+from lexer.Token import Token, TokenType
+
+# TokenType 按定义顺序编号 (别名不单独编号), 一个字节即可
+TYPES = list(TokenType)
+CODES = {token_type: code for code, token_type in enumerate(TYPES)}
+
+MAGIC = b"SNLT"
+# 魔数, token 数, 不同取值的个数, 取值文本的字节数
+HEADER = struct.Struct("<4sIII")
+
+
+def _layout(count: int, value_count: int) -> tuple:
+    # 各段的起始偏移: 类别码 (B), 行 (i), 列 (i), 取值编号 (I), 取值文本的偏移表 (I), 文本; 4 字节对齐
+    types = HEADER.size
+    lines = types + (count + 3) // 4 * 4
+    columns = lines + 4 * count
+    values = columns + 4 * count
+    offsets = values + 4 * count
+    text = offsets + 4 * (value_count + 1)
+    return types, lines, columns, values, offsets, text
+
+
+def _release(memory: shared_memory.SharedMemory, views: list, unlink: bool) -> None:
+    for view in views:
+        view.release()
+    views.clear()
+    memory.close()
+    if unlink:
+        try:
+            memory.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class TokenBuffer:
+    # 共享内存中的 token 序列, 供多个进程直接读取, 不经过 pickle:
+    #   token 的类别码, 行, 列各占一个定长数组; 取值 (标识符, 数字, 关键字) 去重后存一份, token 只存编号
+    # 创建者 (create) 负责 unlink, 使用者 (attach) 只 close; 两者都应在 with 块或 close 中结束,
+    # 创建者忘记释放时由 finalizer 在对象回收或解释器退出时兜底 unlink
+    __memory: shared_memory.SharedMemory
+    __owner: bool
+    __views: list
+    __types: memoryview
+    __lines: memoryview
+    __columns: memoryview
+    __values: memoryview
+    __table: list
+
+    def __init__(self, memory: shared_memory.SharedMemory, owner: bool):
+        self.__memory = memory
+        self.__owner = owner
+        magic, count, value_count, text_size = HEADER.unpack_from(memory.buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Shared memory block `{memory.name}` is not a token buffer.")
+        types, lines, columns, values, offsets, text = _layout(count, value_count)
+        buf = memory.buf
+        self.__types = buf[types:types + count]
+        self.__lines = buf[lines:columns].cast("i")
+        self.__columns = buf[columns:values].cast("i")
+        self.__values = buf[values:offsets].cast("I")
+        bounds = buf[offsets:text].cast("I")
+        # 取值表很小 (不同取值的个数), 解码一次; 逐个 token 的数据始终留在共享内存里
+        data = bytes(buf[text:text + text_size])
+        self.__table = [data[bounds[i]:bounds[i + 1]].decode("utf-8") for i in range(value_count)]
+        self.__views = [self.__types, self.__lines, self.__columns, self.__values, bounds]
+        self.__finalizer = weakref.finalize(self, _release, memory, self.__views, owner)
+
+    @classmethod
+    def create(cls, tokens: Iterable[Token]):
+        tokens = tokens if isinstance(tokens, list) else list(tokens)
+        table = {}
+        for token in tokens:
+            table.setdefault(token.value, len(table))
+        encoded = [value.encode("utf-8") for value in table]
+        bounds = array("I", [0])
+        for value in encoded:
+            bounds.append(bounds[-1] + len(value))
+        count, value_count = len(tokens), len(table)
+        types, lines, columns, values, offsets, text = _layout(count, value_count)
+        size = text + bounds[-1]
+        memory = shared_memory.SharedMemory(create=True, size=size)
+        try:
+            buf = memory.buf
+            HEADER.pack_into(buf, 0, MAGIC, count, value_count, bounds[-1])
+            buf[types:types + count] = bytes(CODES[token.token_type] for token in tokens)
+            buf[lines:columns] = array("i", [token.line for token in tokens]).tobytes()
+            buf[columns:values] = array("i", [token.column for token in tokens]).tobytes()
+            buf[values:offsets] = array("I", [table[token.value] for token in tokens]).tobytes()
+            buf[offsets:text] = bounds.tobytes()
+            buf[text:size] = b"".join(encoded)
+            del buf
+        except BaseException:
+            memory.close()
+            memory.unlink()
+            raise
+        return cls(memory, True)
+
+    @classmethod
+    def attach(cls, name: str):
+        try:
+            memory = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # 3.13 之前 attach 也会登记到 resource_tracker; multiprocessing 启动的 worker 与创建者共用同一个 tracker,
+            # 重复登记没有影响, 不能在这里注销, 否则会连同创建者的登记一起删除
+            memory = shared_memory.SharedMemory(name=name)
+        return cls(memory, False)
+
+    def get_name(self) -> str:
+        return self.__memory.name
+
+    def is_owner(self) -> bool:
+        return self.__owner
+
+    def is_closed(self) -> bool:
+        return not self.__finalizer.alive
+
+    def __len__(self) -> int:
+        return len(self.__types)
+
+    def get_token(self, i: int) -> Token:
+        return Token(self.__lines[i], self.__columns[i], TYPES[self.__types[i]], self.__table[self.__values[i]])
+
+    def get_token_type(self, i: int) -> TokenType:
+        return TYPES[self.__types[i]]
+
+    def get_values(self) -> list:
+        return self.__table
+
+    def __iter__(self) -> Iterator[Token]:
+        # 按需构造 Token, 语法分析消费到哪里才读到哪里
+        lines, columns, types, values, table = self.__lines, self.__columns, self.__types, self.__values, self.__table
+        for i in range(len(types)):
+            yield Token(lines[i], columns[i], TYPES[types[i]], table[values[i]])
+
+    def close(self) -> None:
+        # 创建者 close 时同时 unlink; 之后 attach 同名内存块会失败, 已 attach 的使用者不受影响
+        self.__finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
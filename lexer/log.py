@@ -0,0 +1,44 @@
+import functools
+
+
+def _discard(*args, **kwargs) -> None:
+    return None
+
+
+class LazyLogger:
+    # 导入 loguru 大约要 60ms, 比一次小文件的编译还慢, 所以推迟到第一次真正输出日志时
+    __quiet: bool = False
+
+    def set_quiet(self, quiet: bool) -> None:
+        self.__quiet = quiet
+        for name in [name for name in self.__dict__ if not name.startswith("_LazyLogger")]:
+            del self.__dict__[name]
+
+    def is_quiet(self) -> bool:
+        return self.__quiet
+
+    def __getattr__(self, name: str):
+        if self.__quiet:
+            value = _discard
+        else:
+            from loguru import logger
+            value = getattr(logger, name)
+        # 缓存到实例上, 之后的调用不再经过 __getattr__
+        self.__dict__[name] = value
+        return value
+
+    def catch(self, function):
+        # 与 loguru 的 logger.catch 行为一致: 记录异常并返回 None, 但装饰时不需要导入 loguru
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            try:
+                return function(*args, **kwargs)
+            except Exception:
+                if not self.__quiet:
+                    self.opt(exception=True).error(f"An error has been caught in function '{function.__qualname__}'")
+                return None
+
+        return wrapper
+
+
+logger = LazyLogger()
@@ -1,10 +1,10 @@
 from enum import Enum
-from typing import Union
-from loguru import logger
-from prettytable import PrettyTable
+from typing import Union, Iterator
 
+from lexer.log import logger
 from lexer.utils import *
 from lexer.Token import *
+from lexer.PhaseMetrics import PhaseMetrics
 
 
 class State(Enum):
@@ -22,6 +22,12 @@ class State(Enum):
 class LexerResult:
     token_list: list = []
     errors: list = []
+    metrics: Union[PhaseMetrics, None] = None
+
+    def __init__(self):
+        self.token_list = []
+        self.errors = []
+        self.metrics = None
 
     def get_errors(self) -> list:
         return self.errors
@@ -35,6 +41,12 @@ class LexerResult:
     def set_token_list(self, token_list: list) -> None:
         self.token_list = token_list
 
+    def get_metrics(self) -> Union[PhaseMetrics, None]:
+        return self.metrics
+
+    def set_metrics(self, metrics: PhaseMetrics) -> None:
+        self.metrics = metrics
+
 
 class Lexer:
     get_me_first: str = None
@@ -44,6 +56,20 @@ class Lexer:
     fp: list = []
     fp_index: int = -1
 
+    def __init__(self, metrics: bool = False, trace_memory: bool = False):
+        self.metrics = metrics
+        self.trace_memory = trace_memory
+        self.reset()
+
+    def reset(self) -> None:
+        # 实例可以反复使用, 每次分析前回到初始状态; 交给结果对象的列表重新创建, 不与之前的结果共享
+        self.get_me_first = None
+        self.line = 1
+        self.column = 0
+        self.fp_index = -1
+        self.fp = []
+        self.errors = []
+
     @staticmethod
     def is_blank(char: str) -> bool:
         return char in ('', ' ', '\r', '\n')
@@ -68,25 +94,30 @@ class Lexer:
         return ch
 
     def get_result(self, fp: list) -> LexerResult:
-        token_list: list = []
-        errors: list = []
         result: LexerResult = LexerResult()
-        if not fp:
-            errors.append("Input must not be not null.")
-            result.set_errors(errors)
-            result.set_token_list(token_list)
-            return result
+        if not self.metrics:
+            result.set_token_list(list(self.iter_tokens(fp)))
         else:
-            self.fp = fp
+            with PhaseMetrics("lex", self.trace_memory) as metrics:
+                result.set_token_list(list(self.iter_tokens(fp)))
+            metrics.token_count = len(result.get_token_list())
+            result.set_metrics(metrics)
+        result.set_errors(self.errors)
+        return result
+
+    def iter_tokens(self, fp: list, first_line: int = 1) -> Iterator[Token]:
+        # 逐个产出 token, 语法分析可以边词法分析边消费, 不必等整个 token 表生成
+        # first_line 是 fp 第一行在整个文件中的行号, 分块词法分析时用
+        self.reset()
+        if not fp:
+            self.errors.append("Input must not be not null.")
+            return
+        self.fp = fp
+        self.line = first_line
+        token = self.get_token()
+        while token:
+            yield token
             token = self.get_token()
-            while token:
-                token_list.append(token)
-                token = self.get_token()
-            result.set_token_list(token_list)
-            result.set_errors(self.errors)
-            for error in errors:
-                logger.warning(error)
-            return result
 
     def get_token(self) -> Union[None, Token]:
         state = State.Normal
@@ -198,7 +229,8 @@ class Lexer:
             elif state == State.InComment:
                 # logger.info("state: InComment")
                 string = string[:-1]
-                while char != '' and char != '}':
+                # get_char 在输入结束时返回 None, 未闭合的注释到此为止
+                while char and char != '}':
                     char = self.get_char()
                 state = State.Normal
                 if char != '}':
@@ -235,9 +267,10 @@ class Lexer:
             elif state == State.InChar:
                 # logger.info("state: InChar")
                 if isalnum(char):
+                    # 结束的引号没有加入 string, string 就是字符本身
                     char = self.get_char()
                     if char == '\'':
-                        token = Token.by_data(self.line, self.column, TokenType.CHARACTER, string[:-1])
+                        token = Token.by_data(self.line, self.column, TokenType.CHARACTER, string)
                         logger.success(f"get token:{token.to_string()}")
                         return token
                 state = State.Error
@@ -264,6 +297,8 @@ class Lexer:
 
 
 def main():
+    from prettytable import PrettyTable
+
     with open("demo2.txt", "r", encoding="utf-8") as r:
         fp = list(r.read())
     # print(''.join(fp))
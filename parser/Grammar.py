@@ -0,0 +1,258 @@
+from lexer.TokenType import TokenType
+
+T = TokenType
+
+# 每个 TokenType (别名除外) 按定义顺序占一位, token 集合就是一个整数
+BITS = {token_type: 1 << i for i, token_type in enumerate(TokenType)}
+
+# SNL 文法, 与 RecursiveDescentParser 中各分析函数注释里的编号一致
+# (编号, 左部, 右部): 右部中 TokenType 是终结符, 字符串是非终结符, 空元组是 ɛ
+PRODUCTIONS = (
+    (1, "Program", ("ProgramHead", "DeclarePart", "ProgramBody", T.EOF)),
+    (2, "ProgramHead", (T.PROGRAM, "ProgramName")),
+    (3, "ProgramName", (T.ID,)),
+    (4, "DeclarePart", ("TypeDecPart", "VarDecPart", "ProcDecPart")),
+    (5, "TypeDecPart", ()),
+    (6, "TypeDecPart", ("TypeDec",)),
+    (7, "TypeDec", (T.TYPE, "TypeDecList")),
+    (8, "TypeDecList", ("TypeId", T.EQ, "TypeDef", T.SEMI, "TypeDecMore")),
+    (9, "TypeDecMore", ()),
+    (10, "TypeDecMore", ("TypeDecList",)),
+    (11, "TypeId", (T.ID,)),
+    (12, "TypeDef", ("BaseType",)),
+    (13, "TypeDef", ("StructureType",)),
+    (14, "TypeDef", (T.ID,)),
+    (15, "BaseType", (T.INTEGER,)),
+    (16, "BaseType", (T.CHAR,)),
+    (17, "StructureType", ("ArrayType",)),
+    (18, "StructureType", ("RecType",)),
+    (19, "ArrayType", (T.ARRAY, T.LMIDPAREN, "Low", T.UNDERRANGE, "Top", T.RMIDPAREN, T.OF, "BaseType")),
+    (20, "Low", (T.INTC,)),
+    (21, "Top", (T.INTC,)),
+    (22, "RecType", (T.RECORD, "FieldDecList", T.END)),
+    (23, "FieldDecList", ("BaseType", "IdList", T.SEMI, "FieldDecMore")),
+    (24, "FieldDecList", ("ArrayType", "IdList", T.SEMI, "FieldDecMore")),
+    (25, "FieldDecMore", ()),
+    (26, "FieldDecMore", ("FieldDecList",)),
+    (27, "IdList", (T.ID, "IdMore")),
+    (28, "IdMore", ()),
+    (29, "IdMore", (T.COMMA, "IdList")),
+    (30, "VarDecPart", ()),
+    (31, "VarDecPart", ("VarDec",)),
+    (32, "VarDec", (T.VAR, "VarDecList")),
+    (33, "VarDecList", ("TypeDef", "VarIdList", T.SEMI, "VarDecMore")),
+    (34, "VarDecMore", ()),
+    (35, "VarDecMore", ("VarDecList",)),
+    (36, "VarIdList", (T.ID, "VarIdMore")),
+    (37, "VarIdMore", ()),
+    (38, "VarIdMore", (T.COMMA, "VarIdList")),
+    (39, "ProcDecPart", ()),
+    (40, "ProcDecPart", ("ProcDec",)),
+    (41, "ProcDec", (T.PROCEDURE, "ProcName", T.LPAREN, "ParamList", T.RPAREN, T.SEMI, "DecPartInner", "ProcBody",
+                     "ProcDecMore")),
+    (42, "ProcDecMore", ()),
+    (43, "ProcDecMore", ("ProcDec",)),
+    (44, "ProcName", (T.ID,)),
+    (45, "ParamList", ()),
+    (46, "ParamList", ("ParamDecList",)),
+    (47, "ParamDecList", ("Param", "ParamMore")),
+    (48, "ParamMore", ()),
+    (49, "ParamMore", (T.SEMI, "ParamDecList")),
+    (50, "Param", ("TypeDef", "FormList")),
+    (51, "Param", (T.VAR, "TypeDef", "FormList")),
+    (52, "FormList", (T.ID, "FidMore")),
+    (53, "FidMore", ()),
+    (54, "FidMore", (T.COMMA, "FormList")),
+    (55, "DecPartInner", ("DeclarePart",)),
+    (56, "ProcBody", ("ProgramBody",)),
+    (57, "ProgramBody", (T.BEGIN, "StmList", T.END)),
+    (58, "StmList", ("Stm", "StmMore")),
+    (59, "StmMore", ()),
+    (60, "StmMore", (T.SEMI, "StmList")),
+    (61, "Stm", ("ConditionalStm",)),
+    (62, "Stm", ("LoopStm",)),
+    (63, "Stm", ("InputStm",)),
+    (64, "Stm", ("OutputStm",)),
+    (65, "Stm", ("ReturnStm",)),
+    (66, "Stm", (T.ID, "AssCall")),
+    (67, "AssCall", ("AssignmentRest",)),
+    (68, "AssCall", ("CallStmRest",)),
+    (69, "AssignmentRest", ("VariMore", T.ASSIGN, "Exp")),
+    (70, "ConditionalStm", (T.IF, "RelExp", T.THEN, "StmList", T.ELSE, "StmList", T.FI)),
+    (71, "LoopStm", (T.WHILE, "RelExp", T.DO, "StmList", T.ENDWH)),
+    (72, "InputStm", (T.READ, T.LPAREN, "Invar", T.RPAREN)),
+    (73, "Invar", (T.ID,)),
+    (74, "OutputStm", (T.WRITE, T.LPAREN, "Exp", T.RPAREN)),
+    (75, "ReturnStm", (T.RETURN,)),
+    (76, "CallStmRest", (T.LPAREN, "ActParamList", T.RPAREN)),
+    (77, "ActParamList", ()),
+    (78, "ActParamList", ("Exp", "ActParamMore")),
+    (79, "ActParamMore", ()),
+    (80, "ActParamMore", (T.COMMA, "ActParamList")),
+    (81, "RelExp", ("Exp", "OtherRelE")),
+    (82, "OtherRelE", ("CmpOp", "Exp")),
+    (83, "Exp", ("Term", "OtherTerm")),
+    (84, "OtherTerm", ()),
+    (85, "OtherTerm", ("AddOp", "Exp")),
+    (86, "Term", ("Factor", "OtherFactor")),
+    (87, "OtherFactor", ()),
+    (88, "OtherFactor", ("MultOp", "Term")),
+    (89, "Factor", (T.LPAREN, "Exp", T.RPAREN)),
+    (90, "Factor", (T.INTC,)),
+    (91, "Factor", (T.CHARACTER,)),
+    (92, "Factor", ("Variable",)),
+    (93, "Variable", (T.ID, "VariMore")),
+    (94, "VariMore", ()),
+    (95, "VariMore", (T.LMIDPAREN, "Exp", T.RMIDPAREN)),
+    (96, "VariMore", (T.DOT, "FieldVar")),
+    (97, "FieldVar", (T.ID, "FieldVarMore")),
+    (98, "FieldVarMore", ()),
+    (99, "FieldVarMore", (T.LMIDPAREN, "Exp", T.RMIDPAREN)),
+    (100, "CmpOp", (T.LT,)),
+    (101, "CmpOp", (T.EQ,)),
+    (102, "AddOp", (T.PLUS,)),
+    (103, "AddOp", (T.MINUS,)),
+    (104, "MultOp", (T.TIMES,)),
+    (105, "MultOp", (T.OVER,)),
+)
+
+
+def mask(*token_types: TokenType) -> int:
+    result = 0
+    for token_type in token_types:
+        result |= BITS[token_type]
+    return result
+
+
+def tokens(token_mask: int) -> tuple:
+    # 按 TokenType 定义顺序展开, 用于错误信息
+    return tuple(token_type for token_type, bit in BITS.items() if token_mask & bit)
+
+
+class Grammar:
+    # 由产生式计算 FIRST / FOLLOW / 预测集, 全部以 token 位掩码表示;
+    # 语法分析器的每个选择只需 peek 一次, 与对应产生式的预测集做一次按位与
+    __productions: tuple
+    __start: str
+    __nullable: set
+    __first: dict
+    __follow: dict
+    __predict: dict
+
+    def __init__(self, productions: tuple, start: str):
+        self.__productions = productions
+        self.__start = start
+        nonterminals = {lhs for _, lhs, _ in productions}
+        for _, lhs, rhs in productions:
+            for symbol in rhs:
+                if isinstance(symbol, str) and symbol not in nonterminals:
+                    raise ValueError(f"Undefined nonterminal `{symbol}` in production of `{lhs}`.")
+        self.__nullable = set()
+        self.__first = {nonterminal: 0 for nonterminal in nonterminals}
+        self.__follow = {nonterminal: 0 for nonterminal in nonterminals}
+        self.__compute_first()
+        self.__compute_follow()
+        self.__predict = {}
+        for number, lhs, rhs in productions:
+            first, nullable = self.first_of(rhs)
+            self.__predict[number] = first | (self.__follow[lhs] if nullable else 0)
+
+    def __compute_first(self) -> None:
+        # 不动点迭代, 文法只有一百来条产生式, 几轮即收敛
+        changed = True
+        while changed:
+            changed = False
+            for _, lhs, rhs in self.__productions:
+                first, nullable = self.first_of(rhs)
+                if first | self.__first[lhs] != self.__first[lhs]:
+                    self.__first[lhs] |= first
+                    changed = True
+                if nullable and lhs not in self.__nullable:
+                    self.__nullable.add(lhs)
+                    changed = True
+
+    def __compute_follow(self) -> None:
+        changed = True
+        while changed:
+            changed = False
+            for _, lhs, rhs in self.__productions:
+                for i, symbol in enumerate(rhs):
+                    if not isinstance(symbol, str):
+                        continue
+                    first, nullable = self.first_of(rhs[i + 1:])
+                    follow = first | (self.__follow[lhs] if nullable else 0)
+                    if follow | self.__follow[symbol] != self.__follow[symbol]:
+                        self.__follow[symbol] |= follow
+                        changed = True
+
+    def first_of(self, symbols: tuple) -> tuple:
+        # 符号串的 FIRST 掩码, 以及它能否推导出 ɛ
+        first = 0
+        for symbol in symbols:
+            if not isinstance(symbol, str):
+                return first | BITS[symbol], False
+            first |= self.__first[symbol]
+            if symbol not in self.__nullable:
+                return first, False
+        return first, True
+
+    def get_start(self) -> str:
+        return self.__start
+
+    def get_productions(self) -> tuple:
+        return self.__productions
+
+    def get_first(self, nonterminal: str) -> int:
+        return self.__first[nonterminal]
+
+    def get_follow(self, nonterminal: str) -> int:
+        return self.__follow[nonterminal]
+
+    def is_nullable(self, nonterminal: str) -> bool:
+        return nonterminal in self.__nullable
+
+    def get_predict(self, number: int) -> int:
+        return self.__predict[number]
+
+    def get_predicts(self) -> dict:
+        return dict(self.__predict)
+
+    def get_expected(self, nonterminal: str) -> int:
+        # 该非终结符所有产生式预测集的并, 没有产生式可选时报告这些 token
+        result = 0
+        for number, lhs, _ in self.__productions:
+            if lhs == nonterminal:
+                result |= self.__predict[number]
+        return result
+
+    def get_conflicts(self) -> list:
+        # 同一非终结符的两条产生式预测集相交, 即不是 LL(1) 的: [(左部, 编号, 编号, 相交的 token)]
+        conflicts = []
+        for i, (number, lhs, _) in enumerate(self.__productions):
+            for other, other_lhs, _ in self.__productions[i + 1:]:
+                common = self.__predict[number] & self.__predict[other]
+                if other_lhs == lhs and common:
+                    conflicts.append((lhs, number, other, tokens(common)))
+        return conflicts
+
+    def check(self) -> None:
+        conflicts = self.get_conflicts()
+        if conflicts:
+            raise ValueError("Grammar is not LL(1): " + "; ".join(
+                f"{lhs} ({a}) and ({b}) both predict {' '.join(token.value for token in common)}"
+                for lhs, a, b, common in conflicts
+            ))
+
+    def to_string(self) -> str:
+        lines = []
+        for number, lhs, rhs in self.__productions:
+            body = " ".join(symbol if isinstance(symbol, str) else symbol.value for symbol in rhs) or "ɛ"
+            predict = " ".join(token.value for token in tokens(self.__predict[number]))
+            lines.append(f"({number}) {lhs} -> {body}  {{{predict}}}")
+        return "\n".join(lines)
+
+
+SNL = Grammar(PRODUCTIONS, "Program")
+# 导入时即验证: 文法改动后若出现预测冲突, 分析器无法按一次 peek 做出选择
+SNL.check()
+PREDICT = SNL.get_predicts()
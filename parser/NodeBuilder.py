@@ -0,0 +1,184 @@
+from typing import Union
+
+from lexer.Token import Token
+from lexer.TokenType import TokenType
+from parser.TreeNode import TreeNode
+from parser.SyntaxTree import SyntaxTree
+
+
+class NodeBuilder:
+    # 语法分析器通过 builder 创建结点; 默认建立 TreeNode 语法树
+    # 分析函数对返回的结点只调用 set_children, 所以其它 builder 可以返回任何有 set_children 的对象
+    VALUED = (TokenType.ID, TokenType.INTC, TokenType.CHARACTER)
+
+    def node(self, value: str):
+        return TreeNode.by_value(value)
+
+    def empty(self):
+        # ɛ 产生式
+        return TreeNode.by_value("ɛ")
+
+    def terminal(self, token: Token):
+        token_type = token.get_token_type()
+        node = TreeNode.by_value(token.get_value() if token_type in self.VALUED else "ɛ")
+        node.set_token_type(token_type)
+        node.set_position(token.get_line(), token.get_column())
+        return node
+
+    def mismatch(self):
+        # 终结符不匹配时占位
+        return TreeNode.by_value("ɛ")
+
+    def mark(self):
+        # 表达式左操作数开始的位置; 只有需要补发事件的 builder 用到
+        return None
+
+    def binary(self, mark, left, operator, right):
+        # 左操作数分析完才知道它属于一个 BinOp, 由 builder 把它和运算符, 右操作数组合起来
+        node = TreeNode.by_value("BinOp")
+        node.set_children(left, operator, right)
+        return node
+
+    def error(self) -> None:
+        # 当前非终结符没有可用的产生式, 它不会再有 set_children
+        pass
+
+    def finish(self, root) -> Union[SyntaxTree, None]:
+        return SyntaxTree(root)
+
+
+class EventConsumer:
+    # 事件流的接收者, 按需覆盖; 事件顺序与语法树的先序遍历一致
+    def enter(self, kind: str) -> None:
+        pass
+
+    def leave(self, kind: str) -> None:
+        pass
+
+    def token(self, token: Token) -> None:
+        pass
+
+    def empty(self) -> None:
+        pass
+
+
+class _Handle:
+    __slots__ = ("builder", "kind")
+
+    def __init__(self, builder: "EventBuilder", kind: str):
+        self.builder = builder
+        self.kind = kind
+
+    def set_children(self, *nodes) -> None:
+        self.builder.close(self)
+
+
+class _Nothing:
+    __slots__ = ()
+
+    def set_children(self, *nodes) -> None:
+        pass
+
+
+NOTHING = _Nothing()
+
+
+class EventBuilder(NodeBuilder):
+    # 不建树, 把结点的开始/结束和匹配到的 token 依次交给 consumer
+    # 一个非终结符在 set_children 时结束; 出错没有 set_children 的, 在 error 或其祖先结束时补发 leave
+    # BinOp 的 enter 要排在左操作数之前, 所以从第一个 mark 起缓存事件, 最外层表达式结束时再按序发出
+    __consumer: EventConsumer
+    __open: list
+    __events: Union[list, None]
+    __base: int
+
+    def __init__(self, consumer: EventConsumer):
+        self.__consumer = consumer
+        self.__open = []
+        self.__events = None
+        self.__base = 0
+
+    def node(self, value: str):
+        handle = _Handle(self, value)
+        self.__open.append(handle)
+        self.__emit(self.__consumer.enter, value)
+        return handle
+
+    def empty(self):
+        self.__emit(self.__consumer.empty)
+        return NOTHING
+
+    def terminal(self, token: Token):
+        self.__emit(self.__consumer.token, token)
+        return NOTHING
+
+    def mismatch(self):
+        return NOTHING
+
+    def mark(self) -> int:
+        if self.__events is None:
+            self.__events = []
+            self.__base = len(self.__open)
+        return len(self.__events)
+
+    def binary(self, mark: int, left, operator, right):
+        # 外层还在使用的 mark 都不大于当前 mark, 插入不会使它们失效
+        self.__events.insert(mark, (self.__consumer.enter, ("BinOp",)))
+        self.__emit(self.__consumer.leave, "BinOp")
+        return NOTHING
+
+    def error(self) -> None:
+        if self.__open:
+            self.__emit(self.__consumer.leave, self.__open.pop().kind)
+            self.__flush()
+
+    def close(self, handle: _Handle) -> None:
+        if handle not in self.__open:
+            return
+        while self.__open:
+            top = self.__open.pop()
+            self.__emit(self.__consumer.leave, top.kind)
+            if top is handle:
+                break
+        self.__flush()
+
+    def finish(self, root) -> None:
+        while self.__open:
+            self.__emit(self.__consumer.leave, self.__open.pop().kind)
+        self.__flush(True)
+        return None
+
+    def __emit(self, method, *args) -> None:
+        if self.__events is None:
+            method(*args)
+        else:
+            self.__events.append((method, args))
+
+    def __flush(self, force: bool = False) -> None:
+        # 开始缓存时打开的结点 (即最外层的 Exp) 已经结束
+        if self.__events is None or (len(self.__open) >= self.__base and not force):
+            return
+        events, self.__events = self.__events, None
+        for method, args in events:
+            method(*args)
+
+
+class Recognizer(NodeBuilder):
+    # 只判断是否符合文法, 不分配任何结点
+    def node(self, value: str):
+        return NOTHING
+
+    def empty(self):
+        return NOTHING
+
+    def terminal(self, token: Token):
+        return NOTHING
+
+    def mismatch(self):
+        return NOTHING
+
+    def binary(self, mark, left, operator, right):
+        return NOTHING
+
+    def finish(self, root) -> None:
+        return None
@@ -2,8 +2,9 @@ from parser.SyntaxTree import SyntaxTree
 
 
 class ParseResult:
-    __tree: SyntaxTree
-    __errors: list
+    __tree: SyntaxTree = None
+    __errors: list = None
+    __metrics: dict = None
 
     def is_success(self) -> bool:
         return self.__errors is None or len(self.__errors) == 0
@@ -19,3 +20,10 @@ class ParseResult:
 
     def set_errors(self, errors: list) -> None:
         self.__errors = errors
+
+    def get_metrics(self) -> dict:
+        # 阶段名 -> PhaseMetrics, 仅在解析器开启 metrics 时存在
+        return self.__metrics
+
+    def set_metrics(self, metrics: dict) -> None:
+        self.__metrics = metrics
@@ -0,0 +1,151 @@
+import re
+from bisect import bisect_right
+from typing import Union
+
+from lexer.TokenType import TokenType
+from parser.TreeNode import TreeNode
+
+# token 之间可以出现的空白和注释; 未闭合的注释延伸到文件末尾
+_SKIP = re.compile(r"(?:[ \t\r\n]+|\{[^}]*\}?)*")
+
+
+def _text(node: TreeNode) -> str:
+    # 终结符在源文本中的写法
+    token_type = node.get_token_type()
+    if token_type in (TokenType.ID, TokenType.INTC):
+        return node.get_value()
+    if token_type == TokenType.CHARACTER:
+        return f"'{node.get_value()}'"
+    return token_type.value
+
+
+class PositionIndex:
+    # 源文本位置 <-> 语法树结点. 结点的区间 [start, end) 是字符偏移:
+    # 终结符按先序 (即 token 顺序) 在源文本中依次定位, 非终结符取子结点区间的并, ɛ 结点没有区间
+    # 区间互相嵌套或不相交, 把所有端点排序后, 每一段对应一个最内层结点, 查询只需一次二分
+    # lexer 给出的列号在空白和行尾处会偏移, 所以这里重新定位, 需要分析时的源文本
+    __source: str
+    __line_starts: list
+    __spans: dict
+    __keys: list
+    __nodes: list
+    __identifiers: dict
+
+    def __init__(self, root: Union[TreeNode, None], source: Union[str, list]):
+        self.__source = source if isinstance(source, str) else "".join(source)
+        self.__line_starts = [0] + [match.end() for match in re.finditer("\n", self.__source)]
+        self.__spans = {}
+        self.__keys = []
+        self.__nodes = []
+        self.__identifiers = {}
+        if root:
+            self.__locate_terminals(root)
+            self.__build_segments(root)
+
+    def __locate_terminals(self, root: TreeNode) -> None:
+        source = self.__source
+        cursor = 0
+        stack = [(root, False)]
+        while stack:
+            node, leaving = stack.pop()
+            children = [child for child in node.get_children() or [] if child]
+            if leaving:
+                # 子结点都已定位, 非终结符的区间取首尾子结点
+                spans = [self.__spans[id(child)] for child in children if id(child) in self.__spans]
+                if spans:
+                    self.__spans[id(node)] = (spans[0][0], spans[-1][1])
+                continue
+            if node.get_token_type():
+                text = _text(node)
+                start = _SKIP.match(source, cursor).end()
+                if not source.startswith(text, start):
+                    start = source.find(text, cursor)
+                if start == -1:
+                    continue
+                cursor = start + len(text)
+                self.__spans[id(node)] = (start, cursor)
+                if node.get_token_type() == TokenType.ID:
+                    self.__identifiers.setdefault(node.get_value(), []).append(node)
+                continue
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(children))
+
+    def __build_segments(self, root: TreeNode) -> None:
+        # 进入结点时, 从它的起点开始最内层是它; 离开时, 从它的终点开始最内层回到仍然包含该点的祖先
+        enclosing = []
+        stack = [(root, False)]
+        while stack:
+            node, leaving = stack.pop()
+            span = self.__spans.get(id(node))
+            if span is None:
+                continue
+            if leaving:
+                enclosing.pop()
+                self.__add_segment(span[1], enclosing[-1] if enclosing else None)
+                continue
+            enclosing.append(node)
+            self.__add_segment(span[0], node)
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(node.get_children() or []) if child)
+
+    def __add_segment(self, key: int, node: Union[TreeNode, None]) -> None:
+        if self.__keys and key <= self.__keys[-1]:
+            self.__nodes[-1] = node
+        else:
+            self.__keys.append(key)
+            self.__nodes.append(node)
+
+    def size(self) -> int:
+        return len(self.__spans)
+
+    def get_source(self) -> str:
+        return self.__source
+
+    def get_span(self, node: TreeNode) -> Union[tuple, None]:
+        return self.__spans.get(id(node))
+
+    def get_range(self, node: TreeNode) -> Union[tuple, None]:
+        # ((起始行, 起始列), (结束行, 结束列)), 结束位置是最后一个字符
+        span = self.__spans.get(id(node))
+        if span is None:
+            return None
+        return self.to_position(span[0]), self.to_position(span[1] - 1)
+
+    def get_text(self, node: TreeNode) -> Union[str, None]:
+        span = self.__spans.get(id(node))
+        return self.__source[span[0]:span[1]] if span else None
+
+    def to_offset(self, line: int, column: int) -> int:
+        # 行列号都从 1 开始, 列号不能超出该行 (不含换行符), 否则会落到后面的行上
+        if line < 1 or line > len(self.__line_starts) or column < 1:
+            raise ValueError(f"Position {line}:{column} out of range.")
+        start = self.__line_starts[line - 1]
+        end = self.__line_starts[line] - 1 if line < len(self.__line_starts) else len(self.__source)
+        if column > end - start:
+            raise ValueError(f"Position {line}:{column} out of range.")
+        return start + column - 1
+
+    def to_position(self, offset: int) -> tuple:
+        line = bisect_right(self.__line_starts, offset)
+        return line, offset - self.__line_starts[line - 1] + 1
+
+    def node_at(self, line: int, column: int) -> Union[TreeNode, None]:
+        return self.node_at_offset(self.to_offset(line, column))
+
+    def node_at_offset(self, offset: int) -> Union[TreeNode, None]:
+        # 包含该位置的最内层结点; 落在两个 token 之间时是同时包含二者的结点
+        i = bisect_right(self.__keys, offset) - 1
+        return self.__nodes[i] if i >= 0 else None
+
+    def get_identifiers(self) -> list:
+        return list(self.__identifiers)
+
+    def get_occurrences(self, name: str) -> list:
+        # 同名标识符的所有出现, 按源文本顺序; 不区分作用域
+        return self.__identifiers.get(name, [])
+
+    def get_references(self, line: int, column: int) -> list:
+        node = self.node_at(line, column)
+        if not node or node.get_token_type() != TokenType.ID:
+            return []
+        return self.get_occurrences(node.get_value())
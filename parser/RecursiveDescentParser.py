@@ -1,23 +1,45 @@
-from loguru import logger
+from typing import Iterable
 
+from lexer.log import logger
+from lexer.Token import Token
 from parser.TreeNode import TreeNode
 from lexer.TokenType import TokenType
-from parser.SyntaxTree import SyntaxTree
 from parser.ParseResult import ParseResult
 from parser.SyntexParser import SyntexParser
+from parser.Grammar import SNL, PREDICT, tokens
+
+# 二元运算符的优先级, 同级左结合
+PRECEDENCE = {TokenType.PLUS: 1, TokenType.MINUS: 1, TokenType.TIMES: 2, TokenType.OVER: 2}
+# 没有产生式可选时报告的 token, 按 TokenType 定义顺序
+EXPECTED = {lhs: tokens(SNL.get_expected(lhs)) for _, lhs, _ in SNL.get_productions()}
 
 
 class RecursiveDescentParser(SyntexParser):
-    def parse_token_list(self, token_list: list) -> ParseResult:
+    # compact_expressions 为 True 时表达式用优先级爬升分析, Exp 下只有一个子结点:
+    #   Factor, 或左结合的 BinOp -> (BinOp|Factor) 运算符 (BinOp|Factor), a-b-c 即 (a-b)-c
+    # 为 False 时按文法 (83)-(88) 展开 Term/OtherTerm/OtherFactor 链
+    __compact_expressions: bool
+
+    def __init__(self, metrics: bool = False, trace_memory: bool = False, compact_expressions: bool = True):
+        super().__init__(metrics, trace_memory)
+        self.__compact_expressions = compact_expressions
+
+    def get_compact_expressions(self) -> bool:
+        return self.__compact_expressions
+
+    def set_compact_expressions(self, compact_expressions: bool) -> None:
+        self.__compact_expressions = compact_expressions
+
+    def parse_tokens(self, tokens: Iterable[Token]) -> ParseResult:
         result = ParseResult()
-        self._token_list = token_list
-        if not token_list:
+        metrics = self._begin_phase("parse")
+        self._set_tokens(tokens)
+        if not self._has_token():
             self._errors.append("No token to read.")
             result.set_errors(self._errors)
+            self._end_phase(metrics, result)
             return result
-        for token in token_list:
-            logger.info(token.to_string())
-        result.set_tree(SyntaxTree(self.__program()))
+        result.set_tree(self._builder.finish(self.__program()))
         if self._get_token():
             logger.warning("Source code too long.")
             self._errors.append("Source code too long.")
@@ -26,6 +48,7 @@ class RecursiveDescentParser(SyntexParser):
         else:
             logger.warning("分析完成，存在错误")
         result.set_errors(self._errors)
+        self._end_phase(metrics, result)
         return result
 
     # (1)[Program] -> [ProgramHead] [DeclarePart] [ProgramBody] .
@@ -65,12 +88,13 @@ class RecursiveDescentParser(SyntexParser):
     def __type_dec_part(self) -> TreeNode:
         node = self._node("TypeDecPart")
         logger.debug("构造TypeDecPart结点")
-        if self._peek_token().get_token_type() in (TokenType.VAR, TokenType.PROCEDURE, TokenType.BEGIN):
+        bit = self._peek_bit()
+        if bit & PREDICT[5]:
             node.set_children(self._node_null())
-        elif self._peek_token().get_token_type() == TokenType.TYPE:
+        elif bit & PREDICT[6]:
             node.set_children(self.__type_dec())
         else:
-            self.error(TokenType.VAR, TokenType.PROCEDURE, TokenType.BEGIN, TokenType.TYPE)
+            self.error(*EXPECTED["TypeDecPart"])
         logger.debug("TypeDecPart结点设置完毕")
         return node
 
@@ -95,12 +119,13 @@ class RecursiveDescentParser(SyntexParser):
     def __type_dec_more(self) -> TreeNode:
         node = self._node("typeDefMore")
         logger.debug("构造typeDefMore结点")
-        if self._peek_token().get_token_type() in (TokenType.VAR, TokenType.PROCEDURE, TokenType.BEGIN):
+        bit = self._peek_bit()
+        if bit & PREDICT[9]:
             node.set_children(self._node_null())
-        elif self._peek_token().get_token_type() == TokenType.ID:
+        elif bit & PREDICT[10]:
             node.set_children(self.__type_dec_list())
         else:
-            self.error(TokenType.VAR, TokenType.PROCEDURE, TokenType.BEGIN, TokenType.ID)
+            self.error(*EXPECTED["TypeDecMore"])
         logger.debug("typeDefMore结点设置完毕")
         return node
 
@@ -118,14 +143,15 @@ class RecursiveDescentParser(SyntexParser):
     def __type_def(self) -> TreeNode:
         node = self._node("TypeDef")
         logger.debug("构造TypeDef结点")
-        if self._peek_token().get_token_type() in (TokenType.INTEGER, TokenType.CHAR):
+        bit = self._peek_bit()
+        if bit & PREDICT[12]:
             node.set_children(self.__base_type())
-        elif self._peek_token().get_token_type() in (TokenType.ARRAY, TokenType.RECORD):
+        elif bit & PREDICT[13]:
             node.set_children(self.__structure_type())
-        elif self._peek_token().get_token_type() == TokenType.ID:
+        elif bit & PREDICT[14]:
             node.set_children(self._match(TokenType.ID))
         else:
-            self.error(TokenType.INTEGER, TokenType.CHAR, TokenType.ARRAY, TokenType.RECORD, TokenType.ID)
+            self.error(*EXPECTED["TypeDef"])
         logger.debug("TypeDef结点设置完毕")
         return node
 
@@ -134,12 +160,13 @@ class RecursiveDescentParser(SyntexParser):
     def __base_type(self) -> TreeNode:
         node = self._node("BaseType")
         logger.debug("构造BaseType结点")
-        if self._peek_token().get_token_type() == TokenType.INTEGER:
+        bit = self._peek_bit()
+        if bit & PREDICT[15]:
             node.set_children(self._match(TokenType.INTEGER))
-        elif self._peek_token().get_token_type() == TokenType.CHAR:
+        elif bit & PREDICT[16]:
             node.set_children(self._match(TokenType.CHAR))
         else:
-            self.error(TokenType.INTEGER, TokenType.CHAR)
+            self.error(*EXPECTED["BaseType"])
         logger.debug("BaseType结点设置完毕")
         return node
 
@@ -148,12 +175,13 @@ class RecursiveDescentParser(SyntexParser):
     def __structure_type(self) -> TreeNode:
         node = self._node("StructureType")
         logger.debug("构造StructureType结点")
-        if self._peek_token().get_token_type() == TokenType.ARRAY:
+        bit = self._peek_bit()
+        if bit & PREDICT[17]:
             node.set_children(self.__array_type())
-        elif self._peek_token().get_token_type() == TokenType.RECORD:
+        elif bit & PREDICT[18]:
             node.set_children(self.__rec_type())
         else:
-            self.error(TokenType.ARRAY, TokenType.RECORD)
+            self.error(*EXPECTED["StructureType"])
         logger.debug("StructureType结点设置完毕")
         return node
 
@@ -198,12 +226,13 @@ class RecursiveDescentParser(SyntexParser):
     def __filed_dec_list(self) -> TreeNode:
         node = self._node("FiledDecList")
         logger.debug("构造FiledDecList结点")
-        if self._peek_token().get_token_type() in (TokenType.INTEGER, TokenType.CHAR):
+        bit = self._peek_bit()
+        if bit & PREDICT[23]:
             node.set_children(self.__base_type(), self.__id_list(), self._match(TokenType.SEMI), self.__filed_dec_more())
-        elif self._peek_token().get_token_type() == TokenType.ARRAY:
+        elif bit & PREDICT[24]:
             node.set_children(self.__array_type(), self.__id_list(), self._match(TokenType.SEMI), self.__filed_dec_more())
         else:
-            self.error(TokenType.INTEGER, TokenType.CHAR, TokenType.ARRAY)
+            self.error(*EXPECTED["FieldDecList"])
         logger.debug("FiledDecList结点设置完毕")
         return node
 
@@ -212,12 +241,13 @@ class RecursiveDescentParser(SyntexParser):
     def __filed_dec_more(self) -> TreeNode:
         node = self._node("FiledDecMore")
         logger.debug("构造FiledDecMore结点")
-        if self._peek_token().get_token_type() == TokenType.END:
+        bit = self._peek_bit()
+        if bit & PREDICT[25]:
             node.set_children(self._node_null())
-        elif self._peek_token().get_token_type() in (TokenType.INTEGER, TokenType.CHAR, TokenType.ARRAY):
+        elif bit & PREDICT[26]:
             node.set_children(self.__filed_dec_list())
         else:
-            self.error(TokenType.END, TokenType.INTEGER, TokenType.CHAR, TokenType.ARRAY)
+            self.error(*EXPECTED["FieldDecMore"])
         logger.debug("FiledDecMore结点设置完毕")
         return node
 
@@ -234,12 +264,13 @@ class RecursiveDescentParser(SyntexParser):
     def __id_more(self) -> TreeNode:
         node = self._node("IdMore")
         logger.debug("构造IdMore结点")
-        if self._peek_token().get_token_type() == TokenType.SEMI:
+        bit = self._peek_bit()
+        if bit & PREDICT[28]:
             node.set_children(self._node_null())
-        elif self._peek_token().get_token_type() == TokenType.COMMA:
+        elif bit & PREDICT[29]:
             node.set_children(self._match(TokenType.COMMA), self.__id_list())
         else:
-            self.error(TokenType.SEMI, TokenType.COMMA)
+            self.error(*EXPECTED["IdMore"])
         logger.debug("IdMore结点设置完毕")
         return node
 
@@ -248,12 +279,13 @@ class RecursiveDescentParser(SyntexParser):
     def __var_dec_part(self) -> TreeNode:
         node = self._node("VarDecPart")
         logger.debug("构造VarDecPart结点")
-        if self._peek_token().get_token_type() in (TokenType.PROCEDURE, TokenType.BEGIN):
+        bit = self._peek_bit()
+        if bit & PREDICT[30]:
             node.set_children(self._node_null())
-        elif self._peek_token().get_token_type() == TokenType.VAR:
+        elif bit & PREDICT[31]:
             node.set_children(self.__var_dec())
         else:
-            self.error(TokenType.PROCEDURE, TokenType.BEGIN, TokenType.VAR)
+            self.error(*EXPECTED["VarDecPart"])
         logger.debug("VarDecPart结点设置完毕")
         return node
 
@@ -278,13 +310,14 @@ class RecursiveDescentParser(SyntexParser):
     def __var_dec_more(self) -> TreeNode:
         node = self._node("varDecMore")
         logger.debug("构造varDecMore结点")
-        if self._peek_token().get_token_type() in (TokenType.PROCEDURE, TokenType.BEGIN):
+        bit = self._peek_bit()
+        if bit & PREDICT[34]:
             node.set_children(self._node_null())
-        elif self._peek_token().get_token_type() in (TokenType.INTEGER, TokenType.CHAR, TokenType.ARRAY, TokenType.RECORD, TokenType.ID):
+        elif bit & PREDICT[35]:
             node.set_children(self.__var_dec_list())
         else:
             logger.error(self._peek_token().get_token_type())
-            self.error(TokenType.PROCEDURE, TokenType.BEGIN, TokenType.INTEGER, TokenType.CHAR, TokenType.ARRAY, TokenType.RECORD, TokenType.ID)
+            self.error(*EXPECTED["VarDecMore"])
         logger.debug("VarDecMore结点设置完毕")
         return node
 
@@ -301,13 +334,14 @@ class RecursiveDescentParser(SyntexParser):
     def __var_id_more(self) -> TreeNode:
         node = self._node("varIdMore")
         logger.debug("构造varIdMore结点")
-        if self._peek_token().get_token_type() == TokenType.SEMI:
+        bit = self._peek_bit()
+        if bit & PREDICT[37]:
             node.set_children(self._node_null())
-        elif self._peek_token().get_token_type() == TokenType.COMMA:
+        elif bit & PREDICT[38]:
             node.set_children(self._match(TokenType.COMMA), self.__var_id_list())
         else:
             logger.error(self._peek_token().get_token_type())
-            self.error(TokenType.SEMI, TokenType.COMMA)
+            self.error(*EXPECTED["VarIdMore"])
         logger.debug("VarIdMore结点设置完毕")
         return node
 
@@ -316,12 +350,13 @@ class RecursiveDescentParser(SyntexParser):
     def __proc_decpart(self) -> TreeNode:
         node = self._node("ProDecpart")
         logger.debug("构造ProDecpart结点")
-        if self._peek_token().get_token_type() == TokenType.BEGIN:
+        bit = self._peek_bit()
+        if bit & PREDICT[39]:
             node.set_children(self._node_null())
-        elif self._peek_token().get_token_type() == TokenType.PROCEDURE:
+        elif bit & PREDICT[40]:
             node.set_children(self.__proc_dec())
         else:
-            self.error(TokenType.BEGIN, TokenType.PROCEDURE)
+            self.error(*EXPECTED["ProcDecPart"])
         logger.debug("ProcDecpart结点设置完毕")
         return node
 
@@ -342,12 +377,13 @@ class RecursiveDescentParser(SyntexParser):
     def __proc_dec_more(self) -> TreeNode:
         node = self._node("ProcDecMore")
         logger.debug("构造ProcDecMore结点")
-        if self._peek_token().get_token_type() == TokenType.BEGIN:
+        bit = self._peek_bit()
+        if bit & PREDICT[42]:
             node.set_children(self._node_null())
-        elif self._peek_token().get_token_type() == TokenType.PROCEDURE:
+        elif bit & PREDICT[43]:
             node.set_children(self.__proc_dec())
         else:
-            self.error(TokenType.BEGIN, TokenType.PROCEDURE)
+            self.error(*EXPECTED["ProcDecMore"])
         logger.debug("ProcDecMore结点设置完毕")
         return node
 
@@ -364,14 +400,13 @@ class RecursiveDescentParser(SyntexParser):
     def __param_list(self) -> TreeNode:
         node = self._node("ParamList")
         logger.debug("构造ParamList结点")
-        if self._peek_token().get_token_type() == TokenType.RPAREN:
+        bit = self._peek_bit()
+        if bit & PREDICT[45]:
             node.set_children(self._node_null())
-        elif self._peek_token().get_token_type() in (
-            TokenType.INTEGER, TokenType.CHAR, TokenType.ARRAY, TokenType.RECORD, TokenType.ID, TokenType.VAR
-        ):
+        elif bit & PREDICT[46]:
             node.set_children(self.__param_dec_list())
         else:
-            self.error(TokenType.RPAREN, TokenType.INTEGER, TokenType.CHAR, TokenType.ARRAY, TokenType.RECORD, TokenType.ID, TokenType.VAR)
+            self.error(*EXPECTED["ParamList"])
         logger.debug("ParamList结点设置完毕")
         return node
 
@@ -383,17 +418,18 @@ class RecursiveDescentParser(SyntexParser):
         logger.debug("ParamDecList结点设置完毕")
         return node
 
-    # (48)[ParamMore] -> ɛ {(}
+    # (48)[ParamMore] -> ɛ {)}
     # (49)[ParamMore] -> ; [ParamDecList] {;}
     def __param_more(self) -> TreeNode:
         node = self._node("ParamMore")
         logger.debug("构造ParamMore结点")
-        if self._peek_token().get_token_type() == TokenType.RPAREN:
+        bit = self._peek_bit()
+        if bit & PREDICT[48]:
             node.set_children(self._node_null())
-        elif self._peek_token().get_token_type() == TokenType.SEMI:
+        elif bit & PREDICT[49]:
             node.set_children(self._match(TokenType.SEMI), self.__param_dec_list())
         else:
-            self.error(TokenType.RPAREN, TokenType.SEMI)
+            self.error(*EXPECTED["ParamMore"])
         logger.debug("ParamMore结点设置完毕")
         return node
 
@@ -402,14 +438,13 @@ class RecursiveDescentParser(SyntexParser):
     def __param(self) -> TreeNode:
         node = self._node("Param")
         logger.debug("构造Param结点")
-        if self._peek_token().get_token_type() in (
-            TokenType.INTEGER, TokenType.CHAR, TokenType.ARRAY, TokenType.RECORD, TokenType.ID
-        ):
+        bit = self._peek_bit()
+        if bit & PREDICT[50]:
             node.set_children(self.__type_def(), self.__form_list())
-        elif self._peek_token().get_token_type() == TokenType.VAR:
+        elif bit & PREDICT[51]:
             node.set_children(self._match(TokenType.VAR), self.__type_def(), self.__form_list())
         else:
-            self.error(TokenType.INTEGER, TokenType.CHAR, TokenType.ARRAY, TokenType.RECORD, TokenType.ID, TokenType.VAR)
+            self.error(*EXPECTED["Param"])
         logger.debug("Param结点设置完毕")
         return node
 
@@ -426,12 +461,13 @@ class RecursiveDescentParser(SyntexParser):
     def __fid_more(self) -> TreeNode:
         node = self._node("FidMore")
         logger.debug("构造FidMore结点")
-        if self._peek_token().get_token_type() in (TokenType.SEMI, TokenType.RPAREN):
+        bit = self._peek_bit()
+        if bit & PREDICT[53]:
             node.set_children(self._node_null())
-        elif self._peek_token().get_token_type() == TokenType.COMMA:
+        elif bit & PREDICT[54]:
             node.set_children(self._match(TokenType.COMMA), self.__form_list())
         else:
-            self.error(TokenType.SEMI, TokenType.RPAREN, TokenType.COMMA)
+            self.error(*EXPECTED["FidMore"])
         logger.debug("FidMore结点设置完毕")
         return node
 
@@ -472,12 +508,13 @@ class RecursiveDescentParser(SyntexParser):
     def __stm_more(self) -> TreeNode:
         node = self._node("StmMore")
         logger.debug("构造StmMore结点")
-        if self._peek_token().get_token_type() in (TokenType.ELSE, TokenType.FI, TokenType.END, TokenType.ENDWH):
+        bit = self._peek_bit()
+        if bit & PREDICT[59]:
             node.set_children(self._node_null())
-        elif self._peek_token().get_token_type() == TokenType.SEMI:
+        elif bit & PREDICT[60]:
             node.set_children(self._match(TokenType.SEMI), self.__stm_list())
         else:
-            self.error(TokenType.ELSE, TokenType.FI, TokenType.END, TokenType.ENDWH, TokenType.SEMI)
+            self.error(*EXPECTED["StmMore"])
         logger.debug("StmMore结点设置完毕")
         return node
 
@@ -490,20 +527,21 @@ class RecursiveDescentParser(SyntexParser):
     def __stm(self) -> TreeNode:
         node = self._node("Stm")
         logger.debug("构造Stm结点")
-        if self._peek_token().get_token_type() == TokenType.IF:
+        bit = self._peek_bit()
+        if bit & PREDICT[61]:
             node.set_children(self.__conditional_stm())
-        elif self._peek_token().get_token_type() == TokenType.WHILE:
+        elif bit & PREDICT[62]:
             node.set_children(self.__loop_stm())
-        elif self._peek_token().get_token_type() == TokenType.READ:
+        elif bit & PREDICT[63]:
             node.set_children(self.__input_stm())
-        elif self._peek_token().get_token_type() == TokenType.WRITE:
+        elif bit & PREDICT[64]:
             node.set_children(self.__output_stm())
-        elif self._peek_token().get_token_type() == TokenType.RETURN:
+        elif bit & PREDICT[65]:
             node.set_children(self.__return_stm())
-        elif self._peek_token().get_token_type() == TokenType.ID:
+        elif bit & PREDICT[66]:
             node.set_children(self._match(TokenType.ID), self.__ass_call())
         else:
-            self.error(TokenType.IF, TokenType.WHILE, TokenType.READ, TokenType.WRITE, TokenType.RETURN, TokenType.ID)
+            self.error(*EXPECTED["Stm"])
         logger.debug("Stm结点设置完毕")
         return node
 
@@ -512,12 +550,13 @@ class RecursiveDescentParser(SyntexParser):
     def __ass_call(self) -> TreeNode:
         node = self._node("AssCall")
         logger.debug("构造AssCall结点")
-        if self._peek_token().get_token_type() in (TokenType.ASSIGN, TokenType.LMIDPAREN, TokenType.DOT):
+        bit = self._peek_bit()
+        if bit & PREDICT[67]:
             node.set_children(self.__assignment_rest())
-        elif self._peek_token().get_token_type() == TokenType.LPAREN:
+        elif bit & PREDICT[68]:
             node.set_children(self.__call_stm_rest())
         else:
-            self.error(TokenType.ASSIGN, TokenType.LMIDPAREN, TokenType.DOT, TokenType.LPAREN)
+            self.error(*EXPECTED["AssCall"])
         logger.debug("AssCall结点设置完毕")
         return node
 
@@ -593,12 +632,13 @@ class RecursiveDescentParser(SyntexParser):
     def __act_param_list(self) -> TreeNode:
         node = self._node("ActParamList")
         logger.debug("构造ActParamList结点")
-        if self._peek_token().get_token_type() == TokenType.RPAREN:
+        bit = self._peek_bit()
+        if bit & PREDICT[77]:
             node.set_children(self._node_null())
-        elif self._peek_token().get_token_type() in (TokenType.LPAREN, TokenType.INTC, TokenType.ID, TokenType.CHARC):
+        elif bit & PREDICT[78]:
             node.set_children(self.__exp(), self.__act_param_more())
         else:
-            self.error(TokenType.RPAREN, TokenType.LPAREN, TokenType.INTC, TokenType.ID, TokenType.CHARC)
+            self.error(*EXPECTED["ActParamList"])
         logger.debug("ActParamList结点设置完毕")
         return node
 
@@ -607,12 +647,13 @@ class RecursiveDescentParser(SyntexParser):
     def __act_param_more(self) -> TreeNode:
         node = self._node("ActParamMore")
         logger.debug("构造ActParamMore结点")
-        if self._peek_token().get_token_type() == TokenType.RPAREN:
+        bit = self._peek_bit()
+        if bit & PREDICT[79]:
             node.set_children(self._node_null())
-        elif self._peek_token().get_token_type() == TokenType.COMMA:
+        elif bit & PREDICT[80]:
             node.set_children(self._match(TokenType.COMMA), self.__act_param_list())
         else:
-            self.error(TokenType.RPAREN, TokenType.COMMA)
+            self.error(*EXPECTED["ActParamMore"])
         logger.debug("ActParamMore结点设置完毕")
         return node
 
@@ -636,28 +677,42 @@ class RecursiveDescentParser(SyntexParser):
     def __exp(self) -> TreeNode:
         node = self._node("Exp")
         logger.debug("构造Exp结点")
-        node.set_children(self.__term(), self.__other_term())
+        if self.__compact_expressions:
+            operand = self.__climb(1)
+            # 与展开的文法一样, 在最后一个因子之后按 (87) OtherFactor -> ɛ 的预测集检查后继 token
+            if not self._peek_bit() & PREDICT[87]:
+                self.error(*EXPECTED["OtherFactor"])
+            node.set_children(operand)
+        else:
+            node.set_children(self.__term(), self.__other_term())
         logger.debug("Exp结点设置完毕")
         return node
 
+    # 优先级爬升: 循环吸收优先级不低于 min_precedence 的运算符, 右操作数只接受更高优先级,
+    # 所以同级运算向左折叠; 调用深度只与优先级层数有关, 与运算符个数无关
+    def __climb(self, min_precedence: int) -> TreeNode:
+        mark = self._builder.mark()
+        left = self.__factor()
+        while True:
+            token_type = self._peek_token().get_token_type()
+            precedence = PRECEDENCE.get(token_type)
+            if precedence is None or precedence < min_precedence:
+                return left
+            operator = self._match(token_type)
+            left = self._builder.binary(mark, left, operator, self.__climb(precedence + 1))
+
     # (84)[OtherTerm] -> ɛ {< = then else fi do endwh ) end ; COMMA}
     # (85)[OtherTerm] -> [AddOp] [Exp] {+ -}
     def __other_term(self) -> TreeNode:
         node = self._node("OtherTerm")
         logger.debug("构造OtherTerm结点")
-        if self._peek_token().get_token_type() in (
-            TokenType.LT, TokenType.EQ, TokenType.RMIDPAREN, TokenType.THEN, TokenType.ELSE, TokenType.FI, TokenType.DO,
-            TokenType.ENDWH, TokenType.RPAREN, TokenType.END, TokenType.SEMI, TokenType.COMMA
-        ):
+        bit = self._peek_bit()
+        if bit & PREDICT[84]:
             node.set_children(self._node_null())
-        elif self._peek_token().get_token_type() in (TokenType.PLUS, TokenType.MINUS):
+        elif bit & PREDICT[85]:
             node.set_children(self.__add_op(), self.__exp())
         else:
-            self.error(
-                TokenType.LT, TokenType.EQ, TokenType.RMIDPAREN, TokenType.THEN, TokenType.ELSE, TokenType.FI,
-                TokenType.DO, TokenType.ENDWH, TokenType.RPAREN, TokenType.END, TokenType.SEMI, TokenType.COMMA,
-                TokenType.PLUS, TokenType.MINUS
-            )
+            self.error(*EXPECTED["OtherTerm"])
         logger.debug("OtherTerm结点设置完毕")
         return node
 
@@ -674,40 +729,34 @@ class RecursiveDescentParser(SyntexParser):
     def __other_factor(self) -> TreeNode:
         node = self._node("OtherFactor")
         logger.debug("构造OtherFactor结点")
-        if self._peek_token().get_token_type() in (
-            TokenType.PLUS, TokenType.MINUS, TokenType.LT, TokenType.EQ, TokenType.RMIDPAREN, TokenType.THEN,
-            TokenType.ELSE, TokenType.FI, TokenType.DO, TokenType.ENDWH, TokenType.RPAREN, TokenType.END,
-            TokenType.SEMI, TokenType.COMMA
-        ):
+        bit = self._peek_bit()
+        if bit & PREDICT[87]:
             node.set_children(self._node_null())
-        elif self._peek_token().get_token_type() in (TokenType.TIMES, TokenType.OVER):
+        elif bit & PREDICT[88]:
             node.set_children(self.__multi_op(), self.__term())
         else:
-            self.error(
-                TokenType.PLUS, TokenType.MINUS, TokenType.LT, TokenType.EQ, TokenType.RMIDPAREN, TokenType.THEN,
-                TokenType.ELSE, TokenType.FI, TokenType.DO, TokenType.ENDWH, TokenType.RPAREN, TokenType.END,
-                TokenType.SEMI, TokenType.COMMA
-            )
+            self.error(*EXPECTED["OtherFactor"])
         logger.debug("OtherFactor结点设置完毕")
         return node
 
     # (89)[Factor] -> ( [Exp] ) {(}
     # (90)[Factor] -> INTC {INTC}
-    # (91)[Factor] -> CHARC {ID}
+    # (91)[Factor] -> CHARACTER {CHARACTER}
     # (92)[Factor] -> [Variable] {ID}
     def __factor(self) -> TreeNode:
         node = self._node("Factor")
         logger.debug("构造Factor结点")
-        if self._peek_token().get_token_type() == TokenType.LPAREN:
+        bit = self._peek_bit()
+        if bit & PREDICT[89]:
             node.set_children(self._match(TokenType.LPAREN), self.__exp(), self._match(TokenType.RPAREN))
-        elif self._peek_token().get_token_type() == TokenType.INTC:
-            node.set_children(self._match(TokenType.INTC))
-        elif self._peek_token().get_token_type() == TokenType.CHARC:
+        elif bit & PREDICT[90]:
             node.set_children(self._match(TokenType.INTC))
-        elif self._peek_token().get_token_type() == TokenType.ID:
+        elif bit & PREDICT[91]:
+            node.set_children(self._match(TokenType.CHARACTER))
+        elif bit & PREDICT[92]:
             node.set_children(self.__variable())
         else:
-            self.error(TokenType.LPAREN, TokenType.INTC, TokenType.CHARC, TokenType.ID)
+            self.error(*EXPECTED["Factor"])
         logger.debug("Factor结点设置完毕")
         return node
 
@@ -725,22 +774,15 @@ class RecursiveDescentParser(SyntexParser):
     def __vari_more(self) -> TreeNode:
         node = self._node("VariMore")
         logger.debug("构造VariMore结点")
-        if self._peek_token().get_token_type() in (
-            TokenType.ASSIGN, TokenType.TIMES, TokenType.OVER, TokenType.PLUS, TokenType.MINUS, TokenType.LT,
-            TokenType.EQ, TokenType.THEN, TokenType.ELSE, TokenType.FI, TokenType.DO, TokenType.ENDWH,
-            TokenType.RPAREN, TokenType.END, TokenType.SEMI, TokenType.COMMA, TokenType.RMIDPAREN
-        ):
+        bit = self._peek_bit()
+        if bit & PREDICT[94]:
             node.set_children(self._node_null())
-        elif self._peek_token().get_token_type() == TokenType.LMIDPAREN:
+        elif bit & PREDICT[95]:
             node.set_children(self._match(TokenType.LMIDPAREN), self.__exp(), self._match(TokenType.RMIDPAREN))
-        elif self._peek_token().get_token_type() == TokenType.DOT:
+        elif bit & PREDICT[96]:
             node.set_children(self._match(TokenType.DOT), self.__filed_var())
         else:
-            self.error(
-                TokenType.ASSIGN, TokenType.TIMES, TokenType.OVER, TokenType.PLUS, TokenType.MINUS, TokenType.LT,
-                TokenType.EQ, TokenType.THEN, TokenType.ELSE, TokenType.FI, TokenType.DO, TokenType.ENDWH,
-                TokenType.RPAREN, TokenType.END, TokenType.SEMI, TokenType.COMMA, TokenType.RMIDPAREN, TokenType.DOT
-            )
+            self.error(*EXPECTED["VariMore"])
         logger.debug("VariMore结点设置完毕")
         return node
 
@@ -757,20 +799,13 @@ class RecursiveDescentParser(SyntexParser):
     def __filed_var_more(self) -> TreeNode:
         node = self._node("filedVarMore")
         logger.debug("构造filedVarMore结点")
-        if self._peek_token().get_token_type() in (
-            TokenType.ASSIGN, TokenType.TIMES, TokenType.OVER, TokenType.PLUS, TokenType.MINUS, TokenType.LT,
-            TokenType.EQ, TokenType.THEN, TokenType.ELSE, TokenType.FI, TokenType.DO, TokenType.ENDWH,
-            TokenType.RPAREN, TokenType.END, TokenType.SEMI, TokenType.COMMA, TokenType.RMIDPAREN
-        ):
+        bit = self._peek_bit()
+        if bit & PREDICT[98]:
             node.set_children(self._node_null())
-        elif self._peek_token().get_token_type() == TokenType.LMIDPAREN:
+        elif bit & PREDICT[99]:
             node.set_children(self._match(TokenType.LMIDPAREN), self.__exp(), self._match(TokenType.RMIDPAREN))
         else:
-            self.error(
-                TokenType.ASSIGN, TokenType.TIMES, TokenType.OVER, TokenType.PLUS, TokenType.MINUS, TokenType.LT,
-                TokenType.EQ, TokenType.THEN, TokenType.ELSE, TokenType.FI, TokenType.DO, TokenType.ENDWH,
-                TokenType.RPAREN, TokenType.END, TokenType.SEMI, TokenType.COMMA, TokenType.LMIDPAREN
-            )
+            self.error(*EXPECTED["FieldVarMore"])
         logger.debug("filedVarMore结点设置完毕")
         return node
 
@@ -779,12 +814,13 @@ class RecursiveDescentParser(SyntexParser):
     def __cmp_op(self) -> TreeNode:
         node = self._node("CmpOp")
         logger.debug("构造CmpOp结点")
-        if self._peek_token().get_token_type() == TokenType.LT:
+        bit = self._peek_bit()
+        if bit & PREDICT[100]:
             node.set_children(self._match(TokenType.LT))
-        elif self._peek_token().get_token_type() == TokenType.EQ:
+        elif bit & PREDICT[101]:
             node.set_children(self._match(TokenType.EQ))
         else:
-            self.error(TokenType.LT, TokenType.EQ)
+            self.error(*EXPECTED["CmpOp"])
         logger.debug("CmpOp结点设置完毕")
         return node
 
@@ -793,12 +829,13 @@ class RecursiveDescentParser(SyntexParser):
     def __add_op(self) -> TreeNode:
         node = self._node("AddOp")
         logger.debug("构造AddOp结点")
-        if self._peek_token().get_token_type() == TokenType.PLUS:
+        bit = self._peek_bit()
+        if bit & PREDICT[102]:
             node.set_children(self._match(TokenType.PLUS))
-        elif self._peek_token().get_token_type() == TokenType.MINUS:
+        elif bit & PREDICT[103]:
             node.set_children(self._match(TokenType.MINUS))
         else:
-            self.error(TokenType.PLUS, TokenType.MINUS)
+            self.error(*EXPECTED["AddOp"])
         logger.debug("AddOp结点设置完毕")
         return node
 
@@ -807,11 +844,12 @@ class RecursiveDescentParser(SyntexParser):
     def __multi_op(self) -> TreeNode:
         node = self._node("MultiOp")
         logger.debug("构造MultiOp结点")
-        if self._peek_token().get_token_type() == TokenType.TIMES:
+        bit = self._peek_bit()
+        if bit & PREDICT[104]:
             node.set_children(self._match(TokenType.TIMES))
-        elif self._peek_token().get_token_type() == TokenType.OVER:
+        elif bit & PREDICT[105]:
             node.set_children(self._match(TokenType.OVER))
         else:
-            self.error(TokenType.TIMES, TokenType.OVER)
+            self.error(*EXPECTED["MultOp"])
         logger.debug("MultiOp结点设置完毕")
         return node
@@ -1,10 +1,15 @@
 from typing import Union
 
 from parser.TreeNode import TreeNode
+from parser.TreeIndex import TreeIndex
+from parser.TreeQuery import TreeQuery
+from parser.PositionIndex import PositionIndex
 
 
 class SyntaxTree:
     __root: TreeNode
+    __index: Union[TreeIndex, None] = None
+    __positions: Union[PositionIndex, None] = None
 
     def __init__(self, root: Union[TreeNode, None]):
         self.__root = root
@@ -18,6 +23,29 @@ class SyntaxTree:
 
     def set_root(self, root: TreeNode) -> None:
         self.__root = root
+        self.__index = None
+        self.__positions = None
+
+    def get_index(self) -> TreeIndex:
+        # 首次使用时建立, 之后的查询共用; 修改树结构后需重新 set_root
+        if self.__index is None:
+            self.__index = TreeIndex(self.__root)
+        return self.__index
+
+    def get_positions(self, source: Union[str, list]) -> PositionIndex:
+        # source 是分析时的源文本; 与 get_index 一样只在首次使用时建立
+        if self.__positions is None:
+            self.__positions = PositionIndex(self.__root, source)
+        return self.__positions
+
+    def find_all(self, kind: str) -> list:
+        return self.get_index().get_nodes(kind)
+
+    def get_parent(self, node: TreeNode) -> Union[TreeNode, None]:
+        return self.get_index().get_parent(node)
+
+    def query(self, path: str) -> list:
+        return TreeQuery.compile(path).match(self.get_index())
 
     @staticmethod
     def __is_child_of(node: TreeNode, parent: TreeNode) -> bool:
@@ -1,80 +1,165 @@
-from typing import Union
-from loguru import logger
+from collections import deque
+from itertools import takewhile
+from typing import Union, Iterable, Iterator
 from abc import ABC, abstractmethod
 
+from lexer.log import logger
 from parser.TreeNode import TreeNode
 from lexer.Token import Token, TokenType
+from parser.Grammar import BITS
 from parser.ParseResult import ParseResult
-from lexer.scanner import Lexer, LexerResult
+from lexer.scanner import Lexer
+from lexer.PhaseMetrics import PhaseMetrics
+from parser.NodeBuilder import NodeBuilder, EventBuilder, EventConsumer, Recognizer
 
 
 class SyntexParser(ABC):
+    # 文法是 LL(1) 的, 只需要向前看一个 token
+    LOOKAHEAD: int = 1
     __error_token: Token = Token.by_type(TokenType.ERROR)
-    __current_token_index: int = 0
-    _token_list: list = []
+    __lookahead: deque
+    _tokens: Iterator[Token] = iter(())
     _last_read: Token = __error_token
     _errors: list = []
+    _token_count: int = 0
+    _builder: NodeBuilder
+
+    def __init__(self, metrics: bool = False, trace_memory: bool = False):
+        self.__lookahead = deque(maxlen=self.LOOKAHEAD)
+        self.__tree_builder = NodeBuilder()
+        self._builder = self.__tree_builder
+        self.__lexer = Lexer()
+        self._metrics = metrics
+        self._trace_memory = trace_memory
+        self.reset()
+
+    def reset(self) -> None:
+        # 同一个实例可以连续分析多个文件; 向前看缓冲区和词法分析器复用, 错误列表交给了结果对象所以重新创建
+        self._errors = []
+        self._tokens = iter(())
+        self.__lookahead.clear()
+        self._last_read = self.__error_token
+        self._token_count = 0
 
     @abstractmethod
-    def parse_token_list(self, token_list: list) -> ParseResult: ...
+    def parse_tokens(self, tokens: Iterable[Token]) -> ParseResult: ...
+
+    def parse_token_list(self, token_list: list) -> ParseResult:
+        return self.parse_tokens(token_list)
 
     def parse(self, fp: list) -> ParseResult:
-        self._errors = []
-        result = ParseResult()
-        laxer = Lexer()
+        self.reset()
+        laxer = self.__lexer
+        tokens = laxer.iter_tokens(fp)
+        lex_metrics = None
+        if self._metrics:
+            # 流水线中词法分析穿插在语法分析里, 分段累计取 token 的耗时再从语法分析阶段扣除
+            lex_metrics = PhaseMetrics("lex", self._trace_memory)
+            tokens = lex_metrics.iterate(tokens)
         try:
-            laxer_result = laxer.get_result(fp)
-            if not laxer_result.get_errors():
-                self._token_list = laxer_result.get_token_list()
-            else:
-                self._errors.append("Laxer Error")
-                self._errors += laxer_result.get_errors()
+            # 词法和语法分析流水线进行, 词法一出错就停止向语法分析供给 token
+            result = self.parse_tokens(takewhile(lambda token: not laxer.errors, tokens))
+            if laxer.errors:
+                for _ in tokens:
+                    pass
+                result = ParseResult()
+                self._errors = ["Laxer Error"] + laxer.errors
                 result.set_errors(self._errors)
-                return result
         except Exception as e:
+            result = ParseResult()
             self._errors.append(str(e))
             result.set_errors(self._errors)
-            return result
-        return self.parse_token_list(self._token_list)
+        if lex_metrics:
+            metrics = result.get_metrics() or {}
+            if "parse" in metrics:
+                metrics["parse"].subtract(lex_metrics)
+            metrics["lex"] = lex_metrics
+            result.set_metrics(metrics)
+        return result
+
+    def parse_events(self, fp: list, consumer: EventConsumer) -> ParseResult:
+        # 不建树, 分析过程中把 enter/leave/token/empty 事件交给 consumer; 结果里只有错误
+        return self.__parse_with(EventBuilder(consumer), fp)
+
+    def recognize(self, fp: list) -> ParseResult:
+        # 只检查语法, 不分配结点; 错误信息与 parse 相同
+        return self.__parse_with(Recognizer(), fp)
+
+    def __parse_with(self, builder: NodeBuilder, fp: list) -> ParseResult:
+        self._builder = builder
+        try:
+            return self.parse(fp)
+        finally:
+            self._builder = self.__tree_builder
+
+    def _begin_phase(self, phase: str) -> Union[PhaseMetrics, None]:
+        if not self._metrics:
+            return None
+        metrics = PhaseMetrics(phase, self._trace_memory)
+        metrics.start()
+        return metrics
+
+    def _end_phase(self, metrics: Union[PhaseMetrics, None], result: ParseResult) -> None:
+        if not metrics:
+            return
+        metrics.stop()
+        metrics.token_count = self._token_count
+        if result.get_tree():
+            metrics.node_count = result.get_tree().get_index().size()
+        result.set_metrics({metrics.phase: metrics})
+
+    def _set_tokens(self, tokens: Iterable[Token]) -> None:
+        self.reset()
+        self._tokens = iter(tokens)
+
+    def _has_token(self) -> bool:
+        return self._peek_token() is not self.__error_token
 
     def _get_token(self) -> Union[Token, None]:
-        token = None
-        if self.__current_token_index < len(self._token_list):
-            token = self._token_list[self.__current_token_index]
-            self.__current_token_index += 1
+        # 已消费的 token 不再被解析器引用 (除 _last_read 用于报错位置)
+        if self.__lookahead:
+            token = self.__lookahead.popleft()
+        else:
+            token = next(self._tokens, None)
+        if token:
             logger.info(f"get next token = {token.to_string()}")
             self._last_read = token
+            self._token_count += 1
         else:
             logger.info("EOF")
         return token
 
     def _peek_token(self) -> Token:
-        token = self.__error_token
-        if self.__current_token_index < len(self._token_list):
-            token = self._token_list[self.__current_token_index]
-        return token
+        if not self.__lookahead:
+            token = next(self._tokens, None)
+            if token is None:
+                return self.__error_token
+            self.__lookahead.append(token)
+        return self.__lookahead[0]
+
+    def _peek_bit(self) -> int:
+        # 向前看 token 的类别位, 与 Grammar 中的预测集按位与即可做出选择
+        return BITS[self._peek_token().get_token_type()]
 
-    @staticmethod
-    def _node(value: str):
-        return TreeNode.by_value(value)
+    def _node(self, value: str) -> TreeNode:
+        return self._builder.node(value)
 
-    @staticmethod
-    def _node_null():
-        return TreeNode.by_value("ɛ")
+    def _node_null(self) -> TreeNode:
+        return self._builder.empty()
 
     @logger.catch
     def _match(self, expected: TokenType) -> TreeNode:
         input = self._get_token()
-        node = self._node_null()
+        node = None
         # logger.error(input.to_string())
         if input:
             token_type = input.get_token_type()
             if token_type == expected:
                 logger.info(f"match {input.to_string()}")
-                if token_type in (TokenType.ID, TokenType.INTC, TokenType.CHARACTER):
-                    node = self._node(input.get_value())
-                logger.info(f"node.value = {node.get_value()}")
+                node = self._builder.terminal(input)
+                logger.info(f"node.value = {input.get_value()}")
             else:
+                node = self._builder.mismatch()
                 # self._errors.append(f"Unexpected token near `{input.get_value()}`. `{expected.value}` expected. at [{input.get_line()}:{input.get_column()}]")
                 self._errors.append(f"Unexpected token near `{input.get_value()}`. at [{input.get_line()}]")
                 # logger.error(f"Unexpected token near `{input.get_value()}`. `{expected.value}` expected. at [{input.get_line()}:{input.get_column()}]")
@@ -86,6 +171,7 @@ class SyntexParser(ABC):
 
     @logger.catch
     def error(self, *token_types: TokenType):
+        self._builder.error()
         logger.error(f"匹配错误{self._peek_token().to_string()}")
         string = ""
         for token in token_types:
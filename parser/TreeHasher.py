@@ -0,0 +1,53 @@
+import hashlib
+
+from parser.TreeNode import TreeNode
+
+
+def _digest(data: bytes) -> int:
+    # 哈希要在进程之间稳定 (builtins.hash 对 str 加了随机种子), 所以用 blake2b
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big")
+
+
+EMPTY = _digest(b"\xc9\x9b")
+
+
+class TreeHasher:
+    # Merkle 式结构哈希: 自底向上, 结点的哈希由它的种类 (终结符还有值) 和子结点的哈希算出,
+    # 结构相同的子树哈希相同. normalize_identifiers 时所有 ID 视为同一个, 只改变量名不影响哈希
+    __normalize_identifiers: bool
+
+    def __init__(self, normalize_identifiers: bool = False):
+        self.__normalize_identifiers = normalize_identifiers
+
+    def label(self, node: TreeNode) -> str:
+        kind = node.get_kind()
+        if kind == "ID" and self.__normalize_identifiers:
+            return kind
+        if kind in ("ID", "INTC", "CHARACTER"):
+            return f"{kind}:{node.get_value()}"
+        return kind
+
+    def hash_tree(self, root: TreeNode) -> dict:
+        # 返回 id(node) -> (hash, 子树结点数); 后序遍历, 不递归
+        # 出错恢复留下的 None 子结点按 ɛ 计入
+        result = {}
+        stack = [(root, False)]
+        while stack:
+            node, visited = stack.pop()
+            children = node.get_children() or []
+            if not visited:
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(children) if child)
+                continue
+            result[id(node)] = self.combine(self.label(node), [result[id(child)] if child else (EMPTY, 0) for child in children])
+        return result
+
+    @staticmethod
+    def combine(label: str, children: list) -> tuple:
+        # children 是子结点的 (hash, size)
+        parts = [label.encode()]
+        size = 1
+        for child_hash, child_size in children:
+            parts.append(child_hash.to_bytes(8, "big"))
+            size += child_size
+        return _digest(b"\x00".join(parts)), size
@@ -0,0 +1,84 @@
+from bisect import bisect_left, bisect_right
+from typing import Union
+
+from parser.TreeNode import TreeNode
+
+
+class TreeIndex:
+    # 一次先序遍历建立: 结点类别 -> 结点列表 (先序), 父结点指针, 以及先序区间 [pre, last] 用于 O(1) 祖先判断
+    __nodes: list
+    __kinds: dict
+    __pre_orders: dict
+    __parents: dict
+    __lasts: dict
+
+    def __init__(self, root: Union[TreeNode, None]):
+        self.__nodes = []
+        self.__kinds = {}
+        self.__pre_orders = {}
+        self.__parents = {}
+        self.__lasts = {}
+        if root:
+            self.__build(root)
+
+    def __build(self, root: TreeNode) -> None:
+        # 显式栈, 深层的语句链不会触发递归上限
+        self.__parents[id(root)] = None
+        stack = [(root, False)]
+        while stack:
+            node, leaving = stack.pop()
+            if leaving:
+                self.__lasts[id(node)] = len(self.__nodes) - 1
+                continue
+            self.__pre_orders[id(node)] = len(self.__nodes)
+            self.__nodes.append(node)
+            kind = node.get_kind()
+            if kind not in self.__kinds:
+                self.__kinds[kind] = ([], [])
+            self.__kinds[kind][0].append(node)
+            self.__kinds[kind][1].append(len(self.__nodes) - 1)
+            stack.append((node, True))
+            children = node.get_children()
+            if children:
+                for child in reversed(children):
+                    if child:
+                        self.__parents[id(child)] = node
+                        stack.append((child, False))
+
+    def size(self) -> int:
+        return len(self.__nodes)
+
+    def get_nodes(self, kind: str = None) -> list:
+        if kind is None:
+            return self.__nodes
+        return self.__kinds[kind][0] if kind in self.__kinds else []
+
+    def get_kinds(self) -> list:
+        return list(self.__kinds)
+
+    def count(self, kind: str) -> int:
+        return len(self.__kinds[kind][0]) if kind in self.__kinds else 0
+
+    def get_parent(self, node: TreeNode) -> Union[TreeNode, None]:
+        return self.__parents.get(id(node))
+
+    def get_ancestors(self, node: TreeNode) -> list:
+        ancestors = []
+        parent = self.__parents.get(id(node))
+        while parent:
+            ancestors.append(parent)
+            parent = self.__parents.get(id(parent))
+        return ancestors
+
+    def is_ancestor(self, ancestor: TreeNode, node: TreeNode) -> bool:
+        pre = self.__pre_orders[id(ancestor)]
+        return pre < self.__pre_orders[id(node)] <= self.__lasts[id(ancestor)]
+
+    def get_descendants(self, node: TreeNode, kind: str) -> list:
+        # 同类结点按先序排列, 子树内的结点在先序区间 (pre, last] 里, 二分即可取出
+        if kind not in self.__kinds:
+            return []
+        nodes, orders = self.__kinds[kind]
+        start = bisect_right(orders, self.__pre_orders[id(node)])
+        end = bisect_left(orders, self.__lasts[id(node)] + 1)
+        return nodes[start:end]
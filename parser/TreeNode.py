@@ -1,10 +1,15 @@
 from typing import Union
 
+from lexer.TokenType import TokenType
+
 
 class TreeNode:
     __children: Union[None, list]
     __value: str
     __width: int
+    __token_type: Union[None, TokenType] = None
+    __line: int = 0
+    __column: int = 0
 
     def __init__(self, children: Union[None, list], value: str):
         self.__children = children
@@ -36,5 +41,84 @@ class TreeNode:
     def get_width(self) -> int:
         return self.__width
 
+    def get_token_type(self) -> Union[None, TokenType]:
+        return self.__token_type
+
+    def set_token_type(self, token_type: TokenType) -> None:
+        self.__token_type = token_type
+
+    def get_line(self) -> int:
+        return self.__line
+
+    def get_column(self) -> int:
+        return self.__column
+
+    def set_position(self, line: int, column: int) -> None:
+        self.__line = line
+        self.__column = column
+
+    def get_kind(self) -> str:
+        # 终结符结点按 token 类型归类 (ID, INTC, BEGIN ...), 避免与同名的非终结符混淆
+        if self.__token_type:
+            return self.__token_type.name
+        return self.__value
+
+    def to_dict(self) -> dict:
+        # 与 to_table 一样不按深度递归, 子结点在入栈时就挂到父结点下, 顺序不变
+        root = {"name": self.__value, "children": []}
+        stack = [(self, root)]
+        while stack:
+            node, data = stack.pop()
+            for child in node.__children or []:
+                if child:
+                    child_data = {"name": child.__value, "children": []}
+                    stack.append((child, child_data))
+                else:
+                    child_data = {"name": "ɛ"}
+                data["children"].append(child_data)
+        return root
+
+    def to_table(self) -> list:
+        # 先序的扁平结点表, 每行 (值, token 类型名, 行, 列, 子结点数), 没有子结点列表时子结点数为 -1, 空子结点为 None.
+        # StmList / StmMore 使树很深, 逐层递归的 pickle 会超出递归深度, 跨进程传递时改传这张表
+        rows = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if not node:
+                rows.append(None)
+                continue
+            children = node.__children
+            token_type = node.__token_type.name if node.__token_type else None
+            rows.append((node.__value, token_type, node.__line, node.__column, -1 if children is None else len(children)))
+            if children:
+                stack.extend(reversed(children))
+        return rows
+
+    @classmethod
+    def from_table(cls, rows: list):
+        # to_table 的逆过程; 栈中是 [结点, 尚缺的子结点数]
+        root = None
+        stack = []
+        for row in rows:
+            node = None
+            if row is not None:
+                value, token_type, line, column, count = row
+                node = cls(None if count < 0 else [], value)
+                if token_type:
+                    node.set_token_type(TokenType[token_type])
+                node.set_position(line, column)
+            if stack:
+                parent = stack[-1]
+                parent[0].__children.append(node)
+                parent[1] -= 1
+                if not parent[1]:
+                    stack.pop()
+            else:
+                root = node
+            if node is not None and count > 0:
+                stack.append([node, count])
+        return root
+
     def to_string(self) -> str:
         return f"[TreeNode value={self.__value}]"
@@ -0,0 +1,99 @@
+from functools import lru_cache
+
+from parser.TreeNode import TreeNode
+from parser.TreeIndex import TreeIndex
+
+CHILD = "/"
+DESCENDANT = "//"
+ANY = "*"
+
+
+class TreeQuery:
+    # 路径查询, 如 `ProcDec//AssignmentRest/Exp`:
+    #   `/` 子结点, `//` 后代结点, `*` 任意类别, 以 `/` 开头表示从根结点开始匹配
+    # 从最后一步的同类结点出发沿父指针向上验证; `//` 向上查找时经过的每个结点都记下结果,
+    # 每个结点对每一步至多向上走一次, 代价不超过候选结点数加上它们的祖先数, 乘以步数
+    __path: str
+    __anchored: bool
+    __steps: tuple
+
+    def __init__(self, path: str, anchored: bool, steps: tuple):
+        self.__path = path
+        self.__anchored = anchored
+        self.__steps = steps
+
+    @classmethod
+    @lru_cache(maxsize=256)
+    def compile(cls, path: str):
+        text = path.strip()
+        anchored = text.startswith(CHILD) and not text.startswith(DESCENDANT)
+        if text.startswith(DESCENDANT):
+            text = text[len(DESCENDANT):]
+        elif anchored:
+            text = text[len(CHILD):]
+        steps = []
+        axis = DESCENDANT
+        for part in text.split(CHILD):
+            if part == "":
+                if axis == DESCENDANT or not steps:
+                    raise ValueError(f"Invalid query `{path}`.")
+                axis = DESCENDANT
+                continue
+            if not (part == ANY or part.replace("ɛ", "a").isidentifier()):
+                raise ValueError(f"Invalid step `{part}` in query `{path}`.")
+            steps.append((axis, part))
+            axis = CHILD
+        if not steps or axis == DESCENDANT:
+            raise ValueError(f"Invalid query `{path}`.")
+        return cls(path, anchored, tuple(steps))
+
+    def get_path(self) -> str:
+        return self.__path
+
+    def match(self, index: TreeIndex) -> list:
+        last = self.__steps[-1][1]
+        candidates = index.get_nodes(None if last == ANY else last)
+        memo = {}
+        return [node for node in candidates if self.__match_up(index, node, len(self.__steps) - 1, memo)]
+
+    def __match_up(self, index: TreeIndex, node: TreeNode, step: int, memo: dict) -> bool:
+        # node 已满足第 step 步, 检查它向上的路径能否满足前面的步骤
+        key = (id(node), step)
+        if key in memo:
+            return memo[key]
+        axis = self.__steps[step][0]
+        parent = index.get_parent(node)
+        if step == 0:
+            matched = parent is None if self.__anchored else True
+        elif axis == CHILD:
+            matched = parent is not None and self.__accepts(parent, step - 1) and self.__match_up(index, parent, step - 1, memo)
+        else:
+            matched = self.__match_ancestor(index, node, step - 1, memo)
+        memo[key] = matched
+        return matched
+
+    def __match_ancestor(self, index: TreeIndex, node: TreeNode, step: int, memo: dict) -> bool:
+        # node 是否有满足第 step 步 (连同前面的步骤) 的祖先. 途经的结点答案相同, 一并记入 memo,
+        # 之后从它们下方出发的查找走到这里就停下
+        visited = []
+        matched = False
+        while True:
+            key = (id(node), step, DESCENDANT)
+            if key in memo:
+                matched = memo[key]
+                break
+            visited.append(key)
+            parent = index.get_parent(node)
+            if parent is None:
+                break
+            if self.__accepts(parent, step) and self.__match_up(index, parent, step, memo):
+                matched = True
+                break
+            node = parent
+        for key in visited:
+            memo[key] = matched
+        return matched
+
+    def __accepts(self, node: TreeNode, step: int) -> bool:
+        kind = self.__steps[step][1]
+        return kind == ANY or node.get_kind() == kind
@@ -0,0 +1,97 @@
+import os
+import time
+import asyncio
+import multiprocessing
+from collections import deque
+from typing import Iterable, AsyncIterable, AsyncIterator, Union
+from concurrent.futures import ProcessPoolExecutor
+
+from lexer.log import logger
+from service.tasks import compile_packed, unpack_compiled
+from service.CompileResult import CompileResult
+
+
+def _init_worker() -> None:
+    logger.set_quiet(True)
+
+
+async def _iterate(sources: Union[Iterable[str], AsyncIterable[str]]) -> AsyncIterator[str]:
+    if hasattr(sources, "__aiter__"):
+        async for source in sources:
+            yield source
+    else:
+        for source in sources:
+            yield source
+
+
+class AsyncCompiler:
+    __executor: ProcessPoolExecutor
+    __semaphores: dict
+    __limit: int
+
+    def __init__(self, workers: int = 0, limit: int = 0):
+        # limit 是同时在途 (排队 + 执行) 的请求上限, 超出的调用在事件循环里等待, 不会堆进进程池队列
+        workers = workers or os.cpu_count() or 1
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["service.tasks"])
+        self.__executor = ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker)
+        self.__limit = limit or workers * 2
+        self.__semaphores = {}
+
+    def __semaphore(self) -> asyncio.Semaphore:
+        # asyncio.Semaphore 绑定在首次使用它的事件循环上, 每个循环各用一个
+        loop = asyncio.get_running_loop()
+        if loop not in self.__semaphores:
+            self.__semaphores = {loop: asyncio.Semaphore(self.__limit)}
+        return self.__semaphores[loop]
+
+    async def compile(self, source: str) -> CompileResult:
+        start = time.perf_counter()
+        async with self.__semaphore():
+            # 被取消时 run_in_executor 会一并取消尚未开始执行的进程池任务
+            packed = await asyncio.get_running_loop().run_in_executor(self.__executor, compile_packed, source)
+        result = unpack_compiled(packed)
+        result.set_timing("total", time.perf_counter() - start)
+        return result
+
+    async def compile_many(self, sources: Union[Iterable[str], AsyncIterable[str]]) -> AsyncIterator[CompileResult]:
+        # 按输入顺序产出结果, 最多 limit 个在途, 消费者停止迭代时取消剩余任务
+        pending = deque()
+        try:
+            async for source in _iterate(sources):
+                pending.append(asyncio.ensure_future(self.compile(source)))
+                if len(pending) >= self.__limit:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def close(self, cancel: bool = True) -> None:
+        self.__executor.shutdown(wait=False, cancel_futures=cancel)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+
+_default: Union[AsyncCompiler, None] = None
+
+
+def _default_compiler() -> AsyncCompiler:
+    global _default
+    if _default is None:
+        _default = AsyncCompiler()
+    return _default
+
+
+async def compile_async(source: str) -> CompileResult:
+    return await _default_compiler().compile(source)
+
+
+async def compile_many(sources: Union[Iterable[str], AsyncIterable[str]]) -> AsyncIterator[CompileResult]:
+    async for result in _default_compiler().compile_many(sources):
+        yield result
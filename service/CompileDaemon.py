@@ -0,0 +1,262 @@
+import os
+import sys
+import json
+import queue
+import resource
+import argparse
+import threading
+import socketserver
+import multiprocessing
+import multiprocessing.connection
+from typing import Union, Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from lexer.log import logger
+from service.tasks import METHODS, RESPONSES
+
+# JSON-RPC 2.0 错误码, -32000 起为自定义
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+TIME_LIMIT_EXCEEDED = -32000
+MEMORY_LIMIT_EXCEEDED = -32001
+
+
+class _Text(str):
+    # _dumps 栈中已经编码好的片段
+    pass
+
+
+def _dumps(value) -> str:
+    # 与 json.dumps 的输出相同; 语法树的嵌套深度随语句数增长, json 模块按深度递归会超出递归深度, 这里用显式栈
+    parts = []
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, _Text):
+            parts.append(item)
+        elif isinstance(item, dict):
+            parts.append("{")
+            stack.append(_Text("}"))
+            for index, (key, child) in reversed(list(enumerate(item.items()))):
+                stack.append(child)
+                stack.append(_Text((", " if index else "") + json.dumps(str(key), ensure_ascii=False) + ": "))
+        elif isinstance(item, (list, tuple)):
+            parts.append("[")
+            stack.append(_Text("]"))
+            for index, child in reversed(list(enumerate(item))):
+                stack.append(child)
+                if index:
+                    stack.append(_Text(", "))
+        else:
+            parts.append(json.dumps(item, ensure_ascii=False))
+    return "".join(parts)
+
+
+class RequestError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def _address_space() -> int:
+    try:
+        with open("/proc/self/statm", "r") as r:
+            return int(r.read().split()[0]) * resource.getpagesize()
+    except (OSError, ValueError):
+        return 0
+
+
+def _worker_main(connection, memory_limit: int) -> None:
+    # 逐 token 的日志在常驻进程里只是开销
+    logger.set_quiet(True)
+    if memory_limit:
+        # 限额按进程启动后的增量计算, 一个 worker 同时只处理一个请求
+        limit = _address_space() + memory_limit
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    while True:
+        try:
+            method, source = connection.recv()
+        except EOFError:
+            return
+        try:
+            connection.send((0, METHODS[method](source)))
+        except MemoryError:
+            connection.send((MEMORY_LIMIT_EXCEEDED, "Memory limit exceeded."))
+            return
+        except Exception as e:
+            connection.send((INTERNAL_ERROR, str(e)))
+
+
+class CompileWorker:
+    __connection: multiprocessing.connection.Connection
+    __process: multiprocessing.Process
+
+    def __init__(self, context, memory_limit: int):
+        self.__connection, child = context.Pipe()
+        self.__process = context.Process(target=_worker_main, args=(child, memory_limit), daemon=True)
+        self.__process.start()
+        child.close()
+
+    def call(self, method: str, source: str, timeout: float) -> dict:
+        try:
+            self.__connection.send((method, source))
+            if not self.__connection.poll(timeout):
+                self.kill()
+                raise RequestError(TIME_LIMIT_EXCEEDED, f"Time limit of {timeout}s exceeded.")
+            code, payload = self.__connection.recv()
+        except (EOFError, OSError):
+            self.kill()
+            raise RequestError(INTERNAL_ERROR, "Worker exited unexpectedly.")
+        if code == MEMORY_LIMIT_EXCEEDED:
+            # worker 发出这个错误后自行退出, 退出前 is_alive 仍为真; 这里直接结束它, 不让它回到空闲队列
+            self.kill()
+        if code:
+            raise RequestError(code, payload)
+        return payload
+
+    def is_alive(self) -> bool:
+        return self.__process.is_alive()
+
+    def kill(self) -> None:
+        if self.__process.is_alive():
+            self.__process.kill()
+        self.__process.join()
+        self.__connection.close()
+
+
+class CompileDaemon:
+    __timeout: float
+    __memory_limit: int
+    __idle: queue.Queue
+    __size: int
+
+    def __init__(self, workers: int = 0, timeout: float = 10.0, memory_limit: int = 512 * 1024 * 1024):
+        # forkserver 预先导入编译器, worker 从干净且已预热的进程 fork 出来
+        self.__context = multiprocessing.get_context("forkserver")
+        self.__context.set_forkserver_preload(["service.tasks"])
+        self.__timeout = timeout
+        self.__memory_limit = memory_limit
+        self.__idle = queue.Queue()
+        self.__size = workers or os.cpu_count() or 1
+        for _ in range(self.__size):
+            self.__idle.put(self.__spawn())
+        self.__executor = ThreadPoolExecutor(self.__size)
+
+    def __spawn(self) -> CompileWorker:
+        return CompileWorker(self.__context, self.__memory_limit)
+
+    @staticmethod
+    def __read_source(params) -> str:
+        if not isinstance(params, dict):
+            raise RequestError(INVALID_PARAMS, "Params must be an object.")
+        if isinstance(params.get("source"), str):
+            return params["source"]
+        if isinstance(params.get("path"), str):
+            try:
+                with open(params["path"], "r", encoding="utf-8") as r:
+                    return r.read()
+            except OSError as e:
+                raise RequestError(INVALID_PARAMS, str(e))
+        raise RequestError(INVALID_PARAMS, "Either `source` or `path` is required.")
+
+    def call(self, method: str, params: dict) -> dict:
+        if method not in METHODS:
+            raise RequestError(METHOD_NOT_FOUND, f"Method `{method}` not found.")
+        source = self.__read_source(params)
+        worker = self.__idle.get()
+        try:
+            result = worker.call(method, source, self.__timeout)
+        finally:
+            self.__idle.put(worker if worker.is_alive() else self.__spawn())
+        return RESPONSES[method](result) if method in RESPONSES else result
+
+    def handle(self, line: str) -> Union[dict, None]:
+        request_id = None
+        try:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                raise RequestError(PARSE_ERROR, "Parse error.")
+            if not isinstance(request, dict) or request.get("jsonrpc") != "2.0" or not isinstance(request.get("method"), str):
+                raise RequestError(INVALID_REQUEST, "Invalid request.")
+            request_id = request.get("id")
+            result = self.call(request["method"], request.get("params", {}))
+            if "id" not in request:
+                return None
+            return {"jsonrpc": "2.0", "id": request_id, "result": result}
+        except RequestError as e:
+            return {"jsonrpc": "2.0", "id": request_id, "error": {"code": e.code, "message": e.message}}
+
+    def serve(self, lines: Iterable[str], write: Callable[[str], None]) -> None:
+        # 同一连接上的请求并发处理, 响应按完成顺序写回, 由 id 对应
+        lock = threading.Lock()
+
+        def respond(line: str) -> None:
+            response = self.handle(line)
+            if response is not None:
+                with lock:
+                    write(_dumps(response) + "\n")
+
+        futures = [self.__executor.submit(respond, line) for line in lines if line.strip()]
+        wait(futures)
+
+    def serve_stdio(self) -> None:
+        def write(data: str) -> None:
+            sys.stdout.write(data)
+            sys.stdout.flush()
+
+        self.serve(sys.stdin, write)
+
+    def serve_unix(self, path: str) -> None:
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                def write(data: str) -> None:
+                    self.wfile.write(data.encode("utf-8"))
+                    self.wfile.flush()
+
+                daemon.serve((line.decode("utf-8") for line in self.rfile), write)
+
+        if os.path.exists(path):
+            os.unlink(path)
+        server = socketserver.ThreadingUnixStreamServer(path, Handler)
+        server.daemon_threads = True
+        logger.info(f"listening on {path}")
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+            os.unlink(path)
+
+    def close(self) -> None:
+        self.__executor.shutdown()
+        while not self.__idle.empty():
+            self.__idle.get().kill()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="SNL compile daemon (JSON-RPC 2.0, one request per line)")
+    arg_parser.add_argument("--socket", help="listen on this Unix socket instead of stdin/stdout")
+    arg_parser.add_argument("--workers", type=int, default=0, help="number of worker processes, defaults to CPU count")
+    arg_parser.add_argument("--timeout", type=float, default=10.0, help="per-request time limit in seconds")
+    arg_parser.add_argument("--memory", type=int, default=512, help="per-request memory limit in MiB, 0 to disable")
+    args = arg_parser.parse_args()
+    daemon = CompileDaemon(args.workers, args.timeout, args.memory * 1024 * 1024)
+    try:
+        if args.socket:
+            daemon.serve_unix(args.socket)
+        else:
+            daemon.serve_stdio()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+from parser.ParseResult import ParseResult
+
+
+class CompileResult:
+    __parse_result: ParseResult
+    __timings: dict
+
+    def __init__(self, parse_result: ParseResult, timings: dict):
+        self.__parse_result = parse_result
+        self.__timings = timings
+
+    def get_parse_result(self) -> ParseResult:
+        return self.__parse_result
+
+    def get_timings(self) -> dict:
+        return self.__timings
+
+    def set_timing(self, phase: str, seconds: float) -> None:
+        self.__timings[phase] = seconds
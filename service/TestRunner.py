@@ -0,0 +1,216 @@
+import os
+import time
+import shutil
+import tempfile
+import subprocess
+import multiprocessing
+from typing import Union
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from lexer.log import logger
+from ir.CallGraph import prune
+from interpreter.Limits import Limits
+from ir.ProgramBuilder import ProgramBuilder
+from ir.SemanticChecker import SemanticChecker
+from interpreter.Interpreter import Interpreter
+from backend.toolchain import compile_c, find_compiler
+from backend.CGenerator import CGenerator
+from parser.RecursiveDescentParser import RecursiveDescentParser
+
+NATIVE = "native"
+INTERPRET = "interpret"
+
+# 每个进程池 worker 一个解释器, 由 initializer 用程序的 AST 构造一次, 之后各测试用例共用
+_interpreter: Union[Interpreter, None] = None
+
+
+def _init_worker(program, limits: Limits) -> None:
+    global _interpreter
+    logger.set_quiet(True)
+    _interpreter = Interpreter(program, limits)
+
+
+def _interpret(input: str) -> tuple:
+    start = time.perf_counter()
+    result = _interpreter.run(input)
+    return result.to_dict(), time.perf_counter() - start
+
+
+def normalize(text: str) -> list:
+    # 逐行去掉行尾空白, 忽略末尾空行
+    lines = [line.rstrip() for line in text.splitlines()]
+    while lines and not lines[-1]:
+        lines.pop()
+    return lines
+
+
+class TestCase:
+    name: str
+    input: str
+    expected: str
+
+    def __init__(self, name: str, input: str, expected: str):
+        self.name = name
+        self.input = input
+        self.expected = expected
+
+    @classmethod
+    def discover(cls, directory: str) -> list:
+        # 目录里的 <name>.in 与 <name>.out 配成一个用例, 按名字排序
+        cases = []
+        for entry in sorted(os.listdir(directory)):
+            name, extension = os.path.splitext(entry)
+            expected = os.path.join(directory, name + ".out")
+            if extension != ".in" or not os.path.isfile(expected):
+                continue
+            with open(os.path.join(directory, entry), "r", encoding="utf-8") as r:
+                input = r.read()
+            with open(expected, "r", encoding="utf-8") as r:
+                cases.append(cls(name, input, r.read()))
+        return cases
+
+
+class CaseResult:
+    # status: ok (正常结束), error (运行时错误), limit (超出预算), timeout, crash
+    name: str
+    passed: bool
+    status: str
+    detail: str
+    time: float
+    output: str
+
+    def __init__(self, name: str, passed: bool, status: str, detail: str, time: float, output: str):
+        self.name = name
+        self.passed = passed
+        self.status = status
+        self.detail = detail
+        self.time = time
+        self.output = output
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "passed": self.passed, "status": self.status, "detail": self.detail, "time": self.time}
+
+
+class TestReport:
+    results: list
+    compile_time: float
+    run_time: float
+
+    def __init__(self, results: list, compile_time: float, run_time: float):
+        self.results = results
+        self.compile_time = compile_time
+        self.run_time = run_time
+
+    def passed(self) -> int:
+        return sum(1 for result in self.results if result.passed)
+
+    def is_success(self) -> bool:
+        return self.passed() == len(self.results)
+
+    def to_dict(self) -> dict:
+        return {
+            "passed": self.passed(), "total": len(self.results), "compile_time": self.compile_time,
+            "run_time": self.run_time, "cases": [result.to_dict() for result in self.results]
+        }
+
+    def to_string(self) -> str:
+        lines = []
+        for result in self.results:
+            mark = "PASS" if result.passed else "FAIL"
+            detail = f"  {result.detail}" if result.detail else ""
+            lines.append(f"{mark}  {result.name:<24} {result.time * 1000:8.2f} ms  {result.status}{detail}")
+        lines.append(f"{self.passed()}/{len(self.results)} passed, compile {self.compile_time * 1000:.1f} ms, "
+                     f"run {self.run_time * 1000:.1f} ms")
+        return "\n".join(lines)
+
+
+class TestRunner:
+    # 一个程序对多组输入的批量评测: 构造时只做一次词法, 语法, 语义分析和编译,
+    # run 时把所有用例并行分给 worker, 逐个比较 write 输出与期望输出.
+    #   native: 用 C 后端编译成可执行文件, worker 线程各自启动进程执行, 超时的进程被杀掉;
+    #   interpret: 把 AST 交给进程池, 每个 worker 进程构造一次 Interpreter, 用 Limits 限制死循环和递归
+    __backend: str
+    __workers: int
+    __timeout: float
+
+    def __init__(self, source: str, backend: str = NATIVE, workers: int = 0, timeout: float = 10.0,
+                 limits: Limits = None, cc: str = None):
+        if backend not in (NATIVE, INTERPRET):
+            raise ValueError(f"Unknown backend `{backend}`.")
+        self.__backend = backend
+        self.__workers = workers or os.cpu_count() or 1
+        self.__timeout = timeout
+        self.__limits = limits or Limits()
+        self.__directory = None
+        start = time.perf_counter()
+        result = RecursiveDescentParser().parse(list(source))
+        if not result.is_success():
+            raise ValueError("\n".join(result.get_errors()))
+        program = ProgramBuilder().build(result.get_tree())
+        errors = SemanticChecker().check(program)
+        if errors:
+            raise ValueError("\n".join(errors))
+        prune(program)
+        if backend == NATIVE:
+            code, compiler = CGenerator(program).generate(), find_compiler(cc)
+            self.__directory = tempfile.mkdtemp(prefix="snl-test-")
+            try:
+                self.__artifact = compile_c(code, os.path.join(self.__directory, "program"), compiler)
+            except BaseException:
+                # 构造失败时调用方拿不到对象, 也就没法 close, 临时目录在这里删掉
+                self.close()
+                raise
+        else:
+            self.__artifact = program
+        self.__compile_time = time.perf_counter() - start
+
+    def run(self, cases: list) -> TestReport:
+        start = time.perf_counter()
+        if self.__backend == NATIVE:
+            with ThreadPoolExecutor(self.__workers) as executor:
+                outcomes = list(executor.map(self.__run_native, [case.input for case in cases]))
+        else:
+            context = multiprocessing.get_context("forkserver")
+            with ProcessPoolExecutor(min(self.__workers, len(cases) or 1), mp_context=context, initializer=_init_worker,
+                                     initargs=(self.__artifact, self.__limits)) as executor:
+                outcomes = [self.__from_interpreter(*outcome) for outcome in executor.map(_interpret, [case.input for case in cases])]
+        results = []
+        for case, (status, detail, elapsed, output) in zip(cases, outcomes):
+            passed = status == "ok" and normalize(output) == normalize(case.expected)
+            if status == "ok" and not passed:
+                detail = "wrong output"
+            results.append(CaseResult(case.name, passed, status, detail, elapsed, output))
+        return TestReport(results, self.__compile_time, time.perf_counter() - start)
+
+    def close(self) -> None:
+        if self.__directory:
+            shutil.rmtree(self.__directory, ignore_errors=True)
+            self.__directory = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __run_native(self, input: str) -> tuple:
+        start = time.perf_counter()
+        try:
+            process = subprocess.run([self.__artifact], input=input, capture_output=True, text=True, timeout=self.__timeout)
+        except subprocess.TimeoutExpired as e:
+            output = e.stdout.decode(errors="replace") if isinstance(e.stdout, bytes) else (e.stdout or "")
+            return "timeout", f"killed after {self.__timeout}s", time.perf_counter() - start, output
+        elapsed = time.perf_counter() - start
+        if process.returncode == 0:
+            return "ok", "", elapsed, process.stdout
+        if process.returncode == 2:
+            return "error", process.stderr.strip(), elapsed, process.stdout
+        return "crash", f"exit status {process.returncode}", elapsed, process.stdout
+
+    @staticmethod
+    def __from_interpreter(result: dict, elapsed: float) -> tuple:
+        if result["status"] == "limit":
+            return "limit", f"{result['reason']} limit exceeded at [{result['line']}]", elapsed, result["output"]
+        if result["status"] == "error":
+            return "error", f"runtime error: {result['message']} at [{result['line']}]", elapsed, result["output"]
+        return "ok", "", elapsed, result["output"]
@@ -0,0 +1,144 @@
+import time
+import threading
+
+from lexer.scanner import Lexer
+from lexer.TokenBuffer import TokenBuffer
+from parser.TreeNode import TreeNode
+from parser.SyntaxTree import SyntaxTree
+from parser.ParseResult import ParseResult
+from ir.CallGraph import prune
+from interpreter.Limits import Limits
+from ir.ProgramBuilder import ProgramBuilder
+from ir.SemanticChecker import SemanticChecker
+from interpreter.Interpreter import Interpreter
+from service.CompileResult import CompileResult
+from parser.RecursiveDescentParser import RecursiveDescentParser
+
+
+_local = threading.local()
+
+
+def _instances() -> tuple:
+    # 每个线程 (守护进程和进程池里的每个 worker) 保留一组常驻的 Lexer / 语法分析器, 分析前 reset 而不是重新创建
+    if not hasattr(_local, "lexer"):
+        _local.lexer = Lexer()
+        _local.parser = RecursiveDescentParser()
+    return _local.lexer, _local.parser
+
+
+def token_to_list(token) -> list:
+    return [token.line, token.column, token.token_type.name, token.value]
+
+
+def lex(source: str) -> dict:
+    lexer, _ = _instances()
+    result = lexer.get_result(list(source))
+    return {"tokens": [token_to_list(token) for token in result.get_token_list()], "errors": result.get_errors()}
+
+
+def parse(source: str) -> dict:
+    _, parser = _instances()
+    result = parser.parse(list(source))
+    tree = result.get_tree()
+    root = tree.get_root() if tree else None
+    # 在 worker 进程中执行, 语法树以扁平结点表经管道传回, 由 unpack_parsed 在守护进程中还原成嵌套的 dict
+    return {"success": result.is_success(), "errors": result.get_errors() or [], "tree": root.to_table() if root else None}
+
+
+def unpack_parsed(result: dict) -> dict:
+    table = result["tree"]
+    return {**result, "tree": TreeNode.from_table(table).to_dict() if table is not None else None}
+
+
+def check(source: str) -> dict:
+    _, parser = _instances()
+    result = parser.recognize(list(source))
+    return {"success": result.is_success(), "errors": result.get_errors() or []}
+
+
+def parse_shared(name: str) -> dict:
+    # 协调进程已做完词法分析, token 在名为 name 的共享内存中; 直接读取, 不经过 pickle.
+    # 内存块由协调进程创建和 unlink, 这里只在分析期间 attach
+    _, parser = _instances()
+    with TokenBuffer.attach(name) as buffer:
+        result = parser.parse_tokens(buffer)
+    tree = result.get_tree()
+    return {"success": result.is_success(), "errors": result.get_errors() or [], "nodes": tree.get_index().size() if tree else 0}
+
+
+def compile_source(source: str) -> CompileResult:
+    lexer, parser = _instances()
+    start = time.perf_counter()
+    lexer_result = lexer.get_result(list(source))
+    lexed = time.perf_counter()
+    if lexer_result.get_errors():
+        result = ParseResult()
+        result.set_errors(["Laxer Error"] + lexer_result.get_errors())
+    else:
+        result = parser.parse_token_list(lexer_result.get_token_list())
+    return CompileResult(result, {"lex": lexed - start, "parse": time.perf_counter() - lexed})
+
+
+def compile_packed(source: str) -> tuple:
+    # 进程池用: 语法树转成扁平结点表再返回, 避免按树的深度递归 pickle; 由 unpack_compiled 在调用方还原
+    result = compile_source(source)
+    parse_result = result.get_parse_result()
+    tree = parse_result.get_tree()
+    root = tree.get_root() if tree else None
+    return root.to_table() if root else None, parse_result.get_errors(), result.get_timings()
+
+
+def unpack_compiled(packed: tuple) -> CompileResult:
+    table, errors, timings = packed
+    result = ParseResult()
+    if table is not None:
+        result.set_tree(SyntaxTree(TreeNode.from_table(table)))
+    result.set_errors(errors)
+    return CompileResult(result, timings)
+
+
+def analyze(source: str) -> dict:
+    # 批量编译用: 词法, 语法, 语义三个阶段分别计时; 结果除计时外只取决于源文本
+    lexer, parser = _instances()
+    timings = {}
+    start = time.perf_counter()
+    lexer_result = lexer.get_result(list(source))
+    token_list = lexer_result.get_token_list()
+    timings["lex"] = time.perf_counter() - start
+    result = {"status": "ok", "errors": [], "tokens": len(token_list), "nodes": 0, "timings": timings}
+    if lexer_result.get_errors():
+        result.update(status="lex_error", errors=lexer_result.get_errors())
+        return result
+    start = time.perf_counter()
+    parse_result = parser.parse_token_list(token_list)
+    timings["parse"] = time.perf_counter() - start
+    tree = parse_result.get_tree()
+    result["nodes"] = tree.get_index().size() if tree and tree.get_root() else 0
+    if not parse_result.is_success():
+        result.update(status="syntax_error", errors=parse_result.get_errors() or [])
+        return result
+    start = time.perf_counter()
+    errors = SemanticChecker().check(ProgramBuilder().build(tree))
+    timings["check"] = time.perf_counter() - start
+    if errors:
+        result.update(status="semantic_error", errors=errors)
+    return result
+
+
+def execute(source: str, input: str = "", limits: Limits = None) -> dict:
+    # 沙箱执行: 有预算的解释执行, 死循环和无限递归也会在预算用完时返回, 不会占住 worker
+    _, parser = _instances()
+    result = parser.parse(list(source))
+    if not result.is_success():
+        return {"status": "compile_error", "errors": result.get_errors()}
+    program = ProgramBuilder().build(result.get_tree())
+    errors = SemanticChecker().check(program)
+    if errors:
+        return {"status": "compile_error", "errors": errors}
+    prune(program)
+    return Interpreter(program, limits).run(input).to_dict()
+
+
+METHODS = {"lex": lex, "parse": parse, "check": check}
+# worker 返回的结果在守护进程中还要经过的处理, 没有列出的方法原样返回
+RESPONSES = {"parse": unpack_parsed}
@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+import sys
+import argparse
+
+from lexer.log import logger
+from lexer.scanner import Lexer
+from parser.TreeNode import TreeNode
+from parser.RecursiveDescentParser import RecursiveDescentParser
+
+# 表格 (prettytable) 和图表 (pyecharts) 只在对应子命令里导入, `snlc check` 不为它们付启动时间
+
+
+def read_source(path: str) -> list:
+    with open(path, "r", encoding="utf-8") as r:
+        return list(r.read())
+
+
+def print_errors(path: str, errors: list) -> None:
+    for error in errors:
+        print(f"{path}: {error}", file=sys.stderr)
+
+
+def token_table(token_list: list):
+    from prettytable import PrettyTable
+
+    table = PrettyTable(field_names=["行", "列", "语义信息", "词法信息"])
+    for token in token_list:
+        table.add_row([token.line, token.column, token.value, token.token_type.value])
+    return table
+
+
+def render_tree(root: TreeNode, output: str, depth: int) -> str:
+    from pyecharts import options as opts
+    from pyecharts.charts import Tree
+
+    data = [root.to_dict()]
+    tree = Tree().add("", data, orient="TB", initial_tree_depth=depth).set_global_opts(title_opts=opts.TitleOpts(title="SNL语法树"))
+    return tree.render(output)
+
+
+def print_outline(root: TreeNode) -> None:
+    stack = [(root, 0)]
+    while stack:
+        node, depth = stack.pop()
+        print("  " * depth + (node.get_value() if node else "ɛ"))
+        if node and node.get_children():
+            stack.extend((child, depth + 1) for child in reversed(node.get_children()))
+
+
+def lex(args) -> int:
+    if args.jobs > 1:
+        from lexer.ParallelLexer import ParallelLexer
+
+        with ParallelLexer(args.jobs) as lexer:
+            result = lexer.get_result(read_source(args.file))
+    else:
+        result = Lexer().get_result(read_source(args.file))
+    if args.table:
+        print(token_table(result.get_token_list()))
+    else:
+        for token in result.get_token_list():
+            print(f"{token.line}:{token.column}\t{token.token_type.name}\t{token.value}")
+    print_errors(args.file, result.get_errors())
+    return 1 if result.get_errors() else 0
+
+
+def parse(args) -> int:
+    result = RecursiveDescentParser(compact_expressions=not args.grammar_expressions).parse(read_source(args.file))
+    if result.get_tree():
+        print_outline(result.get_tree().get_root())
+    print_errors(args.file, result.get_errors() or [])
+    return 0 if result.is_success() else 1
+
+
+def check(args) -> int:
+    status = 0
+    parser = RecursiveDescentParser()
+    for path in args.files:
+        if args.semantic:
+            errors = semantic_errors(parser, read_source(path))
+        else:
+            errors = parser.recognize(read_source(path)).get_errors()
+        if not errors:
+            print(f"{path}: ok")
+        else:
+            print_errors(path, errors)
+            status = 1
+    return status
+
+
+def semantic_errors(parser: RecursiveDescentParser, source: list) -> list:
+    from ir.ProgramBuilder import ProgramBuilder
+    from ir.SemanticChecker import SemanticChecker
+
+    result = parser.parse(source)
+    if not result.is_success():
+        return result.get_errors()
+    return SemanticChecker().check(ProgramBuilder().build(result.get_tree()))
+
+
+def locate(args) -> int:
+    source = "".join(read_source(args.file))
+    result = RecursiveDescentParser().parse(list(source))
+    if not result.get_tree():
+        print_errors(args.file, result.get_errors() or [])
+        return 1
+    tree = result.get_tree()
+    positions = tree.get_positions(source)
+    try:
+        node = positions.node_at(args.line, args.column)
+    except ValueError as e:
+        print_errors(args.file, [str(e)])
+        return 1
+    if not node:
+        print(f"{args.file}: nothing at {args.line}:{args.column}", file=sys.stderr)
+        return 1
+    path = [ancestor.get_kind() for ancestor in reversed(tree.get_index().get_ancestors(node))] + [node.get_kind()]
+    (start_line, start_column), (end_line, end_column) = positions.get_range(node)
+    print(f"{'/'.join(path)}  {start_line}:{start_column}-{end_line}:{end_column}")
+    for occurrence in positions.get_references(args.line, args.column):
+        line, column = positions.get_range(occurrence)[0]
+        print(f"{args.file}:{line}:{column}\t{occurrence.get_value()}")
+    return 0
+
+
+def tree(args) -> int:
+    from visual.TreeVisualizer import TreeVisualizer
+
+    result = RecursiveDescentParser().parse(read_source(args.file))
+    if result.get_tree():
+        visualizer = TreeVisualizer(args.limit, collapse_chains=not args.no_collapse)
+        print(visualizer.write(result.get_tree().get_root(), args.output))
+    print_errors(args.file, result.get_errors() or [])
+    return 0 if result.is_success() else 1
+
+
+def run(args) -> int:
+    # 完整流程: 日志文件 + token 表 + 语法树
+    logger.add("log/log_{time}.log")
+    result = Lexer().get_result(read_source(args.file))
+    if result.get_errors():
+        logger.error("分析错误\n" + "\n".join(result.get_errors()))
+        return 1
+    token_list = result.get_token_list()
+    if not token_list:
+        return 0
+    logger.success(f"Token:\n{token_table(token_list)}")
+    res = RecursiveDescentParser().parse_token_list(token_list)
+    render_tree(res.get_tree().get_root(), args.output, args.depth)
+    if res.get_errors():
+        logger.error('\n'.join(res.get_errors()))
+        return 1
+    return 0
+
+
+def build(args) -> int:
+    from backend.toolchain import generate_c, compile_c
+
+    with open(args.file, "r", encoding="utf-8") as r:
+        source = r.read()
+    try:
+        code = generate_c(source, not args.no_bounds_checks, not args.all_bounds_checks)
+        if args.emit_c:
+            print(code, end="")
+        else:
+            print(compile_c(code, args.output, args.cc))
+    except (ValueError, RuntimeError) as e:
+        print_errors(args.file, str(e).splitlines())
+        return 1
+    return 0
+
+
+def bounds(args) -> int:
+    from ir.ProgramBuilder import ProgramBuilder
+    from ir.RangeAnalysis import RangeAnalysis
+
+    result = RecursiveDescentParser().parse(read_source(args.file))
+    if not result.is_success():
+        print_errors(args.file, result.get_errors())
+        return 1
+    ranges = RangeAnalysis(ProgramBuilder().build(result.get_tree()))
+    for ref, (low, top), array in ranges.get_accesses():
+        name = ref.name if ref.field is None else f"{ref.name}.{ref.field}"
+        verdict = "removed" if ranges.is_safe(ref) else "checked"
+        print(f"[{ref.line}] {name}[{low}..{top}] in [{array.low}..{array.top}]: {verdict}")
+    removed, total = ranges.count()
+    print(f"{removed}/{total} index checks removed")
+    return 0
+
+
+def layout(args) -> int:
+    from ir.layout import StorageLayout
+    from ir.ProgramBuilder import ProgramBuilder
+
+    result = RecursiveDescentParser().parse(read_source(args.file))
+    if not result.is_success():
+        print_errors(args.file, result.get_errors())
+        return 1
+    try:
+        print(StorageLayout(ProgramBuilder().build(result.get_tree())).to_string())
+    except ValueError as e:
+        print_errors(args.file, [str(e)])
+        return 1
+    return 0
+
+
+def execute(args) -> int:
+    from interpreter.Limits import Limits
+    from service.tasks import execute as run_sandboxed
+
+    with open(args.file, "r", encoding="utf-8") as r:
+        source = r.read()
+    if args.input == "-":
+        input = sys.stdin.read()
+    else:
+        with open(args.input, "r", encoding="utf-8") as r:
+            input = r.read()
+    limits = Limits(args.max_steps, args.max_depth, args.max_memory, args.max_output)
+    result = run_sandboxed(source, input, limits)
+    if result["status"] == "compile_error":
+        print_errors(args.file, result["errors"])
+        return 1
+    print(result["output"], end="")
+    if result["status"] == "limit":
+        print_errors(args.file, [f"{result['reason']} limit exceeded at [{result['line']}] after {result['steps']} steps"])
+        return 3
+    if result["status"] == "error":
+        print_errors(args.file, [f"runtime error: {result['message']} at [{result['line']}]"])
+        return 2
+    return 0
+
+
+def test(args) -> int:
+    from interpreter.Limits import Limits
+    from service.TestRunner import TestRunner, TestCase
+
+    with open(args.file, "r", encoding="utf-8") as r:
+        source = r.read()
+    cases = TestCase.discover(args.cases)
+    try:
+        runner = TestRunner(source, args.backend, args.workers, args.timeout, Limits(max_steps=args.max_steps))
+    except (ValueError, RuntimeError) as e:
+        print_errors(args.file, str(e).splitlines())
+        return 1
+    with runner:
+        report = runner.run(cases)
+    print(report.to_string())
+    return 0 if report.is_success() else 1
+
+
+def callgraph(args) -> int:
+    from ir.CallGraph import CallGraph
+    from ir.ProgramBuilder import ProgramBuilder
+
+    result = RecursiveDescentParser().parse(read_source(args.file))
+    if not result.is_success():
+        print_errors(args.file, result.get_errors())
+        return 1
+    print(CallGraph(ProgramBuilder().build(result.get_tree())).to_string())
+    return 0
+
+
+def similar(args) -> int:
+    from corpus.SimilarityIndex import SimilarityIndex
+
+    index = SimilarityIndex(not args.exact_names, args.min_size)
+    for path in args.files:
+        with open(path, "r", encoding="utf-8") as r:
+            if not index.add_source(path, r.read()):
+                print(f"{path}: skipped, syntax errors", file=sys.stderr)
+    print(index.report(args.threshold))
+    return 0
+
+
+def parse_address(address: str) -> tuple:
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def corpus(args) -> int:
+    import json
+    from corpus.CorpusReport import CorpusReport
+    from corpus.Coordinator import compile_corpus
+
+    # 同一文件列出多次只编译一次, 结果库按 (run, 路径) 存放
+    files = list(dict.fromkeys(args.files))
+    if args.serial:
+        report = CorpusReport.compile_serial(files)
+    else:
+        try:
+            host, port = parse_address(args.listen)
+        except ValueError as e:
+            print_errors(args.listen, [str(e)])
+            return 1
+        report = compile_corpus(files, args.workers, args.unit_size, host, port, args.timeout, args.attempts)
+    print(json.dumps(report.to_dict(), ensure_ascii=False, indent=2) if args.json else report.to_string())
+    if args.db:
+        from corpus.ResultStore import ResultStore
+
+        with ResultStore(args.db) as store:
+            run = store.save(report, args.label)
+        print(f"saved as run {run} in {args.db}", file=sys.stderr)
+    return 0 if report.is_success() else 1
+
+
+def parse_run(run: str):
+    # 数字是 run 编号, 其他是版本
+    return int(run) if run and run.isdigit() else run
+
+
+def results(args) -> int:
+    from corpus.ResultStore import ResultStore
+
+    with ResultStore(args.db) as store:
+        try:
+            if args.compare:
+                base, head = map(parse_run, args.compare)
+                regressions = store.regressions(base, head)
+                # 其余变化是从一种失败变成另一种
+                others = [row for row in store.changes(base, head) if "ok" not in row[1:]]
+                for title, rows in (("regressions", regressions), ("fixes", store.fixes(base, head)), ("other changes", others)):
+                    print(f"{title}:")
+                    for path, old, new in rows:
+                        print(f"    {path}: {old} -> {new}")
+                return 1 if regressions else 0
+            run = parse_run(args.run)
+            statuses = ", ".join(f"{status} {count}" for status, count in sorted(store.get_statuses(run).items()))
+            print(f"statuses: {statuses}")
+            print("top errors:")
+            for kind, count, files in store.top_errors(run, args.top):
+                print(f"    {count:6} in {files:4} files  {kind}")
+            print("slowest files:")
+            for path, total, *_ in store.slowest(run, args.top):
+                print(f"    {total * 1000:10.3f} ms  {path}")
+        except ValueError as e:
+            print_errors(args.db, [str(e)])
+            return 1
+    return 0
+
+
+def worker(args) -> int:
+    from corpus.Worker import run_worker
+
+    try:
+        host, port = parse_address(args.address)
+        units = run_worker(host, port, args.name)
+    except (OSError, ValueError) as e:
+        print_errors(args.address, [str(e)])
+        return 1
+    print(f"{units} units compiled")
+    return 0
+
+
+def main(argv: list = None) -> int:
+    arg_parser = argparse.ArgumentParser(prog="snlc", description="SNL compiler")
+    arg_parser.add_argument("-v", "--verbose", action="store_true", help="print lexer and parser logs")
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("lex", help="print the token stream")
+    command.add_argument("file")
+    command.add_argument("--table", action="store_true", help="print tokens as a table")
+    command.add_argument("-j", "--jobs", type=int, default=1, help="lex newline-separated chunks of large files in parallel")
+    command.set_defaults(handler=lex)
+
+    command = commands.add_parser("parse", help="print the syntax tree as an outline")
+    command.add_argument("file")
+    command.add_argument("--grammar-expressions", action="store_true",
+                         help="expand expressions into Term/OtherTerm/OtherFactor chains as in the grammar")
+    command.set_defaults(handler=parse)
+
+    command = commands.add_parser("check", help="report syntax errors, or semantic errors with --semantic")
+    command.add_argument("files", nargs="+")
+    command.add_argument("--semantic", action="store_true", help="also check names and types")
+    command.set_defaults(handler=check)
+
+    command = commands.add_parser("build", help="compile to a native executable through C")
+    command.add_argument("file")
+    command.add_argument("-o", "--output", default="a.out")
+    command.add_argument("--cc", help="C compiler, defaults to $CC or cc")
+    command.add_argument("--emit-c", action="store_true", help="print the generated C instead of compiling it")
+    command.add_argument("--no-bounds-checks", action="store_true", help="omit runtime array index checks")
+    command.add_argument("--all-bounds-checks", action="store_true", help="keep index checks that range analysis proves redundant")
+    command.set_defaults(handler=build)
+
+    command = commands.add_parser("bounds", help="print each array access's index range and whether its check is removed")
+    command.add_argument("file")
+    command.set_defaults(handler=bounds)
+
+    command = commands.add_parser("layout", help="print frame sizes and variable offsets")
+    command.add_argument("file")
+    command.set_defaults(handler=layout)
+
+    command = commands.add_parser("exec", help="interpret the program with step, depth, memory and output limits")
+    command.add_argument("file")
+    command.add_argument("-i", "--input", default="-", help="file read by read(...), defaults to stdin")
+    command.add_argument("--max-steps", type=int, default=10_000_000, help="statements executed")
+    command.add_argument("--max-depth", type=int, default=1000, help="nested procedure calls")
+    command.add_argument("--max-memory", type=int, default=1 << 22, help="cells in all active frames")
+    command.add_argument("--max-output", type=int, default=1 << 20, help="bytes written")
+    command.set_defaults(handler=execute)
+
+    command = commands.add_parser("test", help="run the program against <name>.in/<name>.out cases in parallel")
+    command.add_argument("file")
+    command.add_argument("cases", help="directory with <name>.in inputs and <name>.out expected outputs")
+    command.add_argument("--backend", choices=["native", "interpret"], default="native")
+    command.add_argument("--workers", type=int, default=0)
+    command.add_argument("--timeout", type=float, default=10.0, help="seconds per case, native backend")
+    command.add_argument("--max-steps", type=int, default=10_000_000, help="statements per case, interpret backend")
+    command.set_defaults(handler=test)
+
+    command = commands.add_parser("callgraph", help="print procedure calls, fan-in/out, recursion and unreachable procedures")
+    command.add_argument("file")
+    command.set_defaults(handler=callgraph)
+
+    command = commands.add_parser("similar", help="report structurally similar files and procedures")
+    command.add_argument("files", nargs="+")
+    command.add_argument("--threshold", type=float, default=0.5, help="minimum file similarity to report")
+    command.add_argument("--min-size", type=int, default=8, help="smallest subtree, in nodes, to compare")
+    command.add_argument("--exact-names", action="store_true", help="do not treat renamed identifiers as equal")
+    command.set_defaults(handler=similar)
+
+    command = commands.add_parser("corpus", help="compile many files on local and remote workers into one report")
+    command.add_argument("files", nargs="+")
+    command.add_argument("-j", "--workers", type=int, default=None, help="local worker processes, defaults to CPU count")
+    command.add_argument("--unit-size", type=int, default=8, help="files per work unit")
+    command.add_argument("--listen", default="127.0.0.1:0", help="coordinator address for remote workers, HOST:PORT")
+    command.add_argument("--timeout", type=float, default=60.0, help="seconds per unit before its worker is dropped")
+    command.add_argument("--attempts", type=int, default=3, help="dispatches per unit before its files are marked lost")
+    command.add_argument("--serial", action="store_true", help="compile in this process, without workers")
+    command.add_argument("--json", action="store_true", help="print the report as JSON")
+    command.add_argument("--db", help="also save the results to this SQLite database")
+    command.add_argument("--label", help="compiler version recorded with --db, defaults to a hash of the compiler sources")
+    command.set_defaults(handler=corpus)
+
+    command = commands.add_parser("results", help="query saved corpus results: top errors, slowest files, regressions")
+    command.add_argument("db")
+    command.add_argument("--run", help="run number or compiler version, defaults to the latest run")
+    command.add_argument("--top", type=int, default=10, help="rows per section")
+    command.add_argument("--compare", nargs=2, metavar=("BASE", "HEAD"), help="files whose status changed between runs")
+    command.set_defaults(handler=results)
+
+    command = commands.add_parser("worker", help="connect to a corpus coordinator and compile work units")
+    command.add_argument("address", help="coordinator address, HOST:PORT")
+    command.add_argument("--name", default="", help="worker name shown in coordinator logs")
+    command.set_defaults(handler=worker)
+
+    command = commands.add_parser("locate", help="print the innermost syntax node at a position and the identifier's occurrences")
+    command.add_argument("file")
+    command.add_argument("line", type=int)
+    command.add_argument("column", type=int)
+    command.set_defaults(handler=locate)
+
+    command = commands.add_parser("tree", help="render the syntax tree to static HTML/SVG, large subtrees in separate pages")
+    command.add_argument("file")
+    command.add_argument("-o", "--output", default="render.html")
+    command.add_argument("--limit", type=int, default=300, help="maximum nodes drawn per page")
+    command.add_argument("--no-collapse", action="store_true", help="keep single-child chains expanded")
+    command.set_defaults(handler=tree)
+
+    command = commands.add_parser("run", help="log tokens and render the syntax tree, writing a log file under log/")
+    command.add_argument("file")
+    command.add_argument("-o", "--output", default="render.html")
+    command.add_argument("--depth", type=int, default=10, help="initially expanded tree depth")
+    command.set_defaults(handler=run)
+
+    args = arg_parser.parse_args(argv)
+    logger.set_quiet(not args.verbose and args.command != "run")
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+import asyncio
+import unittest
+
+from lexer.log import logger
+from service.AsyncCompiler import AsyncCompiler
+from parser.RecursiveDescentParser import RecursiveDescentParser
+
+
+def _program(statements: int) -> str:
+    body = "; ".join(f"a := a + {i}" for i in range(statements))
+    return f"program p var integer a; begin {body}; write(a) end."
+
+
+class AsyncCompilerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        logger.set_quiet(True)
+
+    def test_long_program(self) -> None:
+        # StmList / StmMore 的树很深, 整棵树从进程池传回时不能按深度递归 pickle
+        source = _program(400)
+
+        async def compile_all() -> list:
+            async with AsyncCompiler(workers=1) as compiler:
+                return [result async for result in compiler.compile_many([source, "program p begin end"])]
+
+        long, error = asyncio.run(compile_all())
+        self.assertTrue(long.get_parse_result().is_success())
+        expected = RecursiveDescentParser().parse(list(source)).get_tree().get_root()
+        self.assertEqual(long.get_parse_result().get_tree().get_root().to_table(), expected.to_table())
+        self.assertIn("total", long.get_timings())
+        self.assertFalse(error.get_parse_result().is_success())
+
+
+if __name__ == "__main__":
+    unittest.main()
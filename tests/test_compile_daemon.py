@@ -0,0 +1,51 @@
+import json
+import unittest
+
+from lexer.log import logger
+from service.CompileDaemon import CompileDaemon, MEMORY_LIMIT_EXCEEDED, _dumps
+from parser.RecursiveDescentParser import RecursiveDescentParser
+
+
+def _request(method: str, source: str, request_id: int = 1) -> str:
+    return json.dumps({"jsonrpc": "2.0", "id": request_id, "method": method, "params": {"source": source}})
+
+
+class CompileDaemonTest(unittest.TestCase):
+    def setUp(self) -> None:
+        logger.set_quiet(True)
+
+    def test_deep_program(self) -> None:
+        # StmList / StmMore 的树很深, 经管道传递和编码成 JSON 时都不能按深度递归
+        source = "program p var integer x; begin " + "; ".join(["x:=x+1"] * 400) + " end."
+        expected = RecursiveDescentParser().parse(list(source)).get_tree().get_root().to_dict()
+        daemon = CompileDaemon(workers=1)
+        try:
+            response = daemon.handle(_request("parse", source))
+            self.assertNotIn("error", response)
+            self.assertTrue(response["result"]["success"])
+            # 嵌套的 dict 比较和 json.loads 同样按深度递归, 比较编码后的文本
+            self.assertEqual(_dumps(response["result"]["tree"]), _dumps(expected))
+            lines = []
+            daemon.serve([_request("parse", source)], lines.append)
+        finally:
+            daemon.close()
+        self.assertEqual(lines, [_dumps(response) + "\n"])
+
+    def test_dumps_matches_json(self) -> None:
+        value = {"a": [1, 2.5, None, True, {"b": "ɛ\n", "c": []}], "d": {}, "e": ()}
+        self.assertEqual(_dumps(value), json.dumps(value, ensure_ascii=False))
+
+    def test_memory_limit_replaces_worker(self) -> None:
+        daemon = CompileDaemon(workers=1, memory_limit=20 * 1024 * 1024)
+        try:
+            response = daemon.handle(_request("lex", "a := 1; " * 500000))
+            self.assertEqual(response["error"]["code"], MEMORY_LIMIT_EXCEEDED)
+            # 超限的 worker 不能回到空闲队列, 紧接着的请求就由新的 worker 处理
+            response = daemon.handle(_request("check", "program p begin write(1) end.", 2))
+            self.assertEqual(response["result"], {"success": True, "errors": []})
+        finally:
+            daemon.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import signal
+import socket
+import tempfile
+import unittest
+import threading
+import multiprocessing
+
+from lexer.log import logger
+from corpus.Worker import run_worker
+from corpus.CorpusReport import CorpusReport
+from corpus.Coordinator import Coordinator, send, receive
+
+SOURCES = (
+    "program p var integer a; begin a := 1; write(a) end.",
+    "program p var integer a; begin a := ; write(a) end.",
+    "program p begin b := 1 end.",
+    "program p var char c; begin c := 'z'; write(c) end.",
+    "program p var integer a; begin read(a); write(a * 2) end.",
+)
+
+
+def _die_mid_unit(host: str, port: int) -> None:
+    # 领到一片后不交结果, 进程直接被杀掉
+    connection = socket.create_connection((host, port))
+    rfile, wfile = connection.makefile("rb"), connection.makefile("wb")
+    send(wfile, {"type": "hello", "name": "doomed"})
+    receive(rfile)
+    os.kill(os.getpid(), signal.SIGKILL)
+
+
+class CoordinatorTest(unittest.TestCase):
+    def setUp(self) -> None:
+        logger.set_quiet(True)
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.paths = []
+        for i, source in enumerate(SOURCES * 2):
+            path = os.path.join(self.directory.name, f"f{i}.snl")
+            with open(path, "w", encoding="utf-8") as w:
+                w.write(source)
+            self.paths.append(path)
+        self.paths.append(os.path.join(self.directory.name, "missing.snl"))
+
+    def __run(self, max_attempts: int) -> CorpusReport:
+        with Coordinator(self.paths, unit_size=2, timeout=10, max_attempts=max_attempts) as coordinator:
+            coordinator.start()
+            host, port = coordinator.get_address()
+            # 第一个 worker 先连上, 领走一片后被杀掉, 它的片要交给第二个 worker
+            process = multiprocessing.get_context("fork").Process(target=_die_mid_unit, args=(host, port))
+            process.start()
+            process.join(10)
+            self.assertEqual(process.exitcode, -signal.SIGKILL)
+            worker = threading.Thread(target=run_worker, args=(host, port, "survivor"), daemon=True)
+            worker.start()
+            report = coordinator.wait(30)
+            worker.join(10)
+        self.assertIsNotNone(report)
+        return report
+
+    def test_killed_worker_matches_serial(self) -> None:
+        report = self.__run(3)
+        self.assertEqual(report.to_dict(), CorpusReport.compile_serial(self.paths).to_dict())
+        self.assertEqual(report.get_statuses(), {"ok": 6, "syntax_error": 2, "semantic_error": 2, "crash": 1})
+
+    def test_unit_lost_after_max_attempts(self) -> None:
+        report = self.__run(1)
+        self.assertEqual([result.status for result in report.results].count("lost"), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import ast
+import inspect
+import unittest
+
+from lexer.log import logger
+from lexer.scanner import Lexer
+from lexer.TokenType import TokenType
+from parser.Grammar import SNL, PREDICT, tokens
+from parser import RecursiveDescentParser as parser_module
+from parser.RecursiveDescentParser import RecursiveDescentParser
+
+
+def _choices() -> dict:
+    # 分析函数中每条 if / elif 链: {函数名: ([按顺序用到的产生式编号], 出错时报告的非终结符)}
+    choices = {}
+    for function in ast.walk(ast.parse(inspect.getsource(parser_module))):
+        if not isinstance(function, ast.FunctionDef):
+            continue
+        for statement in function.body:
+            numbers = []
+            while isinstance(statement, ast.If):
+                test = statement.test
+                if not (isinstance(test, ast.BinOp) and isinstance(test.op, ast.BitAnd)
+                        and isinstance(test.right, ast.Subscript) and getattr(test.right.value, "id", None) == "PREDICT"):
+                    break
+                numbers.append(test.right.slice.value)
+                statement = statement.orelse[0] if len(statement.orelse) == 1 else statement.orelse
+            if numbers:
+                errors = [node.slice.value for node in ast.walk(ast.Module(statement, [])) if isinstance(node, ast.Subscript)
+                          and getattr(node.value, "id", None) == "EXPECTED"]
+                choices[function.name] = (numbers, errors[0] if errors else None)
+    return choices
+
+
+class GrammarTest(unittest.TestCase):
+    def setUp(self) -> None:
+        logger.set_quiet(True)
+
+    def test_ll1(self) -> None:
+        self.assertEqual(SNL.get_conflicts(), [])
+        self.assertEqual(sorted(PREDICT), [number for number, _, _ in SNL.get_productions()])
+
+    def test_parser_choices_match_productions(self) -> None:
+        # 每个选择依次检查同一非终结符的全部产生式, 按编号顺序, 出错时报告的也是这个非终结符
+        lhs = {number: left for number, left, _ in SNL.get_productions()}
+        alternatives = {}
+        for number, left, _ in SNL.get_productions():
+            alternatives.setdefault(left, []).append(number)
+        choices = _choices()
+        self.assertGreater(len(choices), 20)
+        covered = set()
+        for function, (numbers, nonterminal) in choices.items():
+            self.assertEqual({lhs[number] for number in numbers}, {nonterminal}, function)
+            self.assertEqual(numbers, alternatives[nonterminal], function)
+            covered.add(nonterminal)
+        self.assertEqual(covered, {left for left, numbers in alternatives.items() if len(numbers) > 1})
+
+    def test_char_constant(self) -> None:
+        source = "program p var char c; begin c := 'z'; write(c) end."
+        token_list = Lexer().get_result(list(source)).get_token_list()
+        characters = [token for token in token_list if token.token_type == TokenType.CHARACTER]
+        self.assertEqual([token.value for token in characters], ["z"])
+        result = RecursiveDescentParser().parse(list(source))
+        self.assertTrue(result.is_success(), result.get_errors())
+        factor, = result.get_tree().query("AssignmentRest/Exp/Factor")
+        constant, = factor.get_children()
+        self.assertEqual((constant.get_kind(), constant.get_value()), ("CHARACTER", "z"))
+
+    def test_vari_more_expected(self) -> None:
+        # 手写的集合曾漏掉 [
+        self.assertIn(TokenType.LMIDPAREN, tokens(SNL.get_expected("VariMore")))
+        result = RecursiveDescentParser().parse(list("program p var integer b; begin write(b b) end."))
+        self.assertEqual(result.get_errors()[0],
+                         ".|then|else|fi|do|endwh|end|:=|=|<|+|-|*|/|)|[|]|;|,| expected. at [1]")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,31 @@
+import unittest
+
+from lexer.log import logger
+from parser.RecursiveDescentParser import RecursiveDescentParser
+
+SOURCE = "program p\n\nvar integer a;\nbegin a := 1 end."
+
+
+class PositionIndexTest(unittest.TestCase):
+    def setUp(self) -> None:
+        logger.set_quiet(True)
+        self.positions = RecursiveDescentParser().parse(list(SOURCE)).get_tree().get_positions(SOURCE)
+
+    def test_node_at(self) -> None:
+        node = self.positions.node_at(3, 13)
+        self.assertEqual(node.get_value(), "a")
+        self.assertEqual(self.positions.get_range(node), ((3, 13), (3, 13)))
+        self.assertEqual([self.positions.get_range(ref)[0] for ref in self.positions.get_references(3, 13)],
+                         [(3, 13), (4, 7)])
+
+    def test_out_of_range(self) -> None:
+        # 空行上的任何列, 以及超出行尾的列都不能落到后面的行上
+        for line, column in ((2, 1), (2, 5), (1, 10), (4, 18), (5, 1), (0, 1), (1, 0)):
+            with self.assertRaises(ValueError):
+                self.positions.to_offset(line, column)
+        self.assertEqual(self.positions.to_offset(1, 9), 8)
+        self.assertEqual(self.positions.to_offset(4, 17), len(SOURCE) - 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
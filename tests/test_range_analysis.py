@@ -0,0 +1,116 @@
+import os
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+from lexer.log import logger
+from ir.CallGraph import prune
+from ir.RangeAnalysis import RangeAnalysis
+from ir.ProgramBuilder import ProgramBuilder
+from interpreter.Interpreter import Interpreter
+from backend.toolchain import build_native
+from service.tasks import execute
+from parser.RecursiveDescentParser import RecursiveDescentParser
+
+# (程序, 各数组访问按出现顺序是否去掉检查, 输入)
+PROGRAMS = {
+    # 循环条件 ss < 6 把下标限制在 [0..5]
+    "loop": ("""program sd
+type sarray = array [0..5] of integer;
+var sarray y;
+    integer ss, x;
+begin
+    ss := 0;
+    while ss < 6 do
+        y[ss] := ss;
+        x := y[ss];
+        write(x);
+        ss := ss + 1
+    endwh
+end.""", [True, True], [""]),
+    # 读入的下标范围未知, 越界时两个后端都要报错
+    "unknown": ("""program u
+var array [0..5] of integer a;
+    integer k;
+begin
+    read(k);
+    a[k] := k;
+    write(a[k])
+end.""", [False, False], ["3", "8", "-1"]),
+    # var 参数在调用后可能是任何值
+    "var_param": ("""program v
+var array [0..5] of integer a;
+    integer i;
+procedure set(var integer n);
+begin
+    n := 9
+end
+begin
+    i := 0;
+    a[i] := 1;
+    set(i);
+    a[i] := 2;
+    write(a[0])
+end.""", [True, False, True], [""]),
+    # 值参数的范围未知
+    "value_param": ("""program w
+var array [0..5] of integer a;
+    integer k;
+procedure put(integer n);
+begin
+    a[n] := n;
+    write(a[n])
+end
+begin
+    read(k);
+    put(2);
+    put(k)
+end.""", [False, False], ["5", "6"]),
+}
+
+
+def _program(source: str):
+    program = ProgramBuilder().build(RecursiveDescentParser().parse(list(source)).get_tree())
+    prune(program)
+    return program
+
+
+class RangeAnalysisTest(unittest.TestCase):
+    def setUp(self) -> None:
+        logger.set_quiet(True)
+
+    def test_verdicts(self) -> None:
+        for name, (source, safe, _) in PROGRAMS.items():
+            ranges = RangeAnalysis(_program(source))
+            self.assertEqual([ranges.is_safe(ref) for ref, _, _ in ranges.get_accesses()], safe, name)
+            self.assertEqual(ranges.count(), (sum(safe), len(safe)), name)
+
+    def test_interpreter_matches_all_checks(self) -> None:
+        # snlc exec 去掉检查, 与保留全部检查的解释执行结果相同
+        for name, (source, _, inputs) in PROGRAMS.items():
+            for input in inputs:
+                result = execute(source, input)
+                expected = Interpreter(_program(source), eliminate_checks=False).run(input).to_dict()
+                self.assertEqual((result["status"], result["output"], result["line"]),
+                                 (expected["status"], expected["output"], expected["line"]), f"{name} {input!r}")
+
+    @unittest.skipUnless(shutil.which(os.environ.get("CC", "cc")), "no C compiler")
+    def test_native_matches_interpreter(self) -> None:
+        # 去掉检查和 --all-bounds-checks 编译出的程序, 输出和是否越界都与解释执行相同
+        with tempfile.TemporaryDirectory() as directory:
+            for name, (source, _, inputs) in PROGRAMS.items():
+                executables = [build_native(source, os.path.join(directory, f"{name}_{eliminate}"), eliminate_checks=eliminate)
+                               for eliminate in (True, False)]
+                for input in inputs:
+                    expected = execute(source, input)
+                    for executable in executables:
+                        process = subprocess.run([executable], input=input, capture_output=True, text=True, timeout=10)
+                        self.assertEqual(process.stdout, expected["output"], f"{executable} {input!r}")
+                        self.assertEqual(process.returncode == 0, expected["status"] == "ok", f"{executable} {input!r}")
+                        if expected["status"] == "error":
+                            self.assertIn(f"at [{expected['line']}]", process.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
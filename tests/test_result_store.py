@@ -0,0 +1,62 @@
+import unittest
+
+from corpus.ResultStore import ResultStore, split_error
+from corpus.CorpusReport import FileResult, CorpusReport
+
+
+def _report(statuses: dict, totals: dict) -> CorpusReport:
+    results = []
+    for path, status in statuses.items():
+        errors = [] if status == "ok" else [f"Unexpected token `x` at [{len(path)}]", "Undeclared `y` at [3]"]
+        results.append(FileResult(path, f"digest-{path}", status, errors, 10, 20,
+                                  {"lex": totals[path] / 4, "parse": totals[path] / 4, "check": totals[path] / 2}))
+    return CorpusReport(results)
+
+
+class ResultStoreTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.store = ResultStore()
+        self.addCleanup(self.store.close)
+        self.base = self.store.save(_report({"a.snl": "ok", "b.snl": "syntax_error", "c.snl": "ok"},
+                                            {"a.snl": 0.4, "b.snl": 0.2, "c.snl": 0.8}), "v1")
+        self.head = self.store.save(_report({"a.snl": "semantic_error", "b.snl": "ok", "c.snl": "ok"},
+                                            {"a.snl": 0.1, "b.snl": 0.3, "c.snl": 0.2}), "v2")
+
+    def test_runs(self) -> None:
+        self.assertEqual([(run, version, files) for run, version, _, files in self.store.get_runs()],
+                         [(self.base, "v1", 3), (self.head, "v2", 3)])
+        self.assertEqual(self.store.get_run(), self.head)
+        self.assertEqual(self.store.get_run("v1"), self.base)
+        self.assertEqual(self.store.get_statuses("v1"), {"ok": 2, "syntax_error": 1})
+        with self.assertRaises(ValueError):
+            self.store.get_statuses("v3")
+
+    def test_top_errors(self) -> None:
+        # 反引号中的名字和位置不参与归类
+        self.assertEqual(self.store.top_errors(self.base),
+                         [("Undeclared `*`", 1, 1), ("Unexpected token `*`", 1, 1)])
+        self.assertEqual(self.store.get_errors("b.snl", "v1"),
+                         [("Unexpected token `*`", 5, None, "Unexpected token `x` at [5]"),
+                          ("Undeclared `*`", 3, None, "Undeclared `y` at [3]")])
+        self.assertEqual(split_error("Invalid character `@` near 4:7"), ("Invalid character `*`", 4, 7))
+
+    def test_slowest(self) -> None:
+        self.assertEqual([(path, total) for path, total, *_ in self.store.slowest("v1", 2)],
+                         [("c.snl", 0.8), ("a.snl", 0.4)])
+        self.assertEqual(self.store.slowest("v2", 1)[0][0], "b.snl")
+
+    def test_compare(self) -> None:
+        self.assertEqual(self.store.regressions("v1", "v2"), [("a.snl", "ok", "semantic_error")])
+        self.assertEqual(self.store.fixes(self.base, self.head), [("b.snl", "syntax_error", "ok")])
+        self.assertEqual(len(self.store.changes("v1", "v2")), 2)
+
+    def test_duplicate_paths(self) -> None:
+        report = _report({"a.snl": "ok"}, {"a.snl": 0.1})
+        report.results.append(report.results[0])
+        with self.assertRaises(ValueError):
+            self.store.save(report, "v3")
+        self.assertEqual(len(self.store.get_runs()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
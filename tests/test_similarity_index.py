@@ -0,0 +1,66 @@
+import unittest
+
+from lexer.log import logger
+from parser.TreeHasher import TreeHasher
+from corpus.SimilarityIndex import SimilarityIndex
+from parser.RecursiveDescentParser import RecursiveDescentParser
+
+
+def _program(variant: int) -> str:
+    # 相邻的变体共享大部分语句, 所有文件都有的 write 语句是模板代码
+    body = "; ".join(f"a := a + {i * (i % variant + 1)}" for i in range(variant, variant + 6))
+    return f"program p var integer a; begin {body}; write(a) end."
+
+
+class SimilarityIndexTest(unittest.TestCase):
+    def setUp(self) -> None:
+        logger.set_quiet(True)
+        self.sources = {f"f{variant}": _program(variant) for variant in range(1, 7)}
+
+    def __brute_force(self, threshold: float) -> list:
+        hasher = TreeHasher(True)
+        files = {}
+        for name, source in self.sources.items():
+            root = RecursiveDescentParser().parse(list(source)).get_tree().get_root()
+            files[name] = {h for h, size in hasher.hash_tree(root).values() if size >= 8}
+        limit = max(2, 0.5 * len(files))
+        informative = {name: {h for h in hashes if sum(h in other for other in files.values()) <= limit}
+                       for name, hashes in files.items()}
+        result = []
+        for a in sorted(files):
+            for b in sorted(files):
+                if a < b and informative[a] | informative[b]:
+                    score = len(informative[a] & informative[b]) / len(informative[a] | informative[b])
+                    if informative[a] & informative[b] and score >= threshold:
+                        result.append((a, b, score))
+        result.sort(key=lambda item: (-item[2], item[0], item[1]))
+        return result
+
+    def test_pairs_match_brute_force(self) -> None:
+        index = SimilarityIndex()
+        for name, source in self.sources.items():
+            self.assertTrue(index.add_source(name, source))
+        expected = self.__brute_force(0.1)
+        self.assertTrue(expected)
+        self.assertEqual([(a, b) for a, b, _ in index.pairs(0.1)], [(a, b) for a, b, _ in expected])
+        for (_, _, score), (_, _, brute) in zip(index.pairs(0.1), expected):
+            self.assertAlmostEqual(score, brute)
+
+    def test_queries_between_adds(self) -> None:
+        # 查询之后再入库, 各文件参与打分的子树数要按新的文件数重新统计
+        names = sorted(self.sources)
+        incremental = SimilarityIndex()
+        for name in names[:3]:
+            incremental.add_source(name, self.sources[name])
+        incremental.pairs(0.1)
+        for name in names[3:]:
+            incremental.add_source(name, self.sources[name])
+            incremental.similar(name, 0.1)
+        fresh = SimilarityIndex()
+        for name in names:
+            fresh.add_source(name, self.sources[name])
+        self.assertEqual(incremental.pairs(0.1), fresh.pairs(0.1))
+
+
+if __name__ == "__main__":
+    unittest.main()
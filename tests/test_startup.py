@@ -0,0 +1,46 @@
+import os
+import sys
+import time
+import subprocess
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# snlc check 在解释器自身启动之外的时间预算
+BUDGET = 0.1
+# 只有 lex --table, tree, run 等子命令需要的依赖
+HEAVY = ("prettytable", "pyecharts", "loguru", "numpy")
+
+
+def _best(command: list, runs: int = 5) -> float:
+    # 取多次中最快的一次, 减少机器负载的干扰
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=ROOT, capture_output=True, check=False)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+class StartupTest(unittest.TestCase):
+    def test_check_imports(self) -> None:
+        log = os.path.join(ROOT, "log")
+        before = set(os.listdir(log)) if os.path.isdir(log) else set()
+        process = subprocess.run([sys.executable, "-X", "importtime", "snlc.py", "check", "demo2.txt"], cwd=ROOT,
+                                 capture_output=True, text=True)
+        self.assertEqual(process.returncode, 0, process.stderr)
+        modules = {line.split("|")[-1].strip().split(".")[0] for line in process.stderr.splitlines()
+                   if line.startswith("import time:")}
+        for module in HEAVY:
+            self.assertNotIn(module, modules)
+        # 只有 run 子命令注册日志文件
+        after = set(os.listdir(log)) if os.path.isdir(log) else set()
+        self.assertEqual(after, before)
+
+    def test_check_time_budget(self) -> None:
+        baseline = _best([sys.executable, "-c", "pass"])
+        elapsed = _best([sys.executable, "snlc.py", "check", "demo2.txt"])
+        self.assertLess(elapsed - baseline, BUDGET, f"snlc check took {elapsed:.3f}s, interpreter alone {baseline:.3f}s")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from lexer.log import logger
+from service import TestRunner as runner
+
+SOURCE = "program p var integer a; begin read(a); write(a + 1) end."
+
+
+class TestRunnerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        logger.set_quiet(True)
+        self.temp = tempfile.TemporaryDirectory()
+        patcher = mock.patch("tempfile.tempdir", self.temp.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.temp.cleanup)
+
+    def test_compile_failure_removes_directory(self) -> None:
+        # false 总是以非零状态退出, 相当于 C 编译失败
+        with self.assertRaises(RuntimeError):
+            runner.TestRunner(SOURCE, runner.NATIVE, cc="false")
+        self.assertEqual(os.listdir(self.temp.name), [])
+
+    def test_close_removes_directory(self) -> None:
+        with runner.TestRunner(SOURCE, runner.NATIVE, workers=1) as test_runner:
+            self.assertTrue(os.listdir(self.temp.name))
+            report = test_runner.run([runner.TestCase("one", "41", "42")])
+        self.assertTrue(report.results[0].passed)
+        self.assertEqual(os.listdir(self.temp.name), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import re
+import unittest
+
+from lexer.log import logger
+from parser.TreeIndex import TreeIndex
+from parser.TreeQuery import TreeQuery
+from parser.RecursiveDescentParser import RecursiveDescentParser
+
+QUERIES = ("ProcDec//ID", "Program//ID", "/Program/ProgramHead/ProgramName/ID", "StmList//AssignmentRest/Exp",
+           "ProcDec//ProcDec//ID", "*//VarDec//*", "Program/*/ProDecpart/ProcDec", "//Stm//Exp//Variable")
+
+
+def _pattern(path: str) -> re.Pattern:
+    # 结点从根开始的类别路径写成 /A/B/C, 查询改写成对这个字符串的正则
+    text = path.strip()
+    anchored = text.startswith("/") and not text.startswith("//")
+    regex = "" if anchored else "(?:/[^/]+)*"
+    for axis, part in re.findall(r"(//|/|^)([^/]+)", text):
+        step = "[^/]+" if part == "*" else re.escape(part)
+        regex += ("(?:/[^/]+)*/" if axis == "//" else "/") + step
+    return re.compile(regex)
+
+
+class CountingIndex(TreeIndex):
+    parents = 0
+
+    def get_parent(self, node):
+        self.parents += 1
+        return super().get_parent(node)
+
+
+class TreeQueryTest(unittest.TestCase):
+    def setUp(self) -> None:
+        logger.set_quiet(True)
+
+    def test_matches_brute_force(self) -> None:
+        for name in ("demo.txt", "demo1.txt", "demo3.txt"):
+            with open(name, "r", encoding="utf-8") as r:
+                tree = RecursiveDescentParser().parse(list(r.read())).get_tree()
+            index = tree.get_index()
+            paths = {}
+            for node in index.get_nodes():
+                kinds = [ancestor.get_kind() for ancestor in reversed(index.get_ancestors(node))] + [node.get_kind()]
+                paths[id(node)] = "/" + "/".join(kinds)
+            for query in QUERIES:
+                pattern = _pattern(query)
+                expected = [node for node in index.get_nodes() if pattern.fullmatch(paths[id(node)])]
+                self.assertEqual(sorted(map(id, TreeQuery.compile(query).match(index))), sorted(map(id, expected)),
+                                 f"{name}: {query}")
+
+    def test_descendant_axis_is_linear(self) -> None:
+        # 没有匹配时每个候选都要走到根; 途经的结点记下结果后, 每个结点只向上走一次
+        for statements in (100, 200):
+            source = "program p var integer x; begin " + "; ".join(["x:=x+1"] * statements) + " end."
+            index = CountingIndex(RecursiveDescentParser().parse(list(source)).get_tree().get_root())
+            self.assertEqual(TreeQuery.compile("ProcDec//ID").match(index), [])
+            self.assertLessEqual(index.parents, 2 * index.size())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import os
+import tempfile
+import unittest
+
+from lexer.log import logger
+from parser.RecursiveDescentParser import RecursiveDescentParser
+from visual.TreeVisualizer import TreeVisualizer, collapse
+
+
+class TreeVisualizerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        logger.set_quiet(True)
+        body = "; ".join(f"a := a + {i}" for i in range(60))
+        source = f"program p var integer a; begin {body}; write(a) end."
+        self.root = RecursiveDescentParser().parse(list(source)).get_tree().get_root()
+
+    def test_small_limit_terminates(self) -> None:
+        # 根的子结点数超过 limit 时, 根不能再折叠进自己的 chunk, 否则分页永不结束
+        for limit in (2, 3, 5):
+            with tempfile.TemporaryDirectory() as directory:
+                output = os.path.join(directory, "t.html")
+                TreeVisualizer(limit).write(self.root, output)
+                chunks = os.listdir(os.path.join(directory, "t_files"))
+                self.assertLess(len(chunks), collapse(self.root).count)
+
+    def test_chunk_links_resolve(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "t.html")
+            TreeVisualizer(5).write(self.root, output)
+            files = os.path.join(directory, "t_files")
+            with open(output, "r", encoding="utf-8") as r:
+                self.assertIn('href="t_files/chunk_1.svg"', r.read())
+            for name in os.listdir(files):
+                with open(os.path.join(files, name), "r", encoding="utf-8") as r:
+                    self.assertIn("</svg>", r.read())
+
+    def test_rewrite_removes_stale_chunks(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "t.html")
+            files = os.path.join(directory, "t_files")
+            TreeVisualizer(3).write(self.root, output)
+            before = len(os.listdir(files))
+            TreeVisualizer(20).write(self.root, output)
+            after = sorted(os.listdir(files), key=lambda name: int(name[6:-4]))
+            self.assertLess(len(after), before)
+            self.assertEqual(after, [f"chunk_{i}.svg" for i in range(1, len(after) + 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,197 @@
+import os
+import re
+from html import escape
+from collections import deque
+
+from parser.TreeNode import TreeNode
+
+
+class ViewNode:
+    # 显示用的结点: 一条单子结点链折叠成一个结点, ɛ 结点不显示
+    __slots__ = ("parts", "widths", "children", "count", "x", "depth")
+
+    def __init__(self, parts: list, widths: list, children: list):
+        self.parts = parts
+        self.widths = widths
+        self.children = children
+        self.count = 1 + sum(child.count for child in children)
+        self.x = 0.0
+        self.depth = 0
+
+    def get_label(self) -> str:
+        if len(self.parts) <= 2:
+            return " › ".join(self.parts)
+        return f"{self.parts[0]} › … › {self.parts[-1]}"
+
+    def get_width(self) -> int:
+        # 以字符计, 与 get_label 一致
+        if len(self.widths) <= 2:
+            return sum(self.widths) + 3 * (len(self.widths) - 1)
+        return self.widths[0] + self.widths[-1] + 7
+
+
+def _part(node: TreeNode) -> tuple:
+    # 关键字和运算符结点的值是 ɛ, 显示 token 本身
+    if node.get_token_type() and node.get_value() == "ɛ":
+        label = node.get_token_type().value
+        return label, len(label)
+    return node.get_value(), node.get_width()
+
+
+def _is_hidden(node: TreeNode) -> bool:
+    return node is None or (node.get_value() == "ɛ" and not node.get_token_type())
+
+
+def collapse(root: TreeNode, collapse_chains: bool = True) -> ViewNode:
+    # 后序遍历一次: 去掉 ɛ 子结点, 只有一个子结点的非终结符与子结点合并
+    views = {}
+    stack = [(root, False)]
+    while stack:
+        node, visited = stack.pop()
+        children = [child for child in node.get_children() or [] if not _is_hidden(child)]
+        if not visited:
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(children))
+            continue
+        label, width = _part(node)
+        child_views = [views.pop(id(child)) for child in children]
+        if collapse_chains and len(child_views) == 1:
+            child = child_views[0]
+            views[id(node)] = ViewNode([label] + child.parts, [width] + child.widths, child.children)
+        else:
+            views[id(node)] = ViewNode([label], [width], child_views)
+    return views[id(root)]
+
+
+class TreeVisualizer:
+    # 大语法树的静态可视化: 每一页 (chunk) 最多显示 limit 个结点, 放不下的子树画成折叠结点,
+    # 点击后才加载对应的单独 SVG 文件; 浏览器一次只需要渲染一个 chunk
+    __limit: int
+    __char_width: int
+    __row_height: int
+
+    def __init__(self, limit: int = 300, char_width: int = 8, row_height: int = 56, collapse_chains: bool = True):
+        self.__limit = max(limit, 2)
+        self.__char_width = char_width
+        self.__row_height = row_height
+        self.__collapse_chains = collapse_chains
+
+    def write(self, root: TreeNode, output: str) -> str:
+        # 写出 output (HTML, 内嵌第一个 chunk) 和 <output 去掉扩展名>_files/ 下其余的 chunk
+        base = os.path.splitext(output)[0]
+        directory = base + "_files"
+        folder = os.path.basename(directory)
+        # 之前写出的 chunk 可能比这次多, 先删掉, 不留下链接不到的旧页面
+        if os.path.isdir(directory):
+            for name in os.listdir(directory):
+                if re.fullmatch(r"chunk_\d+\.svg", name):
+                    os.remove(os.path.join(directory, name))
+        chunks = [(collapse(root, self.__collapse_chains), None)]
+        index = 0
+        while index < len(chunks):
+            view, parent = chunks[index]
+            visible, stubs = self.__select(view)
+            links = {}
+            for stub in stubs:
+                chunks.append((stub, index))
+                links[id(stub)] = f"chunk_{len(chunks) - 1}.svg"
+            if parent is None:
+                parent_link = None
+            elif parent == 0:
+                parent_link = "../" + os.path.basename(output)
+            else:
+                parent_link = f"chunk_{parent}.svg"
+            svg = self.__svg(view, visible, links, parent_link)
+            if index == 0:
+                first = svg.replace('href="chunk_', f'href="{folder}/chunk_')
+            else:
+                os.makedirs(directory, exist_ok=True)
+                with open(os.path.join(directory, f"chunk_{index}.svg"), "w", encoding="utf-8") as w:
+                    w.write(svg)
+            index += 1
+        with open(output, "w", encoding="utf-8") as w:
+            w.write(self.__html(first, chunks[0][0].count, len(chunks)))
+        return output
+
+    def __select(self, view: ViewNode) -> tuple:
+        # 从 chunk 的根开始广度优先, 一个结点的子结点要么全部显示, 要么整体折叠;
+        # 根的子结点即使超过 limit 也总是显示, 这样折叠出去的子树都严格小于当前 chunk, 分页一定会结束
+        visible = {id(view)}
+        stubs = []
+        queue = deque([view])
+        while queue:
+            node = queue.popleft()
+            if not node.children:
+                continue
+            if node is not view and len(visible) + len(node.children) > self.__limit:
+                stubs.append(node)
+                continue
+            for child in node.children:
+                visible.add(id(child))
+                queue.append(child)
+        return visible, stubs
+
+    def __layout(self, view: ViewNode, visible: set) -> tuple:
+        # 一次后序遍历: 叶子 (含折叠结点) 依次向右排, 父结点居中于子结点之上; 返回左右边界
+        cursor = 0.0
+        left = 0.0
+        gap = 2
+        stack = [(view, 0, False)]
+        while stack:
+            node, depth, visited = stack.pop()
+            children = node.children if node.children and id(node.children[0]) in visible else []
+            if not visited and children:
+                stack.append((node, depth, True))
+                stack.extend((child, depth + 1, False) for child in reversed(children))
+                continue
+            node.depth = depth
+            if children:
+                node.x = (children[0].x + children[-1].x) / 2
+            else:
+                node.x = cursor + self.__width(node) / 2
+            left = min(left, node.x - self.__width(node) / 2)
+            cursor = max(cursor, node.x + self.__width(node) / 2 + gap)
+        return left, cursor
+
+    @staticmethod
+    def __width(node: ViewNode) -> int:
+        return node.get_width() + 2
+
+    def __svg(self, view: ViewNode, visible: set, links: dict, parent_link) -> str:
+        left, right = self.__layout(view, visible)
+        cw, rh = self.__char_width, self.__row_height
+        shift = 1 - left
+        elements = []
+        depth = 0
+        stack = [view]
+        while stack:
+            node = stack.pop()
+            depth = max(depth, node.depth)
+            x, y = (node.x + shift) * cw, node.depth * rh + rh / 2
+            children = node.children if node.children and id(node.children[0]) in visible else []
+            for child in children:
+                elements.append(f'<line x1="{x:.0f}" y1="{y + 10:.0f}" x2="{(child.x + shift) * cw:.0f}" y2="{child.depth * rh + rh / 2 - 10:.0f}"/>')
+                stack.append(child)
+            label = escape(node.get_label())
+            box = self.__width(node) * cw
+            title = escape(" › ".join(node.parts))
+            shape = f'<rect x="{x - box / 2:.0f}" y="{y - 10:.0f}" width="{box}" height="20"/><text x="{x:.0f}" y="{y + 4:.0f}">{label}</text>'
+            if id(node) in links:
+                shape = (f'<a href="{links[id(node)]}" class="stub"><title>{title} (+{node.count - 1} nodes)</title>{shape}'
+                         f'<text x="{x:.0f}" y="{y + 24:.0f}" class="more">+{node.count - 1}</text></a>')
+            else:
+                shape = f'<g><title>{title}</title>{shape}</g>'
+            elements.append(shape)
+        if parent_link:
+            elements.append(f'<a href="{parent_link}"><text x="4" y="14" class="up">↑ parent</text></a>')
+        return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{(right - left + 2) * cw:.0f}" height="{(depth + 1) * rh + 16:.0f}" '
+                f'font-family="monospace" font-size="12">'
+                '<style>line{stroke:#999}rect{fill:#eef3fb;stroke:#5b7db1}.stub rect{fill:#fbeee0;stroke:#c07a2c}'
+                'text{text-anchor:middle}.more{fill:#c07a2c}.up{text-anchor:start;fill:#5b7db1}</style>'
+                + "".join(elements) + "</svg>")
+
+    @staticmethod
+    def __html(svg: str, count: int, chunks: int) -> str:
+        return ("<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>SNL语法树</title></head><body>\n"
+                f"<p>{count} nodes, {chunks} chunks. Orange nodes are folded subtrees, click to open them.</p>\n"
+                f"{svg}\n</body></html>\n")